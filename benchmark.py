@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Benchmark
+Headless timings of the viewer against synthetic large databases
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Default sizes of the synthetic databases that can be customized
+BENCH_CONFIG = {
+    'rows': 10_000_000,  # Rows in the large events table
+    'tables': 5000,  # Tables in the many-tables schema
+    'wide_rows': 10_000,  # Rows in the wide table
+    'wide_columns': 60,  # TEXT/INTEGER columns in the wide table, plus two BLOBs
+    'blob_bytes': 16 * 1024,  # Size of the large BLOB in each wide row
+    'timeout': 600,  # Seconds a single step may take before the run fails
+}
+
+# Smaller sizes for a quick check that the harness works
+QUICK_CONFIG = dict(BENCH_CONFIG, rows=200_000, tables=500, wide_rows=1000)
+
+GENERATOR_VERSION = 1  # Stored in PRAGMA user_version; bump when the generators change
+
+# Scenario -> table opened and column searched
+SCENARIOS = {
+    'rows': {'table': 'events', 'search_column': 'message', 'search_text': 'zzz'},
+    'schema': {'table': 'metrics_00_00000', 'search_column': 'label', 'search_text': 'x'},
+    'wide': {'table': 'wide', 'search_column': 'text_0', 'search_text': 'zzz'},
+}
+
+SEQUENCE_CTE = "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {count}) "
+
+
+def generate_rows(conn, config):
+    """One large table of log-like events with a secondary index"""
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, created_at TEXT, level TEXT, "
+                 "user_id INTEGER, message TEXT)")
+    conn.execute(SEQUENCE_CTE.format(count=config['rows']) +
+                 "INSERT INTO events (created_at, level, user_id, message) "
+                 "SELECT datetime(1600000000 + n * 3, 'unixepoch'), "
+                 "CASE n % 4 WHEN 0 THEN 'DEBUG' WHEN 1 THEN 'INFO' WHEN 2 THEN 'WARN' ELSE 'ERROR' END, "
+                 "abs(random()) % 100000, 'event ' || n || ' ' || lower(hex(randomblob(12))) FROM seq")
+    conn.execute("CREATE INDEX idx_events_user ON events(user_id)")
+
+
+def generate_schema(conn, config):
+    """Many small tables named like time-partitioned shards"""
+    for i in range(config['tables']):
+        table = f"metrics_{i // 100:02d}_{i:05d}"
+        conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, label TEXT, value REAL, "
+                     f"recorded_at TEXT)")
+        conn.execute(f"INSERT INTO {table} (label, value, recorded_at) "
+                     f"SELECT 'sample ' || n, n * 0.5, datetime(1600000000 + n, 'unixepoch') "
+                     f"FROM (" + SEQUENCE_CTE.format(count=10) + "SELECT n FROM seq)")
+
+
+def generate_wide(conn, config):
+    """A wide table with long text and BLOB values"""
+    names = [f"text_{i}" if i % 2 == 0 else f"number_{i}" for i in range(config['wide_columns'])]
+    columns = ", ".join(f"{name} TEXT" if name.startswith("text") else f"{name} INTEGER" for name in names)
+    conn.execute(f"CREATE TABLE wide (id INTEGER PRIMARY KEY, {columns}, thumbnail BLOB, payload BLOB)")
+    values = ", ".join("lower(hex(randomblob(40)))" if name.startswith("text") else "abs(random()) % 1000000"
+                       for name in names)
+    conn.execute(SEQUENCE_CTE.format(count=config['wide_rows']) +
+                 f"INSERT INTO wide ({', '.join(names)}, thumbnail, payload) "
+                 f"SELECT {values}, randomblob(512), randomblob({config['blob_bytes']}) FROM seq")
+
+
+GENERATORS = {
+    'rows': (generate_rows, ('rows',)),
+    'schema': (generate_schema, ('tables',)),
+    'wide': (generate_wide, ('wide_rows', 'wide_columns', 'blob_bytes')),
+}
+
+
+def database_path(data_dir, scenario, config):
+    """File name that encodes the sizes, so changed sizes get a new database"""
+    _, sizes = GENERATORS[scenario]
+    suffix = "_".join(str(config[size]) for size in sizes)
+    return Path(data_dir) / f"{scenario}_{suffix}.db"
+
+
+def ensure_database(data_dir, scenario, config):
+    """Create the synthetic database for a scenario unless it already exists"""
+    path = database_path(data_dir, scenario, config)
+    if path.exists():
+        with sqlite3.connect(path) as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] == GENERATOR_VERSION:
+                return path
+        path.unlink()
+
+    generator, _ = GENERATORS[scenario]
+    print(f"Generating {path.name}...", flush=True)
+    started = time.perf_counter()
+    partial = path.with_suffix(".partial")
+    if partial.exists():
+        partial.unlink()
+    conn = sqlite3.connect(partial)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        with conn:
+            generator(conn, config)
+            conn.execute(f"PRAGMA user_version = {GENERATOR_VERSION}")
+    finally:
+        conn.close()
+    partial.rename(path)  # Only complete databases are reused by later runs
+    print(f"  {path.stat().st_size / (1024 * 1024):.0f} MB in {time.perf_counter() - started:.1f}s", flush=True)
+    return path
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, or None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(db_path, scenario, timeout):
+    """Drive a viewer window through one scenario and return its timings in seconds"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import Qt, QEventLoop
+    from PyQt5.QtWidgets import QApplication, QTreeWidgetItem
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    import sqlite_browser
+
+    spec = SCENARIOS[scenario]
+    window = sqlite_browser.SQLiteBrowser()
+    errors = []
+    window.show_error = errors.append
+    metrics = {}
+
+    def wait_until(condition, name):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if errors:
+                raise RuntimeError(f"{name}: {errors[0]}")
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"{name} did not finish within {timeout}s")
+            app.processEvents(QEventLoop.AllEvents, 10)
+            time.sleep(0.001)
+        return time.perf_counter()
+
+    def page_loaded(page):
+        return lambda: window.page_cache.key(window.paginator, page) in window.page_cache
+
+    def count_done():
+        return window.row_count[1] == 'exact'
+
+    loaded = []
+    window.database_loaded.connect(loaded.append)
+    started = time.perf_counter()
+    window.load_database(str(db_path))
+    metrics['open_s'] = wait_until(lambda: loaded, "open") - started
+
+    started = time.perf_counter()
+    window.populate_tree()
+    metrics['tree_s'] = time.perf_counter() - started
+
+    # First page and count, as after a click on the table in the tree
+    item = QTreeWidgetItem()
+    item.setData(0, Qt.UserRole, {'type': 'table', 'name': spec['table']})
+    started = time.perf_counter()
+    window.tree_item_clicked(item, 0)
+    metrics['first_page_s'] = wait_until(page_loaded(0), "first page") - started
+    metrics['count_s'] = wait_until(count_done, "count") - started
+
+    # Last page (samples key positions first), then a page in the middle using those samples
+    total = window.row_count[0]
+    for name, row in (('deep_page_s', total), ('deep_page_sampled_s', total // 2)):
+        if row < 1:
+            continue
+        window.goto_input.setText(str(row))
+        started = time.perf_counter()
+        window.jump_to_row()
+        metrics[name] = wait_until(page_loaded((row - 1) // window.rows_per_page), name) - started
+
+    # Substring search on one column, without the keystroke debounce
+    for widget in (window.search_input, window.column_combo):
+        widget.blockSignals(True)
+    window.search_input.setText(spec['search_text'])
+    window.column_combo.setCurrentText(spec['search_column'])
+    for widget in (window.search_input, window.column_combo):
+        widget.blockSignals(False)
+    started = time.perf_counter()
+    window.apply_filter()
+    metrics['search_page_s'] = wait_until(page_loaded(0), "search") - started
+    metrics['search_count_s'] = wait_until(count_done, "search count") - started
+
+    window.queries.cancel_all()
+    for worker in list(window.queries.running):
+        worker.wait()
+    window.pool.close()
+    metrics['peak_rss_mb'] = peak_rss_mb()
+    return metrics
+
+
+def run_scenario(db_path, scenario, timeout):
+    """Measure a scenario in a fresh process so caches and peak RSS start from zero"""
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", scenario, str(db_path),
+                             "--timeout", str(timeout)],
+                            stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def median_metrics(runs):
+    """Median of every metric over repeated runs"""
+    return {name: statistics.median(run[name] for run in runs if run.get(name) is not None)
+            for name in runs[0] if any(run.get(name) is not None for run in runs)}
+
+
+def compare(previous, current):
+    """Print the change of every metric against an earlier results file"""
+    print(f"\n{'scenario / metric':<34}{'before':>12}{'after':>12}{'change':>10}")
+    for scenario, result in current['scenarios'].items():
+        before = previous.get('scenarios', {}).get(scenario, {}).get('metrics', {})
+        for name, value in result['metrics'].items():
+            old = before.get(name)
+            change = f"{(value - old) / old * 100:+.1f}%" if old else ""
+            old_text = f"{old:.4f}" if old is not None else "-"
+            print(f"{scenario + ' / ' + name:<34}{old_text:>12}{value:>12.4f}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OJDB Viewer against synthetic databases")
+    parser.add_argument("--data-dir", default="benchmark-data", help="Where synthetic databases are kept")
+    parser.add_argument("--output", default="benchmark-results.json", help="Results file to write")
+    parser.add_argument("--compare", metavar="RESULTS", help="Earlier results file to compare against")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios to run ({', '.join(SCENARIOS)})")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the median is reported")
+    parser.add_argument("--quick", action="store_true", help="Use small databases")
+    for size in ('rows', 'tables', 'wide_rows', 'blob_bytes'):
+        parser.add_argument("--" + size.replace("_", "-"), type=int, help=f"Override {size}")
+    parser.add_argument("--timeout", type=int, default=BENCH_CONFIG['timeout'], help=argparse.SUPPRESS)
+    parser.add_argument("--child", nargs=2, metavar=("SCENARIO", "DATABASE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        scenario, db_path = args.child
+        print(json.dumps(measure(db_path, scenario, args.timeout)))
+        return 0
+
+    config = dict(QUICK_CONFIG if args.quick else BENCH_CONFIG, timeout=args.timeout)
+    for size in ('rows', 'tables', 'wide_rows', 'blob_bytes'):
+        if getattr(args, size) is not None:
+            config[size] = getattr(args, size)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'config': config,
+        'scenarios': {},
+    }
+    for scenario in scenarios:
+        db_path = ensure_database(args.data_dir, scenario, config)
+        runs = []
+        for run in range(args.repeat):
+            print(f"Running {scenario} ({run + 1}/{args.repeat})...", flush=True)
+            runs.append(run_scenario(db_path, scenario, config['timeout']))
+        metrics = median_metrics(runs)
+        results['scenarios'][scenario] = {'database': str(db_path), 'runs': args.repeat, 'metrics': metrics}
+        for name, value in metrics.items():
+            print(f"  {name:<22}{value:.4f}")
+
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(results, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous:
+            compare(json.load(previous), results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,8 +17,12 @@ def install_pyinstaller():
         print("Installing PyInstaller...")
         subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
 
-def build_executable():
-    """Build the standalone executable"""
+def build_executable(onedir=False):
+    """Build the standalone executable
+
+    A one-file build unpacks itself to a temporary directory on every launch;
+    a one-folder build (onedir=True) starts faster but ships as a directory.
+    """
     
     # Ensure we have PyInstaller
     install_pyinstaller()
@@ -29,7 +33,7 @@ def build_executable():
     # PyInstaller command
     cmd = [
         "pyinstaller",
-        "--onefile",  # Single file executable
+        "--onedir" if onedir else "--onefile",  # Folder or single file executable
         "--windowed",  # No console window
         "--name=OJDBViewer",
         "--icon=icon.png",
@@ -43,9 +47,10 @@ def build_executable():
     try:
         subprocess.check_call(cmd)
         print("\n✅ Build successful!")
-        print(f"Executable created: {current_dir}/dist/OJDBViewer")
+        dist_dir = current_dir / "dist" / "OJDBViewer" if onedir else current_dir / "dist"
+        print(f"Executable created: {dist_dir}/OJDBViewer")
         print("\nTo test the executable:")
-        print(f"  cd {current_dir}/dist")
+        print(f"  cd {dist_dir}")
         print("  ./OJDBViewer")
         
     except subprocess.CalledProcessError as e:
@@ -63,5 +68,5 @@ if __name__ == "__main__":
         print("❌ icon.png not found in current directory")
         sys.exit(1)
     
-    success = build_executable()
+    success = build_executable(onedir="--onedir" in sys.argv[1:])
     sys.exit(0 if success else 1) 
\ No newline at end of file
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Cell Values
+Bounded previews of large values for the grid and chunked reads of whole values
+"""
+
+import codecs
+
+from schema_catalog import ROWID_ALIASES, type_affinity
+from sql_utils import quote_identifier
+
+PREVIEW_LIMIT = 256  # Characters (TEXT) or bytes (BLOB) of a value fetched for the grid
+LENGTH_ALIAS = "__ojdb_len{}"  # Hidden trailing column with the full length of a cut value
+CHUNK_SIZE = 256 * 1024
+TEXT_CODECS = {'UTF-8': 'utf-8', 'UTF-16le': 'utf-16-le', 'UTF-16be': 'utf-16-be'}  # PRAGMA encoding -> codec
+
+
+def preview_select(columns, limit=PREVIEW_LIMIT):
+    """Select list that cuts long values of the given ColumnInfo list to limit
+
+    Each cut column gets a hidden trailing column holding the full length,
+    which is NULL when the value was not cut. Columns with INTEGER or REAL
+    affinity are selected as they are.
+    """
+    if not columns:
+        return "*"
+    terms = []
+    lengths = []
+    for index, col in enumerate(columns):
+        name = quote_identifier(col.name)
+        if type_affinity(col.type) in ('INTEGER', 'REAL'):
+            terms.append(name)
+            continue
+        terms.append(f"CASE WHEN length({name}) > {limit} THEN substr({name}, 1, {limit}) ELSE {name} END AS {name}")
+        lengths.append(f"CASE WHEN length({name}) > {limit} THEN length({name}) END AS {LENGTH_ALIAS.format(index)}")
+    return ", ".join(terms + lengths)
+
+
+def format_size(size):
+    for unit in ("bytes", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:,} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def preview_text(value, length):
+    """Grid text for a value cut to a preview; length is the full length"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"{bytes(value)}… ({format_size(length)})"
+    return f"{value}… ({length:,} characters)"
+
+
+def text_decoder(codec):
+    """Incremental decoder for TEXT bytes read in the given codec (see ValueReader.info)"""
+    return codecs.getincrementaldecoder(codec)(errors="replace")
+
+
+def hex_dump(data, offset=0):
+    """Classic 16 bytes per line hex dump with an ASCII column"""
+    lines = []
+    for start in range(0, len(data), 16):
+        chunk = data[start:start + 16]
+        hex_part = " ".join(f"{byte:02x}" for byte in chunk)
+        text_part = "".join(chr(byte) if 32 <= byte < 127 else "." for byte in chunk)
+        lines.append(f"{offset + start:08x}  {hex_part:<47}  |{text_part}|")
+    return "\n".join(lines)
+
+
+class ValueReader:
+    """Reads the complete value of one cell in chunks
+
+    TEXT and BLOB values of rowid tables are read through an incremental
+    BLOB handle (Connection.blobopen, Python 3.11+), so only one chunk is in
+    memory at a time. Other values are fetched whole and then split. Either
+    way TEXT comes out as bytes in the database encoding, which info() reports.
+    """
+
+    def __init__(self, table, column, key_columns, key):
+        self.table = table
+        self.column = column
+        self.key_columns = list(key_columns)
+        self.key = list(key)
+
+    def _where(self):
+        keys = ", ".join(quote_identifier(col) for col in self.key_columns)
+        marks = ", ".join("?" for _ in self.key_columns)
+        if len(self.key_columns) == 1:
+            return f" WHERE {keys} = {marks}"
+        return f" WHERE ({keys}) = ({marks})"
+
+    def info(self, conn):
+        """Return (storage class, size in bytes, codec of TEXT bytes) of the value"""
+        column = quote_identifier(self.column)
+        row = conn.execute(f"SELECT typeof({column}), length(CAST({column} AS BLOB)) "
+                           f"FROM {quote_identifier(self.table)}{self._where()}", self.key).fetchone()
+        if row is None:
+            raise LookupError("The row no longer exists")
+        encoding = conn.execute("PRAGMA encoding").fetchone()[0]
+        return row[0], row[1] or 0, TEXT_CODECS.get(encoding, 'utf-8')
+
+    def read(self, conn, kind, size, write, cancelled=lambda: False):
+        """Pass the first size bytes of the value to write() in chunks
+
+        kind and size come from info(); size may be lower to read only a prefix.
+        """
+        rowid_table = len(self.key_columns) == 1 and self.key_columns[0] in ROWID_ALIASES
+        if kind in ('text', 'blob') and rowid_table and hasattr(conn, "blobopen"):
+            with conn.blobopen(self.table, self.column, self.key[0], readonly=True) as blob:
+                offset = 0
+                while offset < size and not cancelled():
+                    chunk = blob.read(min(CHUNK_SIZE, size - offset))
+                    if not chunk:
+                        break
+                    write(chunk)
+                    offset += len(chunk)
+            return
+
+        column = quote_identifier(self.column)
+        value = conn.execute(f"SELECT CAST({column} AS BLOB) FROM {quote_identifier(self.table)}{self._where()}",
+                             self.key).fetchone()[0] or b""
+        for offset in range(0, size, CHUNK_SIZE):
+            if cancelled():
+                break
+            write(bytes(value[offset:min(offset + CHUNK_SIZE, size)]))
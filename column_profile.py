@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Column Profiles
+Sampled, then exact, statistics of the values in one column
+"""
+
+import random
+from collections import Counter, OrderedDict
+
+from row_counts import RowCounter
+from sql_utils import quote_identifier
+
+TOP_K = 10  # Most frequent values listed
+SAMPLE_SIZES = (1000, 10000, 100000)  # Rows sampled by successive refinement steps
+SAMPLE_RANGES = 50  # Random rowid ranges a sample is read from
+
+
+def sqlite_order(value):
+    """Sort key that orders mixed values like SQLite: numbers, then text, then BLOBs"""
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, bytes(value))
+
+
+def value_length(value):
+    """Length as SQLite's length() reports it: characters for text, bytes for BLOBs"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    return len(str(value))
+
+
+def length_bucket(length):
+    """Power-of-two bucket (low, high) a length falls into"""
+    if length < 2:
+        return (length, length)
+    low = 1 << (length.bit_length() - 1)
+    return (low, 2 * low - 1)
+
+
+def estimate_distinct(counts, sampled, total):
+    """Distinct values among total from a sample of sampled values (Haas-Stokes Duj1)
+
+    counts maps each sampled value to its frequency. This is the estimator
+    PostgreSQL's ANALYZE uses: a sample of only unique values suggests a
+    unique column, one without singletons suggests all values were seen.
+    """
+    if sampled == 0:
+        return 0
+    if sampled >= total:
+        return len(counts)
+    singletons = sum(1 for count in counts.values() if count == 1)
+    estimate = sampled * len(counts) / (sampled - singletons + singletons * sampled / total)
+    return int(min(total, max(len(counts), round(estimate))))
+
+
+class ColumnProfile:
+    """Statistics of one column; exact, or estimated from a sample of rows"""
+
+    def __init__(self, rows, examined, exact, nulls, distinct, minimum, maximum, top, lengths):
+        self.rows = rows  # Rows in the table (estimated unless exact)
+        self.examined = examined  # Rows the statistics were computed from
+        self.exact = exact
+        self.nulls = nulls  # NULL values among the examined rows
+        self.distinct = distinct  # Distinct non-NULL values in the table (estimated unless exact)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.top = top  # [(value, count among examined rows)], most frequent first
+        self.lengths = lengths  # [((low, high), count among examined rows)], by length
+
+    @property
+    def null_fraction(self):
+        return self.nulls / self.examined if self.examined else 0.0
+
+    @classmethod
+    def from_sample(cls, values, rows):
+        """Estimate the statistics of a table of rows rows from sampled values"""
+        non_null = [value for value in values if value is not None]
+        counts = Counter(non_null)
+        non_null_rows = round(rows * len(non_null) / len(values)) if values else 0
+        ordered = sorted(counts, key=sqlite_order)
+        lengths = Counter(length_bucket(value_length(value)) for value in non_null)
+        return cls(rows, len(values), False, len(values) - len(non_null),
+                   estimate_distinct(counts, len(non_null), non_null_rows),
+                   ordered[0] if ordered else None, ordered[-1] if ordered else None,
+                   counts.most_common(TOP_K), sorted(lengths.items()))
+
+
+class ColumnProfiler:
+    """Profiles a column in steps that go from a small sample to exact values
+
+    profile_steps() yields a ColumnProfile per step. Rowid tables are sampled
+    from random rowid ranges, which costs a few index seeks per range; other
+    tables and views are sampled with one reservoir pass. The last step
+    computes exact statistics with aggregate queries.
+    """
+
+    def __init__(self, table, column, key_columns, seed=None):
+        self.table = table
+        self.column = column
+        self.counter = RowCounter(table, key_columns)
+        self.random = random.Random(seed)
+
+    def _range_sample(self, conn, size, low, high):
+        """Values of about size rows read from random rowid ranges"""
+        key = self.counter.rowid_key
+        query = (f"SELECT {key}, {quote_identifier(self.column)} FROM {quote_identifier(self.table)} "
+                 f"WHERE {key} >= ? ORDER BY {key} LIMIT ?")
+        per_range = max(1, size // SAMPLE_RANGES)
+        values = {}  # rowid -> value, so overlapping ranges count each row once
+        for start in sorted(self.random.randint(low, high) for _ in range(SAMPLE_RANGES)):
+            values.update(conn.execute(query, (start, per_range)))
+        return list(values.values())
+
+    def _reservoir_sample(self, conn, size, cancelled):
+        """Uniform sample of size values from one pass over the column, and the rows seen"""
+        sample = []
+        seen = 0
+        cursor = conn.execute(f"SELECT {quote_identifier(self.column)} FROM {quote_identifier(self.table)}")
+        for (value,) in cursor:
+            seen += 1
+            if len(sample) < size:
+                sample.append(value)
+            else:
+                slot = self.random.randrange(seen)
+                if slot < size:
+                    sample[slot] = value
+            if seen % 10000 == 0 and cancelled():
+                break
+        return sample, seen
+
+    def exact(self, conn):
+        column = quote_identifier(self.column)
+        table = quote_identifier(self.table)
+        rows, non_null, distinct, minimum, maximum = conn.execute(
+            f"SELECT COUNT(*), COUNT({column}), COUNT(DISTINCT {column}), min({column}), max({column}) "
+            f"FROM {table}").fetchone()
+        top = conn.execute(f"SELECT {column}, COUNT(*) FROM {table} WHERE {column} IS NOT NULL "
+                           f"GROUP BY {column} ORDER BY COUNT(*) DESC LIMIT {TOP_K}").fetchall()
+        lengths = Counter()
+        for length, count in conn.execute(f"SELECT length({column}), COUNT(*) FROM {table} "
+                                          f"WHERE {column} IS NOT NULL GROUP BY 1"):
+            lengths[length_bucket(length)] += count
+        return ColumnProfile(rows, rows, True, rows - non_null, distinct, minimum, maximum,
+                             [tuple(row) for row in top], sorted(lengths.items()))
+
+    def profile_steps(self, conn, cancelled=lambda: False):
+        """Yield increasingly accurate ColumnProfiles, ending with an exact one"""
+        conn.execute("BEGIN")  # Every step reads the same snapshot
+        try:
+            key = self.counter.rowid_key
+            if key:
+                low, high = self.counter.rowid_bounds(conn)
+                rows = self.counter.estimate(conn) or 0
+                for size in SAMPLE_SIZES:
+                    if size * 2 > rows or cancelled():
+                        break  # Small enough to profile exactly right away
+                    yield ColumnProfile.from_sample(self._range_sample(conn, size, low, high), rows)
+            else:
+                sample, seen = self._reservoir_sample(conn, SAMPLE_SIZES[-1], cancelled)
+                if seen > len(sample) and not cancelled():
+                    yield ColumnProfile.from_sample(sample, seen)
+            if not cancelled():
+                yield self.exact(conn)
+        finally:
+            conn.commit()
+
+
+class ProfileCache:
+    """Latest profile per column, valid while PRAGMA data_version is unchanged"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (table, column) -> (data_version, profile)
+
+    def get(self, key, data_version):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != data_version:
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, data_version, profile):
+        self.entries[key] = (data_version, profile)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Column Widths
+Column widths estimated from declared types and a small sample of values
+"""
+
+SAMPLE_ROWS = 100  # Rows measured per table
+MIN_CHARS = 6
+MAX_CHARS = 40  # Wider values are cut off; the column can still be resized by hand
+PERCENTILE = 0.9  # A few very long values should not widen the whole column
+
+# Declared type fragment -> characters needed, checked in order
+TYPE_WIDTHS = [
+    ('BOOL', 5),
+    ('DATETIME', 19),
+    ('TIMESTAMP', 19),
+    ('DATE', 10),
+    ('TIME', 8),
+]
+
+
+def type_chars(decl_type):
+    """Width implied by a declared column type, or 0"""
+    decl_type = (decl_type or "").upper()
+    for fragment, chars in TYPE_WIDTHS:
+        if fragment in decl_type:
+            return chars
+    return 0
+
+
+def display_chars(value):
+    """Characters a value takes in the grid, capped at MAX_CHARS"""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return MAX_CHARS  # Shown as a long bytes literal
+    text = str(value)
+    return min(len(text[:MAX_CHARS + 1].split("\n", 1)[0]), MAX_CHARS)
+
+
+def estimate_chars(decl_type, values):
+    """Characters to reserve for a column from its type and sampled values"""
+    lengths = sorted(display_chars(value) for value in values)
+    sampled = lengths[int(PERCENTILE * (len(lengths) - 1))] if lengths else 0
+    return max(MIN_CHARS, min(MAX_CHARS, max(sampled, type_chars(decl_type))))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Connection Pool
+Long-lived read-only connections shared by the UI and worker threads
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Default pool settings that can be customized
+POOL_CONFIG = {
+    'max_idle_connections': 4,  # Connections kept open between queries
+    'cache_size_kib': 65536,  # Page cache per connection (PRAGMA cache_size)
+    'mmap_size': 256 * 1024 * 1024,  # Memory-mapped I/O window (PRAGMA mmap_size)
+}
+
+
+def database_uri(db_path, **params):
+    """Build a file: URI for a database path with query parameters"""
+    uri = Path(db_path).resolve().as_uri()
+    if params:
+        uri += "?" + "&".join(f"{key}={value}" for key, value in params.items())
+    return uri
+
+
+class ConnectionPool:
+    """Pool of read-only connections to one database
+
+    Connections are handed to one thread at a time and returned afterwards,
+    so each keeps its page cache and parsed schema warm across queries.
+    With immutable=True the file is opened with immutable=1: SQLite takes no
+    locks, never looks for a journal or WAL file and assumes the file cannot
+    change, which is only safe for snapshots nothing writes to.
+    """
+
+    def __init__(self, db_path, max_idle=None, cache_size_kib=None, mmap_size=None, immutable=False):
+        self.db_path = db_path
+        self.max_idle = max_idle if max_idle is not None else POOL_CONFIG['max_idle_connections']
+        self.cache_size_kib = cache_size_kib if cache_size_kib is not None else POOL_CONFIG['cache_size_kib']
+        self.mmap_size = mmap_size if mmap_size is not None else POOL_CONFIG['mmap_size']
+        self.immutable = immutable
+        self.uri = database_uri(db_path, mode='ro', immutable=1) if immutable else database_uri(db_path, mode='ro')
+        self.effective_mmap_size = None  # SQLite caps mmap_size at its compile-time maximum
+        self.hits = 0
+        self.misses = 0
+        self.closed = False
+        self._idle = []
+        self._lock = threading.Lock()
+        self._monitor = None  # Dedicated connection for PRAGMA data_version
+        self._monitor_lock = threading.Lock()
+        self.attachments = {}  # Schema alias -> URI attached to every pooled connection
+        self._attached = {}  # Connection -> aliases it has attached
+
+    def _connect(self):
+        conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        if self.effective_mmap_size is None:
+            self.effective_mmap_size = conn.execute("PRAGMA mmap_size").fetchone()[0]
+        return conn
+
+    def acquire(self):
+        """Take an idle connection, opening a new one if none is available"""
+        with self._lock:
+            if self.closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            if self._idle:
+                self.hits += 1
+                conn = self._idle.pop()
+            else:
+                self.misses += 1
+                conn = None
+            attachments = dict(self.attachments)
+        if conn is None:
+            conn = self._connect()
+        attached = self._attached.setdefault(conn, set())
+        for alias, uri in attachments.items():
+            if alias not in attached:
+                conn.execute("ATTACH DATABASE ? AS " + alias, (uri,))
+                attached.add(alias)
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool"""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if not self.closed and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self._attached.pop(conn, None)
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with block"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def attach(self, alias, path):
+        """Attach another database read-only to every pooled connection as alias"""
+        with self._lock:
+            self.attachments[alias] = database_uri(path, mode='ro')
+
+    def data_version(self):
+        """PRAGMA data_version from one dedicated connection
+
+        The value only changes when another connection commits, and values
+        from different connections cannot be compared, so it is always read
+        through the same connection.
+        """
+        with self._monitor_lock:
+            if self._monitor is None:
+                self._monitor = self._connect()
+            return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def mode_text(self):
+        """Open mode and memory settings for the status bar"""
+        mmap_size = self.effective_mmap_size if self.effective_mmap_size is not None else self.mmap_size
+        mode = "Immutable" if self.immutable else "Read-only"
+        return f"{mode} | mmap {mmap_size // (1024 * 1024)} MB | cache {self.cache_size_kib // 1024} MB"
+
+    def stats_text(self):
+        return f"Pool: {self.hits} hits / {self.misses} misses"
+
+    def close(self):
+        """Close idle connections; busy ones are closed when released"""
+        with self._lock:
+            self.closed = True
+            idle, self._idle = self._idle, []
+            self._attached.clear()
+        for conn in idle:
+            conn.close()
+        with self._monitor_lock:
+            if self._monitor is not None:
+                self._monitor.close()
+                self._monitor = None
@@ -14,7 +14,7 @@ mkdir -p "$PACKAGE_NAME"
 
 # Copy essential files
 echo "📋 Copying files..."
-cp sqlite_browser.py "$PACKAGE_NAME/"
+cp sqlite_browser.py cell_values.py column_profile.py column_widths.py connection_pool.py exporter.py filters.py fts_index.py index_advisor.py instrumentation.py page_cache.py pagination.py parallel_scan.py query_plan.py row_counts.py schema_catalog.py snapshots.py sql_utils.py "$PACKAGE_NAME/"
 cp requirements.txt "$PACKAGE_NAME/"
 cp icon.png "$PACKAGE_NAME/"
 cp README.md "$PACKAGE_NAME/"
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Export
+Streams query results to CSV, JSON Lines or an SQL dump with constant memory
+"""
+
+import base64
+import csv
+import json
+import os
+import time
+
+from sql_utils import quote_identifier
+
+# Format key -> file dialog filter
+EXPORT_FORMATS = {
+    'csv': "CSV Files (*.csv)",
+    'jsonl': "JSON Lines Files (*.jsonl)",
+    'sql': "SQL Dump Files (*.sql)",
+}
+
+
+def sql_literal(value):
+    """Render a value as an SQLite literal"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, float) and value != value:
+        return "NULL"  # NaN is stored as NULL by SQLite
+    if isinstance(value, float) and value in (float("inf"), float("-inf")):
+        return "1e999" if value > 0 else "-1e999"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "X'" + bytes(value).hex() + "'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def json_value(value):
+    """Make a value JSON serialisable; BLOBs become base64 strings"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    return value
+
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02}:{seconds % 60:02}"
+
+
+class ExportJob:
+    """Export of one query to a file, read in fetchmany batches
+
+    Rows are written as they are fetched, so memory use does not depend on
+    the number of rows. The file is written under a .part name and only
+    renamed into place when the export completes.
+    """
+
+    progress_interval = 0.25  # Seconds between progress reports
+
+    def __init__(self, table, query, params, path, fmt, create_sql=None, total=None, batch_size=2000):
+        self.table = table
+        self.query = query
+        self.params = list(params)
+        self.path = path
+        self.fmt = fmt
+        self.create_sql = create_sql  # CREATE TABLE statement for SQL dumps
+        self.total = total  # Expected row count for the ETA, if known
+        self.batch_size = batch_size
+
+    def run(self, conn, progress=None, cancelled=lambda: False):
+        """Write every row; returns the number of rows written, or None if cancelled"""
+        part_path = self.path + ".part"
+        cursor = conn.cursor()
+        cursor.execute(self.query, self.params)
+        column_names = [description[0] for description in cursor.description]
+        started = last_report = time.monotonic()
+        rows = 0
+        completed = False
+
+        try:
+            with open(part_path, "w", newline="", encoding="utf-8") as output:
+                write_rows = self._writer(output, column_names)
+                while not cancelled():
+                    batch = cursor.fetchmany(self.batch_size)
+                    if not batch:
+                        completed = True
+                        break
+                    write_rows(batch)
+                    rows += len(batch)
+                    now = time.monotonic()
+                    if progress and now - last_report >= self.progress_interval:
+                        last_report = now
+                        progress(*self._rates(rows, now - started))
+                if completed:
+                    self._finish(output)
+        finally:
+            cursor.close()
+            if not completed and os.path.exists(part_path):
+                os.remove(part_path)
+
+        if not completed:
+            return None
+        os.replace(part_path, self.path)
+        if progress:
+            progress(*self._rates(rows, time.monotonic() - started))
+        return rows
+
+    def _rates(self, rows, elapsed):
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total and rate > 0:
+            eta = max(0.0, (self.total - rows) / rate)
+        return rows, rate, eta
+
+    def _writer(self, output, column_names):
+        """Write the header and return a function that writes a batch of rows"""
+        if self.fmt == 'csv':
+            writer = csv.writer(output)
+            writer.writerow(column_names)
+            return lambda batch: writer.writerows([csv_value(value) for value in row] for row in batch)
+
+        if self.fmt == 'jsonl':
+            def write_json(batch):
+                for row in batch:
+                    output.write(json.dumps({name: json_value(value) for name, value in zip(column_names, row)},
+                                            ensure_ascii=False))
+                    output.write("\n")
+            return write_json
+
+        table = quote_identifier(self.table)
+        output.write("PRAGMA foreign_keys=OFF;\nBEGIN TRANSACTION;\n")
+        if self.create_sql:
+            output.write(self.create_sql + ";\n")
+        else:
+            output.write(f"CREATE TABLE {table}({', '.join(quote_identifier(name) for name in column_names)});\n")
+        columns = ", ".join(quote_identifier(name) for name in column_names)
+
+        def write_sql(batch):
+            for row in batch:
+                output.write(f"INSERT INTO {table}({columns}) VALUES({', '.join(sql_literal(v) for v in row)});\n")
+        return write_sql
+
+    def _finish(self, output):
+        if self.fmt == 'sql':
+            output.write("COMMIT;\n")
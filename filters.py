@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Filters
+Column filters that compile to predicates SQLite can answer from an index
+"""
+
+import re
+
+from schema_catalog import type_affinity
+from sql_utils import quote_identifier
+
+# Match modes in menu order, with their labels
+FILTER_MODES = [
+    ('auto', "Auto"),
+    ('contains', "Contains"),
+    ('exact', "Equals"),
+    ('prefix', "Starts with"),
+    ('range', "Range (a..b)"),
+]
+RANGE_SEPARATOR = ".."
+DATE_TYPE = re.compile(r"DATE|TIME", re.IGNORECASE)
+NUMBER = re.compile(r"^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$")
+
+
+def column_kind(decl_type):
+    """What a column holds, judged from its declared type: 'number', 'date', 'text' or 'any'"""
+    if DATE_TYPE.search(decl_type or ""):
+        return 'date'
+    affinity = type_affinity(decl_type)
+    if affinity in ('INTEGER', 'REAL', 'NUMERIC'):
+        return 'number'
+    if affinity == 'TEXT':
+        return 'text'
+    return 'any'  # No declared type (or BLOB): values keep the type they were stored with
+
+
+def typed_value(text):
+    """A search term as the integer or float it spells, else as text
+
+    Columns without affinity do not convert what they are compared with,
+    so 42 has to be bound as a number to match a stored integer.
+    """
+    if NUMBER.match(text):
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+    return text
+
+
+def auto_mode(kind, term):
+    """Mode a column kind is searched with in Auto mode"""
+    if RANGE_SEPARATOR in term and kind in ('number', 'date'):
+        return 'range'
+    if kind == 'number':
+        return 'exact'
+    if kind == 'date':
+        return 'prefix'
+    return 'contains'
+
+
+def prefix_bound(prefix):
+    """Smallest string above every string that starts with prefix, or None"""
+    for index in range(len(prefix) - 1, -1, -1):
+        code = ord(prefix[index])
+        if code < 0x10FFFF:
+            if 0xD7FF <= code < 0xE000:
+                code = 0xDFFF  # Surrogates cannot be encoded; continue after them at U+E000
+            return prefix[:index] + chr(code + 1)
+    return None
+
+
+def escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def prefix_as_text(decl_type, term):
+    """Whether Starts with has to match the column as text with LIKE instead of text bounds"""
+    kind = column_kind(decl_type)
+    numeric = type_affinity(decl_type) in ('INTEGER', 'REAL', 'NUMERIC')
+    return kind == 'any' or (numeric and (kind != 'date' or NUMBER.match(term) is not None))
+
+
+def index_usable(decl_type, mode, term):
+    """Whether an index on the column can answer a filter of the mode column_filter returned"""
+    if mode == 'contains':
+        return False
+    if mode == 'prefix':
+        return not prefix_as_text(decl_type, term)
+    return True
+
+
+def column_filter(column, decl_type, mode, term):
+    """Return (condition, params, mode) filtering one column by a search term
+
+    Equals, Starts with and Range compile to =, >= AND < and BETWEEN, which
+    an index on the column (or the rowid) can answer. Contains is a LIKE
+    '%term%' that always reads every row. Starts with compares text; on
+    columns that can hold numbers (numeric affinity or no declared type)
+    it falls back to LIKE.
+    """
+    name = quote_identifier(column)
+    kind = column_kind(decl_type)
+    if mode == 'auto':
+        mode = auto_mode(kind, term)
+    value = term if kind == 'text' else typed_value(term)
+
+    if mode == 'exact':
+        return f"{name} = ?", [value], mode
+
+    if mode == 'range':
+        low, separator, high = (part.strip() for part in term.partition(RANGE_SEPARATOR))
+        if not separator:
+            return f"{name} = ?", [value], mode
+        low = low if kind == 'text' else typed_value(low)
+        high = high if kind == 'text' else typed_value(high)
+        # A date "to" covers its whole day (or month...): below the next prefix, not up to midnight
+        bound = prefix_bound(high) if kind == 'date' and isinstance(high, str) and high != "" else None
+        if bound is not None:
+            if low != "":
+                return f"{name} >= ? AND {name} < ?", [low, bound], mode
+            return f"{name} < ?", [bound], mode
+        if low != "" and high != "":
+            return f"{name} BETWEEN ? AND ?", [low, high], mode
+        if low != "":
+            return f"{name} >= ?", [low], mode
+        if high != "":
+            return f"{name} <= ?", [high], mode
+        return f"{name} IS NOT NULL", [], mode
+
+    if mode == 'prefix':
+        if prefix_as_text(decl_type, term):
+            # Numbers stored in the column never fall between two text bounds
+            return f"CAST({name} AS TEXT) LIKE ? ESCAPE '\\'", [escape_like(term) + "%"], mode
+        bound = prefix_bound(term)
+        if bound is None:
+            return f"{name} >= ?", [term], mode
+        return f"{name} >= ? AND {name} < ?", [term, bound], mode
+
+    return f"{name} LIKE ?", [f"%{term}%"], 'contains'
+
+
+def search_placeholder(decl_type):
+    """Hint for the search box when a column of this type is selected"""
+    kind = column_kind(decl_type)
+    if kind == 'number':
+        return "Value, or low..high"
+    if kind == 'date':
+        return "Date prefix, or from..to"
+    return "Enter search term..."
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Search Index
+Trigram FTS5 indexes kept in a sidecar database so the original file is never written
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from sql_utils import quote_identifier
+
+SIDECAR_SUFFIX = ".ojdb-fts"
+ATTACH_ALIAS = "ojdb_fts"  # Schema name of the sidecar on pooled connections
+MIN_TERM_LENGTH = 3  # Trigram indexes cannot match shorter terms
+
+# Default index settings that can be customized
+INDEX_CONFIG = {
+    'verify_interval': 300.0,  # Seconds between exact checks of the indexed range during catch-up
+}
+
+
+def sidecar_path(db_path):
+    """Sidecar file next to the database, or in the user cache when that is read-only"""
+    path = Path(db_path).resolve()
+    if os.access(path.parent, os.W_OK):
+        return str(path) + SIDECAR_SUFFIX
+    cache_dir = Path.home() / ".cache" / "ojdb-viewer"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:16]
+    return str(cache_dir / f"{path.name}-{digest}{SIDECAR_SUFFIX}")
+
+
+def fts_phrase(text):
+    """Quote a search term as an FTS5 phrase, which a trigram index matches as a substring"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class SearchIndex:
+    """FTS5 trigram indexes for the tables of one database
+
+    Each indexed table gets a contentless FTS5 table in the sidecar whose
+    rowids are the source rowids. Catch-up passes are append-only: they index
+    rows above the highest rowid seen so far. Before appending they compare
+    the indexed row count with the current rowid bounds, which costs two
+    index lookups; counting the rows of the indexed range is exact but reads
+    all of it, so it runs at most once per verify_interval. If rows were
+    deleted (or inserted below the range) the index is marked stale and not
+    used until it is rebuilt.
+    """
+
+    def __init__(self, db_path):
+        self.path = sidecar_path(db_path)
+        self.tables = {}  # source table -> {'fts_table', 'columns', 'max_rowid', 'rows', 'stale', 'verified', 'checked_at'}
+
+    @property
+    def exists(self):
+        return os.path.exists(self.path)
+
+    @staticmethod
+    def fts_table_name(table):
+        return "fts_" + hashlib.sha1(table.encode("utf-8")).hexdigest()[:12]
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode = WAL")  # Searches keep reading while we index
+        conn.execute("CREATE TABLE IF NOT EXISTS ojdb_fts_meta ("
+                     "source_table TEXT PRIMARY KEY, fts_table TEXT, columns TEXT, "
+                     "max_rowid INTEGER, rows INTEGER)")
+        return conn
+
+    def load(self):
+        """Read index metadata from the sidecar, if there is one"""
+        self.tables = {}
+        if not self.exists:
+            return
+        conn = sqlite3.connect(self.path)
+        try:
+            for table, fts_table, columns, max_rowid, rows in conn.execute(
+                    "SELECT source_table, fts_table, columns, max_rowid, rows FROM ojdb_fts_meta"):
+                self.tables[table] = {'fts_table': fts_table, 'columns': columns.split("\x1f"),
+                                      'max_rowid': max_rowid, 'rows': rows, 'stale': False, 'verified': None,
+                                      'checked_at': None}
+        except sqlite3.DatabaseError:
+            pass  # Not built yet
+        finally:
+            conn.close()
+
+    def get(self, table):
+        return self.tables.get(table)
+
+    def build(self, source_conn, table, rowid_key, columns, progress=None, cancelled=lambda: False,
+              batch_size=5000, rebuild=False, data_version=None):
+        """Index rows of table above the last indexed rowid; resumable and cancellable
+
+        Updated or deleted rows are only picked up by a full rebuild. The
+        rowid bounds of the indexed range are checked on every pass; its rows
+        are counted when data_version (None if unknown) changed since the last
+        count and verify_interval has passed.
+        """
+        fts_table = self.fts_table_name(table)
+        quoted_fts = quote_identifier(fts_table)
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT columns, max_rowid, rows FROM ojdb_fts_meta WHERE source_table = ?",
+                               (table,)).fetchone()
+            if row is not None and (rebuild or row[0].split("\x1f") != list(columns)):
+                # Asked to start over, or the indexed columns changed
+                conn.execute(f"DROP TABLE IF EXISTS {quoted_fts}")
+                conn.execute("DELETE FROM ojdb_fts_meta WHERE source_table = ?", (table,))
+                row = None
+            if row is None:
+                fts_columns = ", ".join(f"c{i}" for i in range(len(columns)))
+                conn.execute(f"CREATE VIRTUAL TABLE {quoted_fts} USING fts5({fts_columns}, "
+                             "tokenize='trigram', content='')")
+                conn.execute("INSERT INTO ojdb_fts_meta VALUES (?, ?, ?, NULL, 0)",
+                             (table, fts_table, "\x1f".join(columns)))
+                conn.commit()
+                last_rowid, rows = None, 0
+            else:
+                last_rowid, rows = row[1], row[2]
+
+            source = quote_identifier(table)
+            entry = self.tables.get(table) or {}
+            verified, checked_at = entry.get('verified'), entry.get('checked_at')
+            low, high = source_conn.execute(f"SELECT (SELECT min({rowid_key}) FROM {source}), "
+                                            f"(SELECT max({rowid_key}) FROM {source})").fetchone()
+            if row is not None and last_rowid is not None:
+                # Fewer rowids left in the indexed range than rows indexed means rows were deleted
+                stale = rows > 0 and (low is None or high < last_rowid or last_rowid - low + 1 < rows)
+                now = time.monotonic()
+                if not stale and (data_version is None or verified != data_version) and \
+                        (checked_at is None or now - checked_at >= INDEX_CONFIG['verify_interval']):
+                    covered = source_conn.execute(f"SELECT COUNT(*) FROM {source} WHERE {rowid_key} <= ?",
+                                                  (last_rowid,)).fetchone()[0]
+                    stale = covered != rows
+                    verified, checked_at = data_version, now
+                if stale:
+                    self.tables[table] = {'fts_table': fts_table, 'columns': list(columns),
+                                          'max_rowid': last_rowid, 'rows': rows, 'stale': True,
+                                          'verified': None, 'checked_at': None}
+                    return rows
+            else:
+                verified, checked_at = data_version, time.monotonic()  # Indexed from scratch below
+            if last_rowid is None:
+                last_rowid = (low - 1) if low is not None else 0
+            select = (f"SELECT {rowid_key}, {', '.join(quote_identifier(col) for col in columns)} "
+                      f"FROM {source} WHERE {rowid_key} > ? ORDER BY {rowid_key} LIMIT {batch_size}")
+            insert = (f"INSERT INTO {quoted_fts}(rowid, {', '.join(f'c{i}' for i in range(len(columns)))}) "
+                      f"VALUES ({', '.join('?' for _ in range(len(columns) + 1))})")
+            start_rowid = last_rowid
+            while not cancelled():
+                batch = source_conn.execute(select, (last_rowid,)).fetchall()
+                if not batch:
+                    break
+                conn.executemany(insert, batch)
+                last_rowid = batch[-1][0]
+                rows += len(batch)
+                conn.execute("UPDATE ojdb_fts_meta SET max_rowid = ?, rows = ? WHERE source_table = ?",
+                             (last_rowid, rows, table))
+                conn.commit()
+                if progress and high is not None and high > start_rowid:
+                    progress(int(100 * (last_rowid - start_rowid) / (high - start_rowid)))
+        finally:
+            conn.close()
+        self.tables[table] = {'fts_table': fts_table, 'columns': list(columns),
+                              'max_rowid': last_rowid, 'rows': rows, 'stale': False,
+                              'verified': verified, 'checked_at': checked_at}
+        return rows
+
+    def search_condition(self, table, rowid_key, text, fallback_condition, fallback_params):
+        """Filter condition that resolves matches through the index, or None if unusable
+
+        Index matches and rows added after the last indexing pass (checked
+        with the fallback LIKE condition above the indexed range) form one
+        rowid list, so SQLite looks the rows up by rowid instead of testing
+        each row of the table against the list. The fallback is also checked
+        on the listed rows, so rows updated since indexing no longer match.
+        """
+        entry = self.tables.get(table)
+        if entry is None or entry['max_rowid'] is None or entry.get('stale') or len(text) < MIN_TERM_LENGTH:
+            return None
+        fts_table = quote_identifier(entry['fts_table'])
+        condition = (f"{rowid_key} IN (SELECT rowid FROM {ATTACH_ALIAS}.{fts_table} WHERE {fts_table} MATCH ? "
+                     f"UNION ALL SELECT {rowid_key} FROM {quote_identifier(table)} "
+                     f"WHERE {rowid_key} > ? AND ({fallback_condition})) AND ({fallback_condition})")
+        return condition, [fts_phrase(text), entry['max_rowid']] + list(fallback_params) * 2
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Index Advisor
+Index suggestions from the filters and sorts that were slow, tried on scratch copies
+"""
+
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+from connection_pool import database_uri
+from query_plan import FilterPlan, SortPlan, explain, format_plan
+from row_counts import RowCounter
+from sql_utils import quote_identifier
+
+# Default advisor settings that can be customized
+ADVISOR_CONFIG = {
+    'slow_ms': 100,  # Page loads and counts slower than this are worth an index
+    'max_shapes': 200,  # Distinct filter and sort combinations remembered per window
+    'sample_ranges': 20,  # Random rowid ranges read to estimate how many rows a filter matches
+    'sample_range_rows': 500,
+    'trial_rows': 2000000,  # Rows copied to the scratch database when trying an index
+    'trial_runs': 3,  # Timed runs per query; the fastest counts
+}
+
+SCRATCH_ALIAS = "ojdb_source"  # Schema name of the production database in a scratch connection
+
+# One filter and sort combination as the viewer queried it
+# indexable: whether an index on filter_column can answer the filter (filters.index_usable)
+QueryShape = namedtuple('QueryShape', ['table', 'filter_column', 'filter_mode', 'indexable', 'sort_column',
+                                       'condition', 'params', 'page_query', 'page_params', 'page_size'])
+
+TrialResult = namedtuple('TrialResult', ['rows', 'before', 'after', 'build_seconds', 'plan_before', 'plan_after'])
+
+
+def count_query(shape):
+    where = f" WHERE {shape.condition}" if shape.condition else ""
+    return f"SELECT COUNT(*) FROM {quote_identifier(shape.table)}{where}", list(shape.params)
+
+
+def index_name(table, columns):
+    return re.sub(r"\W+", "_", "_".join(["idx", table] + list(columns))).lower()
+
+
+class WorkloadEntry:
+    """Latencies of one filter and sort combination"""
+
+    def __init__(self, shape):
+        self.shape = shape  # Latest example, with its search term
+        self.runs = 0
+        self.worst = {}  # 'page' or 'count' -> slowest seconds
+        self.total = 0.0
+
+    def add(self, kind, seconds):
+        self.runs += 1
+        self.total += seconds
+        self.worst[kind] = max(self.worst.get(kind, 0.0), seconds)
+
+    @property
+    def worst_seconds(self):
+        return max(self.worst.values(), default=0.0)
+
+
+class Workload:
+    """Filters and sorts the viewer ran, keyed by table, columns and match mode"""
+
+    def __init__(self, max_shapes=None):
+        self.max_shapes = max_shapes if max_shapes is not None else ADVISOR_CONFIG['max_shapes']
+        self.entries = OrderedDict()  # (table, filter column, mode, sort column) -> WorkloadEntry
+
+    def record(self, shape, kind, seconds):
+        key = (shape.table, shape.filter_column, shape.filter_mode, shape.sort_column)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = WorkloadEntry(shape)
+        entry.shape = shape
+        entry.add(kind, seconds)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_shapes:
+            self.entries.popitem(last=False)
+
+    def slow_entries(self, slow_seconds=None):
+        if slow_seconds is None:
+            slow_seconds = ADVISOR_CONFIG['slow_ms'] / 1000
+        return [entry for entry in self.entries.values() if entry.worst_seconds >= slow_seconds]
+
+    def clear(self):
+        self.entries.clear()
+
+
+class Suggestion:
+    """A CREATE INDEX statement, or a note when no index can help, for one slow entry"""
+
+    def __init__(self, entry, columns=None, statement=None, estimated=None, note=""):
+        self.entry = entry
+        self.table = entry.shape.table
+        self.columns = columns or []
+        self.statement = statement
+        self.observed = entry.worst_seconds
+        self.estimated = estimated  # Seconds after indexing, None when unknown
+        self.note = note
+
+    @property
+    def benefit(self):
+        """Estimated seconds saved over the runs seen so far"""
+        if self.estimated is None:
+            return 0.0
+        return max(0.0, self.observed - self.estimated) * self.entry.runs
+
+
+class IndexAdvisor:
+    """Turns slow filters and sorts into CREATE INDEX suggestions
+
+    A candidate index is only suggested when EXPLAIN QUERY PLAN shows that
+    the queries do not use an index today, and that SQLite would use the
+    candidate: that is checked on an empty in-memory copy of the table's
+    schema with the candidate added.
+    """
+
+    def __init__(self, tables, seed=None):
+        self.tables = tables  # Table name -> loaded TableInfo
+        self.random = random.Random(seed)
+
+    @staticmethod
+    def candidate_columns(shape):
+        """Index columns that would serve a shape, or [] when no B-tree index can"""
+        sortable = [shape.sort_column] if shape.sort_column else []
+        if shape.filter_column is None or not shape.indexable:
+            return sortable  # E.g. LIKE '%term%' reads every row; an index can still deliver the order
+        if shape.filter_mode == 'exact':
+            return [shape.filter_column] + [col for col in sortable if col != shape.filter_column]
+        return [shape.filter_column]  # After a range, an index no longer delivers the sort order
+
+    @staticmethod
+    def served(conn, shape):
+        """Whether today's plans find the rows and their order without full scans or sorting"""
+        if shape.condition and FilterPlan(explain(conn, *count_query(shape))).full_scan:
+            return False
+        if shape.sort_column and SortPlan.explain(conn, shape.page_query, shape.page_params).temp_btree:
+            return False
+        return True
+
+    def hypothetical_use(self, info, columns, shape):
+        """Whether SQLite would use an index on columns, tried on an empty copy of the schema"""
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute(info.sql)
+            for index in info.indexes:
+                if index.origin == 'c' and not index.partial and index.columns and None not in index.columns:
+                    conn.execute(f"CREATE INDEX {quote_identifier(index.name)} ON {quote_identifier(info.name)}"
+                                 f"({', '.join(quote_identifier(col) for col in index.columns)})")
+            name = index_name(info.name, columns)
+            conn.execute(f"CREATE INDEX {quote_identifier(name)} ON {quote_identifier(info.name)}"
+                         f"({', '.join(quote_identifier(col) for col in columns)})")
+            plans = [explain(conn, *count_query(shape))] if shape.condition else []
+            plans.append(explain(conn, shape.page_query, shape.page_params))
+            return any(name in SortPlan(plan).indexes for plan in plans)
+        except sqlite3.Error:
+            return False
+        finally:
+            conn.close()
+
+    def selectivity(self, conn, info, shape):
+        """Fraction of rows a filter matches, from random rowid ranges; None if unknown"""
+        counter = RowCounter(info.name, info.key_columns())
+        key = counter.rowid_key
+        if not shape.condition or not key:
+            return None
+        low, high = counter.rowid_bounds(conn)
+        if low is None:
+            return None
+        query = (f"SELECT COUNT(*), SUM(CASE WHEN {shape.condition} THEN 1 ELSE 0 END) FROM "
+                 f"(SELECT * FROM {quote_identifier(info.name)} WHERE {key} >= ? ORDER BY {key} LIMIT ?)")
+        seen = matched = 0
+        for _ in range(ADVISOR_CONFIG['sample_ranges']):
+            start = self.random.randint(low, high)
+            rows, hits = conn.execute(query, list(shape.params) + [start, ADVISOR_CONFIG['sample_range_rows']]).fetchone()
+            seen += rows
+            matched += hits or 0
+        return matched / seen if seen else None
+
+    def estimate_after(self, conn, info, entry, columns):
+        """Rough latency with the index: the observed time scaled by the share of rows still read
+
+        An index led by the filter column reads only the matching rows; one
+        that only delivers the sort order reads about a page of rows, and
+        leaves the count of an unindexable filter as slow as it was.
+        """
+        shape = entry.shape
+        rows = RowCounter(info.name, info.key_columns()).estimate(conn)
+        if not rows:
+            return None
+        narrows = shape.filter_column == columns[0]
+        if narrows:
+            fraction = self.selectivity(conn, info, shape)
+            if fraction is None:
+                return None
+            reads = fraction * rows
+        else:
+            reads = shape.page_size
+        estimates = []
+        for kind, seconds in entry.worst.items():
+            if kind == 'count' and not narrows:
+                estimates.append(seconds)
+            else:
+                estimates.append(seconds * min(1.0, max(reads, 1) / rows))
+        return max(estimates)
+
+    def suggest(self, conn, entries):
+        """Suggestions for slow workload entries, most beneficial first"""
+        suggestions = []
+        seen = set()
+        for entry in entries:
+            shape = entry.shape
+            info = self.tables.get(shape.table)
+            if info is None or info.kind != 'table' or not info.loaded:
+                continue
+            columns = self.candidate_columns(shape)
+            if not columns:
+                if shape.filter_mode == 'contains':
+                    suggestions.append(Suggestion(entry, note="LIKE '%term%' cannot use an index; "
+                                                              "Tools > Build Search Index covers All Columns search"))
+                continue
+            if self.served(conn, shape):
+                continue
+            key = (shape.table, tuple(columns))
+            if key in seen or any(index.columns[:len(columns)] == columns for index in info.indexes):
+                continue
+            if not self.hypothetical_use(info, columns, shape):
+                continue
+            seen.add(key)
+            statement = (f"CREATE INDEX {quote_identifier(index_name(shape.table, columns))} ON "
+                         f"{quote_identifier(shape.table)}({', '.join(quote_identifier(col) for col in columns)});")
+            suggestions.append(Suggestion(entry, columns, statement, self.estimate_after(conn, info, entry, columns)))
+        suggestions.sort(key=lambda suggestion: (suggestion.statement is None, -suggestion.benefit))
+        return suggestions
+
+
+class ScratchCopy:
+    """Temporary writable database for trying an index on a copy of one table
+
+    The production database is attached read-only under SCRATCH_ALIAS, so
+    trials can never write to it. remove() deletes the scratch files.
+    """
+
+    def __init__(self, db_path):
+        self.source_uri = database_uri(db_path, mode='ro')
+        handle, self.path = tempfile.mkstemp(prefix="ojdb-scratch-", suffix=".db")
+        os.close(handle)
+
+    @contextmanager
+    def connection(self):
+        conn = sqlite3.connect(self.path, uri=True, check_same_thread=False)
+        try:
+            conn.execute(f"ATTACH DATABASE ? AS {SCRATCH_ALIAS}", (self.source_uri,))
+            yield conn
+        finally:
+            conn.close()
+
+    def remove(self):
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            try:
+                os.remove(self.path + suffix)
+            except OSError:
+                pass
+
+
+def best_time(conn, sql, params, runs, cancelled):
+    """Fastest of runs executions of a query, fetching every row"""
+    best = None
+    for _ in range(runs):
+        if cancelled():
+            break
+        started = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_shape(conn, shape, runs, cancelled):
+    """{'count': seconds, 'page': seconds} of a shape's queries, and their plans"""
+    timings = {}
+    plans = []
+    if shape.condition:
+        sql, params = count_query(shape)
+        timings['count'] = best_time(conn, sql, params, runs, cancelled)
+        plans.append("count: " + format_plan(explain(conn, sql, params)))
+    timings['page'] = best_time(conn, shape.page_query, shape.page_params, runs, cancelled)
+    plans.append("page: " + format_plan(explain(conn, shape.page_query, shape.page_params)))
+    return timings, "\n".join(plans)
+
+
+def try_index(conn, info, suggestion, max_rows=None, runs=None, cancelled=lambda: False):
+    """Time a suggestion's queries before and after creating its index on a scratch copy
+
+    conn belongs to a ScratchCopy. The table is created from its original
+    statement with its existing indexes, and filled with at most max_rows
+    rows, so the timings compare like with like.
+    """
+    max_rows = max_rows if max_rows is not None else ADVISOR_CONFIG['trial_rows']
+    runs = runs if runs is not None else ADVISOR_CONFIG['trial_runs']
+    table = quote_identifier(info.name)
+    conn.execute(info.sql)
+    conn.execute(f"INSERT INTO main.{table} SELECT * FROM {SCRATCH_ALIAS}.{table} LIMIT ?", (max_rows,))
+    for (sql,) in conn.execute(f"SELECT sql FROM {SCRATCH_ALIAS}.sqlite_master "
+                               "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (info.name,)).fetchall():
+        conn.execute(sql)
+    conn.commit()
+    rows = conn.execute(f"SELECT COUNT(*) FROM main.{table}").fetchone()[0]
+
+    shape = suggestion.entry.shape
+    before, plan_before = time_shape(conn, shape, runs, cancelled)
+    started = time.perf_counter()
+    conn.execute(suggestion.statement.rstrip(";"))
+    conn.commit()
+    build_seconds = time.perf_counter() - started
+    after, plan_after = time_shape(conn, shape, runs, cancelled)
+    return TrialResult(rows, before, after, build_seconds, plan_before, plan_after)
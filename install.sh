@@ -28,7 +28,7 @@ mkdir -p "$INSTALL_DIR"
 
 # Copy files
 echo "📋 Copying application files..."
-cp sqlite_browser.py "$INSTALL_DIR/"
+cp sqlite_browser.py cell_values.py column_profile.py column_widths.py connection_pool.py exporter.py filters.py fts_index.py index_advisor.py instrumentation.py page_cache.py pagination.py parallel_scan.py query_plan.py row_counts.py schema_catalog.py snapshots.py sql_utils.py "$INSTALL_DIR/"
 cp requirements.txt "$INSTALL_DIR/"
 cp icon.png "$INSTALL_DIR/"
 cp README.md "$INSTALL_DIR/"
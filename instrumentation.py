@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Instrumentation
+Statement log fed by SQLite trace and progress callbacks, with per-origin latencies
+"""
+
+import json
+import threading
+import time
+from collections import deque, namedtuple
+
+StatementRecord = namedtuple('StatementRecord',
+                             ['seq', 'timestamp', 'origin', 'sql', 'seconds', 'vm_steps', 'rows'])
+
+MAX_SQL_LENGTH = 2000  # Longer statements are cut in the log
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class QueryLog:
+    """Thread-safe log of executed statements
+
+    Keeps the last max_entries statements, and the last window latencies of
+    every origin for rolling percentiles.
+    """
+
+    def __init__(self, max_entries=5000, window=200):
+        self.max_entries = max_entries
+        self.window = window
+        self.entries = deque(maxlen=max_entries)
+        self.latencies = {}  # origin -> deque of recent durations in seconds
+        self.counts = {}  # origin -> statements logged since the last clear
+        self.next_seq = 1
+        self._lock = threading.Lock()
+
+    def record(self, origin, sql, seconds, vm_steps, rows=None):
+        with self._lock:
+            entry = StatementRecord(self.next_seq, time.time(), origin, sql[:MAX_SQL_LENGTH],
+                                    seconds, vm_steps, rows)
+            self.next_seq += 1
+            self.entries.append(entry)
+            self.latencies.setdefault(origin, deque(maxlen=self.window)).append(seconds)
+            self.counts[origin] = self.counts.get(origin, 0) + 1
+        return entry
+
+    def entries_since(self, seq):
+        """Entries with a sequence number above seq, oldest first"""
+        with self._lock:
+            return [entry for entry in self.entries if entry.seq > seq]
+
+    def summary(self):
+        """{origin: (statements, p50 seconds, p95 seconds)} over the rolling window"""
+        with self._lock:
+            windows = {origin: sorted(values) for origin, values in self.latencies.items()}
+            counts = dict(self.counts)
+        return {origin: (counts[origin], percentile(values, 0.5), percentile(values, 0.95))
+                for origin, values in sorted(windows.items())}
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.latencies.clear()
+            self.counts.clear()
+
+    def export_json(self, path):
+        """Write the log and the per-origin summary to a JSON file"""
+        with self._lock:
+            entries = [entry._asdict() for entry in self.entries]
+        summary = {origin: {'statements': count, 'p50_ms': p50 * 1000, 'p95_ms': p95 * 1000}
+                   for origin, (count, p50, p95) in self.summary().items()}
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump({'statements': entries, 'summary': summary}, output, indent=2)
+
+
+class StatementTracer:
+    """Times every statement run on one connection while installed
+
+    The trace callback marks the start of each statement; a statement ends
+    when the next one starts or the tracer is removed. The progress handler
+    counts VM steps and doubles as the cancellation check, since SQLite
+    allows only one progress handler per connection.
+    """
+
+    progress_interval = 1000  # VM instructions between progress handler calls
+
+    def __init__(self, log, origin, cancelled=None):
+        self.log = log
+        self.origin = origin
+        self.cancelled = cancelled
+        self.total_steps = 0
+        self.current = None  # [sql, started, steps at start, rows]
+
+    def install(self, conn):
+        conn.set_trace_callback(self.on_statement)
+        conn.set_progress_handler(self.on_progress, self.progress_interval)
+
+    def remove(self, conn):
+        self.finish_statement()
+        conn.set_trace_callback(None)
+        conn.set_progress_handler(None, 0)
+
+    def on_progress(self):
+        self.total_steps += self.progress_interval
+        return bool(self.cancelled and self.cancelled())
+
+    def on_statement(self, sql):
+        self.finish_statement()
+        self.current = [sql, time.perf_counter(), self.total_steps, None]
+
+    def add_rows(self, count):
+        """Count rows returned by the current statement"""
+        if self.current is not None:
+            self.current[3] = (self.current[3] or 0) + count
+
+    def finish_statement(self):
+        if self.current is None:
+            return
+        sql, started, steps, rows = self.current
+        self.current = None
+        if self.log is not None:
+            self.log.record(self.origin, sql, time.perf_counter() - started, self.total_steps - steps, rows)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Page Cache
+Recently viewed and prefetched pages kept in memory within a byte budget
+"""
+
+import sys
+from collections import OrderedDict
+
+# Default cache settings that can be customized
+PAGE_CACHE_CONFIG = {
+    'max_bytes': 64 * 1024 * 1024,  # Memory budget for cached rows
+    'prefetch': True,  # Load the pages before and after the current one in the background
+}
+
+
+def rows_size(rows):
+    """Approximate memory used by a list of row tuples"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+class PageCache:
+    """LRU cache of page rows, evicted by size and valid for one PRAGMA data_version
+
+    Pages are keyed by table, filter, sort, page size and page number; within
+    one data_version those always select the same rows. Any write to the
+    database changes data_version and empties the cache.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes if max_bytes is not None else PAGE_CACHE_CONFIG['max_bytes']
+        self.entries = OrderedDict()  # key -> (column_names, rows, size)
+        self.size = 0
+        self.data_version = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(paginator, page):
+        return (paginator.table, paginator.condition, tuple(paginator.params),
+                paginator.sort_column, paginator.sort_descending, paginator.page_size, page)
+
+    def _check_version(self, data_version):
+        """Drop every page when the database changed"""
+        if data_version != self.data_version:
+            self.clear()
+            self.data_version = data_version
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, data_version):
+        """Return (column_names, rows) for a cached page, or None"""
+        self._check_version(data_version)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0], entry[1]
+
+    def put(self, key, data_version, column_names, rows):
+        """Cache a page read at data_version; pages from an older version are ignored"""
+        if data_version != self.data_version:
+            return
+        size = rows_size(rows)
+        if size > self.max_bytes:
+            return  # A single page larger than the budget is never cached
+        self.discard(key)
+        self.entries[key] = (list(column_names), list(rows), size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, _, evicted) = self.entries.popitem(last=False)
+            self.size -= evicted
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def stats_text(self):
+        return (f"Pages: {len(self.entries)} cached ({self.size / (1024 * 1024):.1f} MB), "
+                f"{self.hits} hits / {self.misses} misses")
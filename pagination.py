@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Pagination
+Keyset pagination that seeks pages by rowid or primary key instead of OFFSET
+"""
+
+from sql_utils import quote_identifier
+
+KEY_ALIAS = "__ojdb_key{}"  # Hidden key columns selected ahead of the table columns
+
+
+class KeysetPaginator:
+    """Builds page queries that seek by key so every page costs O(log n)
+
+    Boundary keys of visited pages are remembered so Next and Previous never
+    scan skipped rows. Tables without a usable key (views) use LIMIT/OFFSET.
+    With a sort column the rows are ordered by (sort column, key), and the
+    sort value becomes the first hidden key column.
+    """
+
+    def __init__(self, table, key_columns, page_size, select_list="*"):
+        self.table = table
+        self.key_columns = list(key_columns)
+        self.page_size = page_size
+        self.select_list = select_list  # Columns shown for each row
+        self.condition = ""
+        self.params = []
+        self.sort_column = None
+        self.sort_descending = False
+        self.sort_nullable = True  # Whether the sort column can hold NULLs
+        self.generation = 0  # Bumped whenever cached keys become invalid
+        self.reset()
+
+    def reset(self):
+        """Forget boundary keys and samples"""
+        self.generation += 1
+        self.boundaries = {0: None}  # page -> key of the last row before the page
+        self.first_keys = {}  # page -> key of the first row of the page
+        self.samples = None  # Keys at every sample_stride-th row
+        self.sample_stride = None
+
+    @property
+    def uses_keyset(self):
+        return bool(self.key_columns)
+
+    @property
+    def order_columns(self):
+        """Columns the rows are ordered by"""
+        return ([self.sort_column] if self.sort_column else []) + self.key_columns
+
+    @property
+    def key_width(self):
+        """Number of hidden key columns at the start of each result row"""
+        return len(self.order_columns) if self.uses_keyset else 0
+
+    def set_page_size(self, page_size):
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.reset()
+
+    def set_filter(self, condition, params):
+        """Set the filter condition; boundaries are only valid for one filter"""
+        params = list(params)
+        if condition != self.condition or params != self.params:
+            self.condition = condition
+            self.params = params
+            self.reset()
+
+    def set_sort(self, column, descending=False, nullable=True):
+        """Order rows by column before the key (None for key order)"""
+        if column != self.sort_column or (column and descending != self.sort_descending):
+            self.sort_column = column
+            self.sort_descending = bool(column and descending)
+            self.sort_nullable = nullable
+            self.reset()
+
+    @staticmethod
+    def _row_value(terms):
+        joined = ", ".join(terms)
+        return joined if len(terms) == 1 else f"({joined})"
+
+    def _column(self, col):
+        """Qualified column name; ORDER BY would otherwise pick a select list alias of the same name"""
+        return f"{quote_identifier(self.table)}.{quote_identifier(col)}"
+
+    def _select(self):
+        if not self.uses_keyset:
+            return f"SELECT {self.select_list} FROM {quote_identifier(self.table)}"
+        keys = ", ".join(f"{self._column(col)} AS {KEY_ALIAS.format(i)}"
+                         for i, col in enumerate(self.order_columns))
+        return f"SELECT {keys}, {self.select_list} FROM {quote_identifier(self.table)}"
+
+    def _where(self, extra=None):
+        conditions = []
+        if self.condition:
+            conditions.append(f"({self.condition})")
+        if extra:
+            conditions.append(extra)
+        return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def _order(self, terms, descending):
+        return ", ".join(f"{term}{' DESC' if descending else ''}" for term in terms)
+
+    def order_clause(self):
+        """ORDER BY clause for a plain SELECT of the table, or "" for natural order"""
+        if not self.order_columns:
+            return ""
+        columns = [self._column(col) for col in self.order_columns]
+        return f" ORDER BY {self._order(columns, self.sort_descending)}"
+
+    def _after(self, key, descending, inclusive=False):
+        """Conditions selecting the rows after key when reading in the given direction
+
+        SQLite sorts NULL before every value and a row value comparison with
+        NULL is never true, so NULL sort values get their own condition. When
+        the rows after key are split between NULL and non-NULL sort values, two
+        conditions are returned and each is read in order by its own query.
+        """
+        op = ("<" if descending else ">") + ("=" if inclusive else "")
+        keys = [self._column(col) for col in self.key_columns]
+        if not self.sort_column:
+            return [(f"{self._row_value(keys)} {op} {self._row_value(['?'] * len(keys))}", list(key))]
+
+        sort = self._column(self.sort_column)
+        if key[0] is None:
+            conditions = [(f"{sort} IS NULL AND {self._row_value(keys)} {op} "
+                           f"{self._row_value(['?'] * len(keys))}", list(key[1:]))]
+            if not descending:
+                conditions.append((f"{sort} IS NOT NULL", []))  # Values follow the NULLs
+            return conditions
+
+        terms = [sort] + keys
+        conditions = [(f"{self._row_value(terms)} {op} {self._row_value(['?'] * len(terms))}", list(key))]
+        if descending and self.sort_nullable:
+            conditions.append((f"{sort} IS NULL", []))  # NULLs follow the smallest value
+        return conditions
+
+    def _seek(self, key, descending=False, inclusive=False, offset=0):
+        """Return (sql, params) for a page of rows after key in the given direction"""
+        order = self._order([self._column(col) for col in self.order_columns], descending)
+        conditions = self._after(key, descending, inclusive) if key is not None else [(None, [])]
+        if len(conditions) == 1:
+            condition, key_params = conditions[0]
+            sql = f"{self._select()}{self._where(condition)} ORDER BY {order} LIMIT {self.page_size}"
+            if offset:
+                sql += f" OFFSET {offset}"
+            return sql, self.params + key_params
+
+        # Each part is read through the index on its own; the union is at most 2 pages
+        parts = []
+        params = []
+        for condition, key_params in conditions:
+            parts.append(f"SELECT * FROM ({self._select()}{self._where(condition)} "
+                         f"ORDER BY {order} LIMIT {self.page_size + offset})")
+            params += self.params + key_params
+        aliases = [KEY_ALIAS.format(i) for i in range(self.key_width)]
+        sql = f"{' UNION ALL '.join(parts)} ORDER BY {self._order(aliases, descending)} LIMIT {self.page_size}"
+        if offset:
+            sql += f" OFFSET {offset}"
+        return sql, params
+
+    def page_query(self, page):
+        """Return (sql, params) for the page, using the cheapest known seek"""
+        if not self.uses_keyset:
+            return self.offset_query(page * self.page_size)
+
+        if page in self.boundaries:
+            return self._seek(self.boundaries[page], self.sort_descending)
+
+        if page + 1 in self.first_keys:
+            # Walk backwards from the page after, then restore the display order
+            inner, params = self._seek(self.first_keys[page + 1], not self.sort_descending)
+            aliases = [KEY_ALIAS.format(i) for i in range(self.key_width)]
+            return f"SELECT * FROM ({inner}) ORDER BY {self._order(aliases, self.sort_descending)}", params
+
+        start_row = page * self.page_size
+        if self.samples:
+            index = min(start_row // self.sample_stride, len(self.samples) - 1)
+            return self._seek(self.samples[index], self.sort_descending, inclusive=True,
+                              offset=start_row - index * self.sample_stride)
+
+        return self._seek(None, self.sort_descending, offset=start_row)
+
+    def offset_query(self, start_row):
+        """Return (sql, params) for a page starting at start_row using OFFSET"""
+        sql = (f"{self._select()}{self._where()}{self.order_clause()} "
+               f"LIMIT {self.page_size} OFFSET {start_row}")
+        return sql, list(self.params)
+
+    def after_query(self, key):
+        """Return (sql, params) for the rows following key (continuous scrolling)"""
+        return self._seek(key, self.sort_descending)
+
+    def range_query(self, low, high, columns=None):
+        """Return (sql, params) for the matching rows with a rowid key in [low, high), in key order
+
+        columns replaces the page's select list, e.g. with the key or COUNT(*).
+        """
+        key = self._column(self.key_columns[0])
+        select = self._select() if columns is None else f"SELECT {columns} FROM {quote_identifier(self.table)}"
+        sql = f"{select}{self._where(f'{key} >= ? AND {key} < ?')} ORDER BY {key}"
+        return sql, self.params + [low, high]
+
+    def record_page(self, page, first_key, last_key, row_count):
+        """Remember the boundary keys of a loaded page"""
+        if not self.uses_keyset or not row_count:
+            return
+        self.first_keys[page] = tuple(first_key)
+        if row_count == self.page_size:
+            self.boundaries[page + 1] = tuple(last_key)
+
+    def sample_query(self):
+        """Return (sql, params) that lists every key in order for sampling"""
+        columns = ", ".join(quote_identifier(col) for col in self.order_columns)
+        sql = f"SELECT {columns} FROM {quote_identifier(self.table)}{self._where()}{self.order_clause()}"
+        return sql, list(self.params)
+
+    def collect_samples(self, conn, stride=1000):
+        """Scan the keys once and keep every stride-th one; returns the row count"""
+        sql, params = self.sample_query()
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        samples = []
+        total = 0
+        while True:
+            batch = cursor.fetchmany(stride)
+            if not batch:
+                break
+            samples.append(tuple(batch[0]))
+            total += len(batch)
+        return samples, stride, total
+
+    def set_samples(self, samples, stride):
+        self.samples = samples
+        self.sample_stride = stride
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Parallel Scan
+Unindexed searches split into rowid ranges that several connections scan at once
+"""
+
+import os
+import queue
+import time
+from array import array
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from row_counts import RowCounter
+from sql_utils import quote_identifier
+
+# Parallel search settings that can be customized
+SCAN_CONFIG = {
+    'connections': min(8, os.cpu_count() or 1),  # Read connections scanning at once
+    'shards_per_connection': 4,  # More shards than connections, so a dense range cannot hold up the rest
+    'min_rows': 1000000,  # Smaller tables are searched with one sequential scan
+    'max_keys': 250000,  # Matching keys kept so later pages can seek straight to their first row
+    'sample_rows': 64,  # Rows read at the start of each connection's share to estimate bytes per row
+    'progress_interval': 100000,  # VM steps between cancellation checks on the scanning connections
+}
+
+ShardResult = namedtuple('ShardResult', ['index', 'rows', 'keys', 'count', 'seconds'])
+
+
+def shard_bounds(low, high, shards):
+    """Split the rowids low..high into at most shards half-open ranges [start, end)"""
+    span = high - low + 1
+    shards = max(1, min(shards, span))
+    step = -(-span // shards)  # Ceiling division
+    return [(start, min(start + step, high + 1)) for start in range(low, high + 1, step)]
+
+
+def value_bytes(value):
+    """Approximate bytes a value takes in a record"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8", "surrogatepass"))
+    if isinstance(value, bytes):
+        return len(value)
+    return 8
+
+
+class ShardedScan:
+    """One filtered scan of a rowid table in key order, split into shards scanned at once
+
+    Each shard reads one rowid range on a connection of its own; the sqlite3
+    module releases the GIL while SQLite steps through the table, so shards
+    run on separate cores and the scan is bound by the disk, not one core.
+    A shard keeps its first page of matches and, while there are not too
+    many, the keys of all of them; ShardMerge puts both back in key order
+    as the shards finish.
+    """
+
+    def __init__(self, paginator, key, connections=None):
+        self.paginator = paginator
+        self.key = key
+        self.connections = connections or SCAN_CONFIG['connections']
+        self.bounds = []
+        self.span = 0
+        self.table_bytes = 0  # Estimated size of the table's records
+
+    def prepare(self, conn):
+        """Split the table into shards; False when it is too small to be worth it"""
+        if self.connections < 2:
+            return False
+        counter = RowCounter(self.paginator.table, [self.key])
+        low, high = counter.rowid_bounds(conn)
+        if low is None:
+            return False
+        rows = counter.estimate(conn)
+        if rows < SCAN_CONFIG['min_rows']:
+            return False
+        self.bounds = shard_bounds(low, high, self.connections * SCAN_CONFIG['shards_per_connection'])
+        self.span = high - low + 1
+        self.table_bytes = rows * self.row_bytes(conn, low, high)
+        return True
+
+    def row_bytes(self, conn, low, high):
+        """Average record size from a few rows at the start of each connection's share"""
+        sql = (f"SELECT * FROM {quote_identifier(self.paginator.table)} "
+               f"WHERE {quote_identifier(self.key)} >= ? ORDER BY {quote_identifier(self.key)} LIMIT ?")
+        total = 0
+        count = 0
+        for start, _ in shard_bounds(low, high, self.connections):
+            for row in conn.execute(sql, (start, SCAN_CONFIG['sample_rows'])):
+                total += sum(value_bytes(value) for value in row)
+                count += 1
+        return total / count if count else 0
+
+    def shard_bytes(self, index):
+        """Estimated bytes a shard reads, from its share of the rowid range"""
+        start, end = self.bounds[index]
+        return self.table_bytes * (end - start) / self.span if self.span else 0
+
+    def column_names(self, conn):
+        """Column names of the scan's rows, from a query over an empty range"""
+        start = self.bounds[0][0]
+        cursor = conn.execute(*self.paginator.range_query(start, start))
+        names = [description[0] for description in cursor.description]
+        cursor.close()
+        return names
+
+    def scan_shard(self, connections, index):
+        """Read one shard on a free connection and return its ShardResult
+
+        Only the first page of rows and up to a share of max_keys keys pass
+        through Python; past that, SQLite counts the rest of the range.
+        Each statement starts after the last key of the one before, so the
+        range is still read once.
+        """
+        conn = connections.get()
+        try:
+            started = time.perf_counter()
+            start, end = self.bounds[index]
+            key = quote_identifier(self.key)
+            cursor = conn.execute(*self.paginator.range_query(start, end))
+            rows = cursor.fetchmany(self.paginator.page_size)
+            cursor.close()
+            keys = array('q', (row[0] for row in rows))
+            count = len(rows)
+            if len(rows) == self.paginator.page_size:
+                key_limit = max(1, SCAN_CONFIG['max_keys'] // len(self.bounds))
+                sql, params = self.paginator.range_query(rows[-1][0] + 1, end, key)
+                more = conn.execute(f"{sql} LIMIT {key_limit}", params).fetchall()
+                keys.extend(value for (value,) in more)
+                count += len(more)
+                if len(more) == key_limit:
+                    keys = None  # Too many to keep; later pages seek from page boundaries
+                    sql, params = self.paginator.range_query(more[-1][0] + 1, end, "COUNT(*)")
+                    count += conn.execute(sql, params).fetchone()[0]
+            return ShardResult(index, rows, keys, count, time.perf_counter() - started)
+        finally:
+            connections.put(conn)
+
+    def run(self, connections):
+        """Scan every shard, spread over the connections; yields ShardResults as shards finish
+
+        Shards are queued in key order, so the first shards tend to finish
+        first and the first page of matches is complete early.
+        """
+        free = queue.Queue()
+        for conn in connections:
+            free.put(conn)
+        with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+            futures = [executor.submit(self.scan_shard, free, index) for index in range(len(self.bounds))]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+class ShardMerge:
+    """Puts the results of a ShardedScan back in key order as shards finish"""
+
+    def __init__(self, scan):
+        self.scan = scan
+        self.page_size = scan.paginator.page_size
+        self.pending = {}  # Finished shards waiting for an earlier one
+        self.next_index = 0  # First shard whose rows are not merged yet
+        self.count = 0  # Matches in every finished shard
+        self.shown = 0  # Rows of the first page merged so far
+        self.keys = array('q')
+        self.keys_complete = True
+        self.finished = 0
+        self.bytes_scanned = 0
+
+    @property
+    def done(self):
+        return self.finished == len(self.scan.bounds)
+
+    @property
+    def page_complete(self):
+        """True when the first page can no longer change"""
+        return self.shown == self.page_size or self.done
+
+    def add(self, result):
+        """Take a finished shard; returns the first page rows that are now known to be in order"""
+        self.finished += 1
+        self.count += result.count
+        self.bytes_scanned += self.scan.shard_bytes(result.index)
+        self.pending[result.index] = result
+        rows = []
+        while self.next_index in self.pending:
+            shard = self.pending.pop(self.next_index)
+            self.next_index += 1
+            if self.shown < self.page_size:
+                taken = shard.rows[:self.page_size - self.shown]
+                rows.extend(taken)
+                self.shown += len(taken)
+            if self.keys_complete and shard.keys is not None \
+                    and len(self.keys) + len(shard.keys) <= SCAN_CONFIG['max_keys']:
+                self.keys.extend(shard.keys)
+            else:
+                self.keys_complete = False
+                self.keys = array('q')
+        return rows
+
+    def samples(self):
+        """Key of the first row of every page, for KeysetPaginator.set_samples, or None"""
+        if not self.done or not self.keys_complete or not self.keys:
+            return None
+        return [(key,) for key in self.keys[::self.page_size]]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Query Plans
+EXPLAIN QUERY PLAN helpers that tell whether a query is served by an index
+"""
+
+import re
+
+INDEX_PATTERN = re.compile(r"\bUSING (?:COVERING )?INDEX (\S+)")
+
+
+def explain(conn, sql, params=()):
+    """Return the plan of a query as (id, parent, detail) rows"""
+    return [(row[0], row[1], row[-1]) for row in conn.execute("EXPLAIN QUERY PLAN " + sql, list(params))]
+
+
+def format_plan(plan):
+    """Indent plan details as a tree, like the sqlite3 shell does"""
+    depth = {}
+    lines = []
+    for node_id, parent, detail in plan:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return "\n".join(lines)
+
+
+def indexes_used(plan):
+    """Names of the indexes the plan searches or scans"""
+    names = []
+    for _, _, detail in plan:
+        match = INDEX_PATTERN.search(detail)
+        if match and match.group(1) not in names:
+            names.append(match.group(1))
+    return names
+
+
+def sorts_in_temp_btree(plan):
+    """True when SQLite has to sort the rows itself instead of reading them in index order"""
+    return any("TEMP B-TREE" in detail and "ORDER BY" in detail for _, _, detail in plan)
+
+
+def full_scans(plan):
+    """Plan steps that read a whole table or index; CONSTANT ROW and virtual tables do not"""
+    return [detail for _, _, detail in plan
+            if detail.startswith("SCAN ") and "CONSTANT ROW" not in detail and "VIRTUAL TABLE" not in detail]
+
+
+class FilterPlan:
+    """Whether SQLite finds the rows matching a filter through an index or reads them all"""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.indexes = indexes_used(plan)
+        self.full_scan = bool(full_scans(plan))
+        self.search_index = any("VIRTUAL TABLE" in detail for _, _, detail in plan)
+
+    @classmethod
+    def explain(cls, conn, sql, params=()):
+        """Plan of a filtered query as the grid runs it; ORDER BY and LIMIT can change the plan"""
+        return cls(explain(conn, sql, params))
+
+    def summary(self):
+        if self.full_scan:
+            return "full scan"
+        if self.search_index:
+            return "search index"
+        if self.indexes:
+            return f"index {self.indexes[0]}"
+        return "primary key"
+
+
+class SortPlan:
+    """How SQLite will produce the rows of a sorted query"""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.indexes = indexes_used(plan)
+        self.temp_btree = sorts_in_temp_btree(plan)
+
+    @classmethod
+    def explain(cls, conn, sql, params=()):
+        return cls(explain(conn, sql, params))
+
+    def summary(self):
+        if self.temp_btree:
+            return "no index, sorted in a temp B-tree"
+        if self.indexes:
+            return f"index {self.indexes[0]}"
+        return "table order"
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Row Counts
+Instant row count estimates, progressive exact counts and a count cache
+"""
+
+from collections import OrderedDict
+
+from schema_catalog import ROWID_ALIASES
+from sql_utils import quote_identifier
+
+
+def stat1_row_count(conn, table):
+    """Row count recorded by ANALYZE in sqlite_stat1, or None"""
+    try:
+        rows = conn.execute("SELECT idx, stat FROM sqlite_stat1 WHERE tbl = ?", (table,)).fetchall()
+    except Exception:
+        return None  # No sqlite_stat1 table (ANALYZE never ran)
+    # The first number of every stat entry is the row count; prefer the table's own entry
+    for idx, stat in sorted(rows, key=lambda row: row[0] is not None):
+        try:
+            return int(str(stat).split()[0])
+        except (ValueError, IndexError):
+            continue
+    return None
+
+
+class RowCounter:
+    """Counts the rows of a table, optionally filtered, in progressive steps
+
+    count_steps() yields ('estimate', n) first when an estimate is available,
+    then ('partial', n) after each rowid range and finally ('exact', n).
+    """
+
+    chunk_count = 32  # Rowid ranges counted separately to report progress
+    min_chunk_span = 100000
+
+    def __init__(self, table, key_columns, condition="", params=None):
+        self.table = table
+        self.key_columns = list(key_columns)
+        self.condition = condition
+        self.params = list(params or [])
+
+    @property
+    def rowid_key(self):
+        """The rowid alias when the table is keyed by rowid, else None"""
+        if len(self.key_columns) == 1 and self.key_columns[0] in ROWID_ALIASES:
+            return self.key_columns[0]
+        return None
+
+    def rowid_bounds(self, conn):
+        """(min, max) rowid; separate subqueries so each is a single b-tree seek"""
+        table = quote_identifier(self.table)
+        key = self.rowid_key
+        return conn.execute(f"SELECT (SELECT min({key}) FROM {table}), (SELECT max({key}) FROM {table})").fetchone()
+
+    def _where(self, extra=None):
+        conditions = [f"({self.condition})"] if self.condition else []
+        if extra:
+            conditions.append(extra)
+        return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def estimate(self, conn):
+        """Cheap O(log n) estimate for an unfiltered table, or None"""
+        if self.condition:
+            return None
+        count = stat1_row_count(conn, self.table)
+        if count is not None:
+            return count
+        key = self.rowid_key
+        if key:
+            low, high = self.rowid_bounds(conn)
+            return 0 if low is None else high - low + 1
+        return None
+
+    def count_steps(self, conn, cancelled=lambda: False):
+        """Yield (kind, count) steps ending with ('exact', n)"""
+        estimate = self.estimate(conn)
+        if estimate is not None:
+            yield ('estimate', estimate)
+
+        table = quote_identifier(self.table)
+        key = self.rowid_key
+        own_transaction = not conn.in_transaction  # Else counted in the caller's snapshot
+        if own_transaction:
+            conn.execute("BEGIN")  # One snapshot for every range
+        try:
+            if not key:
+                count = conn.execute(f"SELECT COUNT(*) FROM {table}{self._where()}", self.params).fetchone()[0]
+                yield ('exact', count)
+                return
+
+            low, high = self.rowid_bounds(conn)
+            if low is None:
+                yield ('exact', 0)
+                return
+
+            span = max(self.min_chunk_span, (high - low + 1) // self.chunk_count + 1)
+            query = f"SELECT COUNT(*) FROM {table}{self._where(f'{key} >= ? AND {key} < ?')}"
+            total = 0
+            start = low
+            while start <= high:
+                if cancelled():
+                    return
+                total += conn.execute(query, self.params + [start, start + span]).fetchone()[0]
+                start += span
+                if start <= high:
+                    yield ('partial', total)
+            yield ('exact', total)
+        finally:
+            if own_transaction:
+                conn.commit()
+
+
+class RowCountCache:
+    """Exact counts per (table, filter), valid while PRAGMA data_version is unchanged"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (data_version, count)
+
+    @staticmethod
+    def key(table, condition, params):
+        return (table, condition, tuple(params))
+
+    def get(self, key, data_version):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != data_version:
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, data_version, count):
+        self.entries[key] = (data_version, count)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Schema Catalog
+In-memory table, column and index metadata keyed by PRAGMA schema_version
+"""
+
+import re
+import threading
+from collections import namedtuple
+
+from sql_utils import quote_identifier
+
+ColumnInfo = namedtuple('ColumnInfo', ['name', 'type', 'notnull', 'default', 'pk'])
+IndexInfo = namedtuple('IndexInfo', ['name', 'columns', 'unique', 'origin', 'partial'])
+
+ROWID_ALIASES = ("rowid", "_rowid_", "oid")
+
+
+def type_affinity(decl_type):
+    """Column affinity of a declared type, using SQLite's affinity rules"""
+    decl_type = (decl_type or "").upper()
+    if "INT" in decl_type:
+        return 'INTEGER'
+    if "CHAR" in decl_type or "CLOB" in decl_type or "TEXT" in decl_type:
+        return 'TEXT'
+    if not decl_type or "BLOB" in decl_type:
+        return 'BLOB'
+    if "REAL" in decl_type or "FLOA" in decl_type or "DOUB" in decl_type:
+        return 'REAL'
+    return 'NUMERIC'
+
+
+class TableInfo:
+    """Metadata for one table or view; columns and indexes are loaded on demand"""
+
+    def __init__(self, name, kind, sql):
+        self.name = name
+        self.kind = kind  # 'table' or 'view'
+        self.sql = sql
+        self.without_rowid = bool(kind == 'table' and sql and
+                                  re.search(r'\bWITHOUT\s+ROWID\b', sql, re.IGNORECASE))
+        self.columns = None
+        self.indexes = None
+
+    @property
+    def loaded(self):
+        return self.columns is not None and self.indexes is not None
+
+    @property
+    def column_names(self):
+        return [col.name for col in self.columns or []]
+
+    def primary_key(self):
+        """Primary key columns in key order"""
+        return [col.name for col in sorted(self.columns or [], key=lambda col: col.pk) if col.pk]
+
+    def key_columns(self):
+        """Columns that uniquely order the rows, or [] when only OFFSET works"""
+        if self.kind != 'table':
+            return []
+        if not self.without_rowid:
+            names = {name.lower() for name in self.column_names}
+            for alias in ROWID_ALIASES:
+                if alias not in names:
+                    return [alias]
+        return self.primary_key()
+
+    def is_nullable(self, column_name):
+        """Whether a column can hold NULL; rowid aliases and WITHOUT ROWID keys cannot"""
+        for col in self.columns or []:
+            if col.name != column_name:
+                continue
+            if col.notnull:
+                return False
+            if col.pk and (self.without_rowid or
+                           (col.type.upper() == "INTEGER" and len(self.primary_key()) == 1)):
+                return False
+            return True
+        return True
+
+    def text_columns(self):
+        """Columns with TEXT affinity (VARCHAR(255), CLOB, ...) or no declared type"""
+        return [col.name for col in self.columns or []
+                if type_affinity(col.type) == 'TEXT' or not col.type.strip()]
+
+    def column_type(self, column_name):
+        """Declared type of a column, "" if it has none or does not exist"""
+        for col in self.columns or []:
+            if col.name == column_name:
+                return col.type
+        return ""
+
+
+class SchemaCatalog:
+    """Catalog of the database schema, re-read only when schema_version changes"""
+
+    def __init__(self):
+        self.schema_version = None
+        self.tables = {}  # name -> TableInfo, in name order
+        self.statements = []  # (type, name, sql) for every schema object with SQL
+        self._lock = threading.Lock()
+
+    def refresh(self, conn):
+        """Reload object names if the schema changed; returns True when reloaded"""
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        if version == self.schema_version:
+            return False
+
+        rows = conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall()
+        tables = {}
+        for kind, name, sql in rows:
+            if kind in ('table', 'view'):
+                tables[name] = TableInfo(name, kind, sql)
+        statements = sorted((row for row in rows if row[2] is not None), key=lambda row: (row[0], row[1]))
+
+        with self._lock:
+            self.tables = tables
+            self.statements = statements
+            self.schema_version = version
+        return True
+
+    def table_names(self, kind='table'):
+        return [name for name, info in self.tables.items() if info.kind == kind]
+
+    def get(self, name):
+        return self.tables.get(name)
+
+    def load_columns(self, conn, names=None):
+        """Fill column and index info for the named tables (all when names is None)"""
+        tables = self.tables
+        if names is None:
+            pending = [info for info in tables.values() if not info.loaded]
+            if len(pending) > 1:
+                try:
+                    self._load_all(conn, tables)
+                    return
+                except Exception:
+                    pass  # A broken view makes the bulk query fail; load one by one
+        else:
+            pending = [tables[name] for name in names if name in tables and not tables[name].loaded]
+
+        for info in pending:
+            try:
+                self._load_table(conn, info)
+            except Exception:
+                info.columns, info.indexes = [], []
+
+    def _load_table(self, conn, info):
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA table_info({quote_identifier(info.name)})")
+        columns = [ColumnInfo(row[1], row[2] or "", bool(row[3]), row[4], row[5]) for row in cursor.fetchall()]
+
+        indexes = []
+        if info.kind == 'table':
+            cursor.execute(f"PRAGMA index_list({quote_identifier(info.name)})")
+            for row in cursor.fetchall():
+                index_name, unique, origin, partial = row[1], row[2], row[3], row[4]
+                cursor.execute(f"PRAGMA index_info({quote_identifier(index_name)})")
+                index_columns = [col[2] for col in sorted(cursor.fetchall())]
+                indexes.append(IndexInfo(index_name, index_columns, bool(unique), origin, bool(partial)))
+
+        info.indexes = indexes
+        info.columns = columns
+
+    def _load_all(self, conn, tables):
+        """Load every table's columns and indexes with two table-valued pragma queries"""
+        columns = {}
+        for name, cid, col, decl_type, notnull, default, pk in conn.execute(
+                "SELECT m.name, p.cid, p.name, p.type, p.\"notnull\", p.dflt_value, p.pk "
+                "FROM sqlite_master m, pragma_table_info(m.name) p "
+                "WHERE m.type IN ('table', 'view') ORDER BY m.name, p.cid"):
+            columns.setdefault(name, []).append(ColumnInfo(col, decl_type or "", bool(notnull), default, pk))
+
+        indexes = {}
+        for name, index_name, unique, origin, partial, col in conn.execute(
+                "SELECT m.name, il.name, il.\"unique\", il.origin, il.partial, ii.name "
+                "FROM sqlite_master m, pragma_index_list(m.name) il, pragma_index_info(il.name) ii "
+                "WHERE m.type = 'table' ORDER BY m.name, il.name, ii.seqno"):
+            table_indexes = indexes.setdefault(name, {})
+            if index_name not in table_indexes:
+                table_indexes[index_name] = IndexInfo(index_name, [], bool(unique), origin, bool(partial))
+            table_indexes[index_name].columns.append(col)
+
+        for name, info in tables.items():
+            if not info.loaded:
+                info.indexes = list(indexes.get(name, {}).values())
+                info.columns = columns.get(name, [])
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer Snapshots
+Read transactions that tie the rows, counts and caches to one database state
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+SNAPSHOT_ATTEMPTS = 3  # Tries to start a transaction between two commits of a busy writer
+
+
+def journal_mode(conn):
+    return conn.execute("PRAGMA journal_mode").fetchone()[0].lower()
+
+
+def begin_read(conn, source, attempts=SNAPSHOT_ATTEMPTS):
+    """Start a read transaction on conn and return the data_version it reads, or None
+
+    In WAL mode the first read of a transaction fixes the state it sees,
+    without blocking writers. PRAGMA data_version is read through the
+    source's monitor connection before and after that read; if a writer
+    committed in between, the transaction could hold either state, so it is
+    started again. None means no attempt landed between two commits. A
+    connection already in a transaction belongs to a PinnedSnapshot.
+    """
+    if conn.in_transaction:
+        return source.version
+    return begin_reads([conn], source, attempts)
+
+
+def begin_reads(connections, source, attempts=SNAPSHOT_ATTEMPTS):
+    """Start read transactions on several connections that all read the same state
+
+    Every transaction has to start between the same two commits, so rows
+    read on one connection line up with the rows read on the others.
+    Returns the data_version, or None like begin_read.
+    """
+    for attempt in range(attempts):
+        before = source.data_version()
+        for conn in connections:
+            conn.execute("BEGIN")
+            conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        if source.data_version() == before:
+            return before
+        if attempt < attempts - 1:
+            for conn in connections:
+                conn.rollback()
+    return None
+
+
+class PinnedSnapshot:
+    """One pooled connection held in a read transaction, standing in for the pool
+
+    Workers borrow its connection() like a pool's, one at a time, and all
+    read the state of the moment it was pinned. On a WAL database writers
+    carry on meanwhile; SQLite only stops checkpoints from recycling the WAL
+    file until the snapshot is released. Python's sqlite3 module has no
+    snapshot handles, so the transaction itself has to stay open.
+    release() never waits for a reader: it interrupts the one holding the
+    connection, which hands the connection back to the pool on its way out.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.conn = pool.acquire()
+        try:
+            data_version = begin_read(self.conn, pool)
+        except Exception:
+            pool.release(self.conn)
+            raise
+        if data_version is None:
+            pool.release(self.conn)
+            raise sqlite3.OperationalError("The database changed while pinning; try again")
+        self.data_version = data_version
+        self.version = ('pinned', data_version, id(self))  # Cache key of the pinned state
+        self.pinned_at = time.time()
+        self.released = False
+        self.borrowed = False
+        self._lock = threading.Lock()  # Held by the reader using the connection
+        self._state_lock = threading.Lock()  # Guards released and borrowed, never held for long
+
+    @contextmanager
+    def connection(self):
+        """Borrow the pinned connection for the duration of a with block"""
+        with self._lock:
+            with self._state_lock:
+                if self.released:
+                    raise sqlite3.ProgrammingError("Snapshot was released")
+                self.borrowed = True
+            try:
+                yield self.conn
+            finally:
+                with self._state_lock:
+                    self.borrowed = False
+                    returned = self.released
+                if returned:
+                    self.pool.release(self.conn)  # Released while in use; the last reader hands it back
+
+    def release(self):
+        """End the read transaction without waiting for the reader, if any
+
+        An idle connection goes back to the pool right away, which rolls the
+        read transaction back; a busy one is interrupted and goes back when
+        its reader leaves connection(). Readers still waiting get an error.
+        """
+        with self._state_lock:
+            if self.released:
+                return
+            self.released = True
+            busy = self.borrowed
+        if busy:
+            self.conn.interrupt()
+        else:
+            self.pool.release(self.conn)
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+OJDB Viewer SQL helpers
+Small utilities shared by the query building modules
+"""
+
+
+def quote_identifier(name):
+    """Quote a table or column name for use in SQL"""
+    return '"' + str(name).replace('"', '""') + '"'
@@ -5,51 +5,1220 @@ A Python Qt5 application for browsing SQLite database files.
 """
 
 import sys
-import sqlite3
 import os
+import re
+import copy
+import threading
+import time
+STARTED = time.perf_counter()  # Reference point of --profile-startup
+from contextlib import contextmanager
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem,
+                             QHBoxLayout, QPushButton, QTableView, QAbstractItemView,
                              QTreeWidget, QTreeWidgetItem, QSplitter, QFileDialog,
                              QMessageBox, QLineEdit, QLabel, QHeaderView, QTabWidget,
-                             QTextEdit, QComboBox, QSpinBox, QStatusBar)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QFont, QIcon
+                             QTextEdit, QComboBox, QSpinBox, QStatusBar, QCheckBox,
+                             QProgressBar, QProgressDialog, QDialog, QPlainTextEdit,
+                             QDialogButtonBox, QFormLayout, QShortcut, QDockWidget, QMenu)
+from PyQt5.QtCore import (Qt, QObject, QTimer, pyqtSignal, QAbstractTableModel, QModelIndex,
+                          QRunnable, QThreadPool, QFileSystemWatcher)
+from PyQt5.QtGui import QFont, QIcon, QIntValidator, QKeySequence, QTextCursor
+QT_IMPORTED = time.perf_counter()
 
+from cell_values import LENGTH_ALIAS, ValueReader, format_size, hex_dump, preview_select, preview_text, text_decoder
+from column_profile import ColumnProfiler, ProfileCache
+from column_widths import MAX_CHARS, SAMPLE_ROWS, estimate_chars
+from connection_pool import POOL_CONFIG, ConnectionPool
+from exporter import EXPORT_FORMATS, ExportJob, format_duration
+from filters import FILTER_MODES, column_filter, index_usable, search_placeholder
+from fts_index import ATTACH_ALIAS, SearchIndex
+from index_advisor import ADVISOR_CONFIG, IndexAdvisor, QueryShape, ScratchCopy, Workload, try_index
+from instrumentation import QueryLog, StatementTracer
+from page_cache import PAGE_CACHE_CONFIG, PageCache
+from pagination import KeysetPaginator
+from parallel_scan import SCAN_CONFIG, ShardedScan, ShardMerge
+from query_plan import FilterPlan, SortPlan, explain, format_plan
+from row_counts import RowCountCache, RowCounter
+from schema_catalog import ROWID_ALIASES, SchemaCatalog
+from snapshots import PinnedSnapshot, begin_read, begin_reads, journal_mode
+from sql_utils import quote_identifier
+MODULES_IMPORTED = time.perf_counter()
 
-class DatabaseWorker(QThread):
-    """Worker thread for database operations to prevent UI freezing"""
-    data_ready = pyqtSignal(list, list)  # data, column_names
+# Worker thread settings shared by every open window
+WORKER_CONFIG = {
+    'max_threads': 4,  # Queries running at once across all databases; the rest wait in a queue
+}
+
+# Live refresh settings that can be customized
+LIVE_CONFIG = {
+    'poll_interval_ms': 1000,  # PRAGMA data_version checks, for changes file watching misses
+    'debounce_ms': 100,  # Delay after a file change notification, so a burst of writes is checked once
+}
+
+# Origins a user is waiting for; they are taken from the queue before background work
+INTERACTIVE_ORIGINS = ('page', 'console', 'cell', 'tree', 'columns', 'combo', 'samples', 'plan')
+
+_thread_pool = None
+
+
+def thread_pool():
+    """The thread pool every worker of every window runs on"""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setMaxThreadCount(WORKER_CONFIG['max_threads'])
+    return _thread_pool
+
+
+class WorkerRunnable(QRunnable):
+    """Runs a worker on a thread of the shared pool and reports when it is done"""
+    
+    def __init__(self, worker):
+        super().__init__()
+        self.worker = worker
+        self.setAutoDelete(False)  # Owned by the worker
+    
+    def run(self):
+        worker = self.worker
+        try:
+            if not worker.cancelled:  # Cancelled while it waited in the queue
+                worker.run()
+        finally:
+            worker.done.set()
+            worker.finished.emit()
+
+
+class CancellableWorker(QObject):
+    """Base worker whose running statement can be interrupted
+    
+    Workers run on the shared thread pool rather than a thread of their own,
+    so opening several large databases does not start dozens of threads
+    competing for the disk.
+    """
     error_occurred = pyqtSignal(str)
+    finished = pyqtSignal()
+    origin = 'task'  # Label of the worker's statements in the query log
     
-    def __init__(self, db_path, query, params=None):
+    def __init__(self, pool):
         super().__init__()
-        self.db_path = db_path
+        self.pool = pool
+        self.generation = None  # Set by QueryController.start
+        self.detached = False  # Keeps running when its generation is superseded
+        self.query_log = None  # Set by QueryController.start
+        self.cancelled = False
+        self.conn = None
+        self.tracer = None
+        self.conn_lock = threading.Lock()
+        self.runnable = None  # Set by start
+        self.done = threading.Event()
+    
+    def start(self, priority=0):
+        """Queue the worker on the shared thread pool; higher priorities run first"""
+        self.runnable = WorkerRunnable(self)
+        thread_pool().start(self.runnable, priority)
+    
+    def is_running(self):
+        """True from start() until the worker has finished, including time in the queue"""
+        return self.runnable is not None and not self.done.is_set()
+    
+    def wait(self, timeout=None):
+        """Block until the worker has finished; timeout is in seconds"""
+        return self.runnable is None or self.done.wait(timeout)
+    
+    @property
+    def vm_steps(self):
+        """VM steps of every statement run so far, in progress handler units"""
+        return self.tracer.total_steps if self.tracer is not None else 0
+    
+    def cancel(self):
+        """Stop the query as soon as possible; its results are never emitted"""
+        self.cancelled = True
+        if self.runnable is not None and not self.done.is_set() and thread_pool().tryTake(self.runnable):
+            # Never started: free its place in the queue right away
+            self.done.set()
+            self.finished.emit()
+            return
+        with self.conn_lock:
+            if self.conn is not None:
+                self.conn.interrupt()
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection that aborts when the worker is cancelled"""
+        with self.pool.connection() as conn:
+            # The tracer's progress handler also catches a cancel that lands before execute()
+            tracer = StatementTracer(self.query_log, self.origin, lambda: self.cancelled)
+            tracer.install(conn)
+            with self.conn_lock:
+                self.conn = conn
+                self.tracer = tracer
+            try:
+                yield conn
+            finally:
+                with self.conn_lock:
+                    self.conn = None
+                tracer.remove(conn)
+    
+    def report_error(self, error):
+        # Releasing a pinned snapshot interrupts or turns away its readers; that is not worth a dialog
+        if not self.cancelled and not getattr(self.pool, 'released', False):
+            self.error_occurred.emit(str(error))
+
+
+class DatabaseWorker(CancellableWorker):
+    """Worker thread for database operations to prevent UI freezing"""
+    origin = 'page'
+    data_ready = pyqtSignal(list, list)  # data, column_names
+    columns_ready = pyqtSignal(list)  # column_names (streaming mode)
+    batch_ready = pyqtSignal(list)  # rows (streaming mode)
+    stream_finished = pyqtSignal(int)  # total rows streamed
+    
+    def __init__(self, pool, query, params=None, batch_size=None, max_rows=None, snapshot=False):
+        super().__init__(pool)
         self.query = query
         self.params = params or []
+        self.batch_size = batch_size  # Stream results in batches when set
+        self.max_rows = max_rows  # Stop streaming after this many rows
+        self.truncated = False  # True when max_rows cut the result short
+        self.first_row_seconds = None  # Time until the first row (streaming mode)
+        self.elapsed = None  # Total time (streaming mode)
+        self.snapshot = snapshot  # Read in a transaction whose data_version is known
+        self.snapshot_version = None  # data_version the rows were read at, None if unknown
     
     def run(self):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(self.query, self.params)
-            
-            data = cursor.fetchall()
-            column_names = [description[0] for description in cursor.description] if cursor.description else []
-            
-            conn.close()
-            self.data_ready.emit(data, column_names)
+            with self.connection() as conn:
+                if self.snapshot:
+                    self.snapshot_version = begin_read(conn, self.pool)
+                started = time.perf_counter()
+                cursor = conn.cursor()
+                cursor.execute(self.query, self.params)
+                column_names = [description[0] for description in cursor.description] if cursor.description else []
+                
+                if self.batch_size:
+                    self.columns_ready.emit(column_names)
+                    total = 0
+                    while not self.cancelled:
+                        size = self.batch_size
+                        if self.max_rows is not None:
+                            size = min(size, self.max_rows - total)
+                            if size <= 0:
+                                self.truncated = cursor.fetchone() is not None
+                                break
+                        batch = cursor.fetchmany(size)
+                        if self.first_row_seconds is None:
+                            self.first_row_seconds = time.perf_counter() - started
+                        if not batch:
+                            break
+                        total += len(batch)
+                        self.tracer.add_rows(len(batch))
+                        self.batch_ready.emit(batch)
+                    cursor.close()
+                    self.elapsed = time.perf_counter() - started
+                    if not self.cancelled:
+                        self.stream_finished.emit(total)
+                        self.after_stream(conn)
+                    return
+                
+                data = cursor.fetchall()
+                self.tracer.add_rows(len(data))
+                cursor.close()
+            if not self.cancelled:
+                self.data_ready.emit(data, column_names)
         except Exception as e:
-            self.error_occurred.emit(str(e))
+            self.report_error(e)
+    
+    def after_stream(self, conn):
+        """Hook run on the same connection and transaction once all rows were streamed"""
+
+
+class PageWorker(DatabaseWorker):
+    """Streams a page, then counts its rows in the same read transaction when needed
+    
+    The count is skipped when an exact count of the snapshot's data_version
+    is already known or being computed. Once the rows are in, the worker
+    detaches from its generation, so paging on does not interrupt the count.
+    """
+    count_started = pyqtSignal()
+    count_ready = pyqtSignal(int, str)  # count, kind ('estimate', 'partial' or 'exact')
+    
+    def __init__(self, pool, query, params, batch_size, snapshot=False, data_version=None,
+                 counter=None, count_known=True):
+        super().__init__(pool, query, params, batch_size=batch_size, snapshot=snapshot)
+        self.data_version = data_version  # Version the page was requested at
+        self.snapshot_version = data_version  # Replaced by the verified version in snapshot mode
+        self.counter = counter
+        self.count_known = count_known  # An exact count of data_version is cached or running
+        self.count_key = None  # Row count cache key, set by the caller with counter
+        self.quiet = False
+        self.shape = None  # QueryShape the index advisor records the timings under
+        self.count_seconds = None  # Time the exact count took
+    
+    @property
+    def count_version(self):
+        return self.snapshot_version
+    
+    def after_stream(self, conn):
+        if self.counter is None or self.cancelled:
+            return
+        if self.count_known and self.snapshot_version == self.data_version:
+            return
+        self.origin = 'count'
+        self.tracer.origin = 'count'
+        self.detached = True  # Outlives the page request, like a CountWorker
+        self.count_started.emit()
+        started = time.perf_counter()
+        for kind, count in self.counter.count_steps(conn, lambda: self.cancelled):
+            if self.cancelled:
+                break
+            if kind == 'exact':
+                self.count_seconds = time.perf_counter() - started
+            self.count_ready.emit(count, kind)
+
+
+class TaskWorker(CancellableWorker):
+    """Worker thread that runs a function against a pooled connection"""
+    result_ready = pyqtSignal(object)
+    
+    def __init__(self, pool, task):
+        super().__init__(pool)
+        self.task = task  # Callable taking a connection
+    
+    def run(self):
+        try:
+            with self.connection() as conn:
+                result = self.task(conn)
+            if not self.cancelled:
+                self.result_ready.emit(result)
+        except Exception as e:
+            self.report_error(e)
+
+
+class SearchWorker(PageWorker):
+    """Searches a large table on several connections at once when no index serves the filter
+    
+    A ShardedScan reads the first page and counts the matches in one pass,
+    in read transactions that all see the same commit. The page is streamed
+    once the shards before it are in, and the count follows as the other
+    shards finish. Filters an index can answer and small tables are read
+    the PageWorker way.
+    """
+    scan_progress = pyqtSignal(int, int, float, float)  # shards finished, shards, bytes scanned, seconds
+    samples_ready = pyqtSignal(list, int)  # key of the first row of every page, page size
+    
+    def __init__(self, pool, paginator, key, batch_size, data_version=None, counter=None):
+        query, params = paginator.page_query(0)
+        super().__init__(pool, query, params, batch_size, snapshot=True, data_version=data_version,
+                         counter=counter, count_known=False)
+        paginator = copy.copy(paginator)  # The window's paginator moves on with the next filter
+        self.scan = ShardedScan(paginator, key)
+        self.parallel = False  # Whether the table was searched in shards
+    
+    def run(self):
+        try:
+            with self.connection() as conn:
+                self.parallel = FilterPlan.explain(conn, self.query, self.params).full_scan and self.scan.prepare(conn)
+        except Exception as e:
+            self.report_error(e)
+            return
+        if not self.parallel:
+            super().run()
+            return
+        
+        connections = []
+        tracers = []
+        try:
+            for _ in range(self.scan.connections):
+                conn = self.pool.acquire()
+                connections.append(conn)
+                tracer = StatementTracer(self.query_log, self.origin, lambda: self.cancelled)
+                tracer.progress_interval = SCAN_CONFIG['progress_interval']
+                tracer.install(conn)
+                tracers.append(tracer)
+            self.scan_shards(connections, tracers)
+        except Exception as e:
+            self.report_error(e)
+        finally:
+            for conn, tracer in zip(connections, tracers):
+                tracer.remove(conn)
+            for conn in connections:
+                self.pool.release(conn)
+    
+    def scan_shards(self, connections, tracers):
+        self.snapshot_version = begin_reads(connections, self.pool)
+        started = time.perf_counter()
+        self.columns_ready.emit(self.scan.column_names(connections[0]))
+        merge = ShardMerge(self.scan)
+        streamed = False
+        for result in self.scan.run(connections):
+            if self.cancelled:
+                return
+            rows = merge.add(result)
+            if rows and not streamed:
+                self.batch_ready.emit(rows)
+            seconds = time.perf_counter() - started
+            self.scan_progress.emit(merge.finished, len(self.scan.bounds), merge.bytes_scanned, seconds)
+            if not streamed and merge.page_complete:
+                streamed = True
+                self.elapsed = seconds
+                self.stream_finished.emit(merge.shown)
+                self.origin = 'count'
+                for tracer in tracers:
+                    tracer.origin = 'count'
+                self.detached = True  # Outlives the page request, like a CountWorker
+                self.count_started.emit()
+            if streamed and not merge.done:
+                self.count_ready.emit(merge.count, 'partial')
+        if self.cancelled:
+            return
+        self.count_seconds = time.perf_counter() - started
+        self.count_ready.emit(merge.count, 'exact')
+        samples = merge.samples()
+        if samples is not None:
+            self.samples_ready.emit(samples, merge.page_size)
+
+
+class CountWorker(CancellableWorker):
+    """Worker thread that reports an estimate, then progressively exact row counts"""
+    origin = 'count'
+    count_ready = pyqtSignal(int, str)  # count, kind ('estimate', 'partial' or 'exact')
+    
+    def __init__(self, pool, counter, count_key, data_version, snapshot=False):
+        super().__init__(pool)
+        self.counter = counter
+        self.count_key = count_key
+        self.data_version = data_version  # Version the count was requested at
+        self.count_version = data_version  # Version the exact count will be cached under
+        self.snapshot = snapshot  # Count in a transaction whose data_version is known
+        self.quiet = False  # Report only the exact count, keeping the previous one on screen
+        self.shape = None  # QueryShape the index advisor records the timing under
+        self.count_seconds = None  # Time the exact count took
+    
+    def run(self):
+        try:
+            with self.connection() as conn:
+                if self.snapshot:
+                    self.count_version = begin_read(conn, self.pool)
+                started = time.perf_counter()
+                for kind, count in self.counter.count_steps(conn, lambda: self.cancelled):
+                    if self.cancelled:
+                        break
+                    if kind == 'exact':
+                        self.count_seconds = time.perf_counter() - started
+                    self.count_ready.emit(count, kind)
+        except Exception as e:
+            self.report_error(e)
+
+
+class IndexBuildWorker(CancellableWorker):
+    """Worker thread that builds or catches up a table's search index"""
+    origin = 'index'
+    progress = pyqtSignal(int)  # percent
+    result_ready = pyqtSignal(int)  # rows indexed
+    
+    def __init__(self, pool, search_index, table, rowid_key, columns, rebuild=False):
+        super().__init__(pool)
+        self.search_index = search_index
+        self.table = table
+        self.rowid_key = rowid_key
+        self.columns = columns
+        self.rebuild = rebuild
+    
+    def run(self):
+        try:
+            with self.connection() as conn:
+                rows = self.search_index.build(conn, self.table, self.rowid_key, self.columns,
+                                               progress=self.progress.emit,
+                                               cancelled=lambda: self.cancelled,
+                                               rebuild=self.rebuild, data_version=self.pool.data_version())
+            self.result_ready.emit(rows)
+        except Exception as e:
+            self.report_error(e)
+
+
+class ExportWorker(CancellableWorker):
+    """Worker thread that streams an export to disk"""
+    origin = 'export'
+    progress = pyqtSignal(int, float, float)  # rows, rows per second, ETA seconds (-1 if unknown)
+    result_ready = pyqtSignal(object)  # rows written, or None when cancelled
+    
+    def __init__(self, pool, job):
+        super().__init__(pool)
+        self.job = job
+    
+    def run(self):
+        try:
+            with self.connection() as conn:
+                rows = self.job.run(
+                    conn, lambda rows, rate, eta: self.progress.emit(rows, rate, -1 if eta is None else eta),
+                    lambda: self.cancelled)
+            self.result_ready.emit(rows)
+        except Exception as e:
+            if self.cancelled:
+                self.result_ready.emit(None)
+            else:
+                self.report_error(e)
+
+
+class ValueReadWorker(CancellableWorker):
+    """Worker thread that streams one cell value to the viewer or to a file"""
+    origin = 'cell'
+    info_ready = pyqtSignal(str, int, str)  # storage class, size in bytes, codec of TEXT bytes
+    chunk_ready = pyqtSignal(bytes)
+    result_ready = pyqtSignal(int)  # bytes read
+    
+    def __init__(self, pool, reader, limit=None, path=None):
+        super().__init__(pool)
+        self.reader = reader
+        self.limit = limit  # Read at most this many bytes
+        self.path = path  # Write the value to this file instead of emitting chunks
+    
+    def run(self):
+        try:
+            with self.connection() as conn:
+                kind, size, codec = self.reader.info(conn)
+                self.info_ready.emit(kind, size, codec)
+                if self.limit is not None:
+                    size = min(size, self.limit)
+                if self.path:
+                    try:
+                        with open(self.path, "wb") as output:
+                            write = output.write
+                            if kind == 'text' and codec != 'utf-8':
+                                # Saved text is UTF-8 whatever the database encoding
+                                decoder = text_decoder(codec)
+                                write = lambda chunk: output.write(decoder.decode(chunk).encode("utf-8"))
+                            self.reader.read(conn, kind, size, write, lambda: self.cancelled)
+                    finally:
+                        if self.cancelled and os.path.exists(self.path):
+                            os.remove(self.path)  # Never leave a partial copy behind
+                else:
+                    self.reader.read(conn, kind, size, self.chunk_ready.emit, lambda: self.cancelled)
+            if not self.cancelled:
+                self.result_ready.emit(size)
+        except Exception as e:
+            self.report_error(e)
+
+
+class ProfileWorker(CancellableWorker):
+    """Worker that reports a column profile after each refinement step"""
+    origin = 'profile'
+    profile_ready = pyqtSignal(object)  # ColumnProfile
+    
+    def __init__(self, pool, profiler):
+        super().__init__(pool)
+        self.profiler = profiler
+    
+    def run(self):
+        try:
+            with self.connection() as conn:
+                for profile in self.profiler.profile_steps(conn, lambda: self.cancelled):
+                    if self.cancelled:
+                        break
+                    self.profile_ready.emit(profile)
+        except Exception as e:
+            self.report_error(e)
+
+
+class QueryController(QObject):
+    """Tracks running workers so superseded queries are interrupted and ignored
+    
+    Every user request bumps the generation; results from workers tagged with
+    an older generation never reach the views.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.running = set()  # Keeps workers alive until their thread finishes
+        self.log = QueryLog()  # Every statement run by the workers and connection()
+    
+    def next_generation(self):
+        """Start a new request generation, interrupting every superseded query"""
+        self.generation += 1
+        for worker in list(self.running):
+            if worker.generation is not None and not worker.detached:
+                worker.cancel()
+        return self.generation
+    
+    def start(self, worker, supersedable=True, origin=None):
+        """Start a worker tagged with the current generation"""
+        worker.generation = self.generation if supersedable else None
+        worker.query_log = self.log
+        if origin:
+            worker.origin = origin
+        self.running.add(worker)
+        worker.finished.connect(lambda w=worker: self.running.discard(w))
+        worker.start(1 if worker.origin in INTERACTIVE_ORIGINS else 0)
+        return worker
+    
+    def is_current(self, worker):
+        return worker.generation is None or worker.generation == self.generation
+    
+    @contextmanager
+    def connection(self, pool, origin):
+        """Borrow a pooled connection in the calling thread, logging its statements"""
+        with pool.connection() as conn:
+            tracer = StatementTracer(self.log, origin)
+            tracer.install(conn)
+            try:
+                yield conn
+            finally:
+                tracer.remove(conn)
+    
+    def cancel_all(self):
+        """Interrupt every running worker (e.g. when the database is closed)"""
+        self.generation += 1
+        for worker in list(self.running):
+            worker.cancel()
+
+
+class TableModel(QAbstractTableModel):
+    """Read-only model that keeps raw rows and formats cells only when displayed"""
+    fetch_more_requested = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.column_names = []
+        self.rows = []  # Raw tuples straight from the cursor
+        self.key_width = 0  # Hidden key columns at the start of each row
+        self.length_columns = {}  # Column -> hidden trailing column with the full length of cut values
+        self.first_row_number = 1  # Row number shown for the first buffered row
+        self.more_available = False
+        self.fetching = False
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.column_names)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            row = self.rows[index.row()]
+            value = row[index.column() + self.key_width]
+            length_column = self.length_columns.get(index.column())
+            if length_column is not None and row[length_column] is not None:
+                return preview_text(value, row[length_column])
+            return str(value) if value is not None else ""
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            if section < len(self.column_names):
+                return self.column_names[section]
+            return None
+        return str(self.first_row_number + section)
+    
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable  # Read-only
+    
+    def reset(self, column_names, first_row_number=1, key_width=0):
+        """Drop buffered rows and start a new result set"""
+        self.beginResetModel()
+        self.key_width = key_width
+        self.column_names = list(column_names[key_width:])
+        self.length_columns = {}
+        length_prefix = LENGTH_ALIAS.format("")
+        while self.column_names and self.column_names[-1].startswith(length_prefix):
+            position = key_width + len(self.column_names) - 1
+            self.length_columns[int(self.column_names.pop()[len(length_prefix):])] = position
+        self.rows = []
+        self.first_row_number = first_row_number
+        self.more_available = False
+        self.fetching = False
+        self.endResetModel()
+    
+    def append_rows(self, rows):
+        """Append a batch of rows streamed from a worker"""
+        if not rows:
+            return
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+    
+    def row_key(self, row):
+        """Return the hidden key values of a buffered row"""
+        return self.rows[row][:self.key_width]
+    
+    def is_cut(self, index):
+        """Whether the cell only holds a preview of a longer value"""
+        length_column = self.length_columns.get(index.column())
+        return length_column is not None and self.rows[index.row()][length_column] is not None
+    
+    def finish_fetch(self, more_available):
+        """Mark the current fetch as complete"""
+        self.fetching = False
+        self.more_available = more_available
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self.more_available and not self.fetching
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.canFetchMore():
+            return
+        self.fetching = True
+        self.fetch_more_requested.emit()
+
+
+class CellViewer(QDialog):
+    """Window showing the complete value of one cell, streamed in chunks"""
+    view_limit = 1024 * 1024  # Bytes read for display (text widgets slow down past this)
+    hex_limit = 256 * 1024  # Bytes shown in the hex view
+    
+    def __init__(self, pool, queries, reader, title, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(800, 600)
+        self.pool = pool
+        self.queries = queries
+        self.reader = reader
+        self.kind = None
+        self.size = 0
+        self.data = bytearray()
+        self.codec = 'utf-8'  # Encoding of TEXT bytes, from the database
+        self.decoder = text_decoder(self.codec)
+        self.save_worker = None
+        
+        layout = QVBoxLayout(self)
+        self.info_label = QLabel("Reading value...")
+        layout.addWidget(self.info_label)
+        
+        self.text_view = QPlainTextEdit()
+        self.text_view.setReadOnly(True)
+        self.text_view.setFont(QFont("Courier", 10))
+        layout.addWidget(self.text_view)
+        
+        button_layout = QHBoxLayout()
+        self.hex_checkbox = QCheckBox("Hex view")
+        self.hex_checkbox.toggled.connect(self.render)
+        button_layout.addWidget(self.hex_checkbox)
+        button_layout.addStretch()
+        self.save_button = QPushButton("Save As...")
+        self.save_button.clicked.connect(self.save_value)
+        button_layout.addWidget(self.save_button)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        
+        self.worker = ValueReadWorker(pool, reader, limit=self.view_limit)
+        self.worker.info_ready.connect(self.on_info)
+        self.worker.chunk_ready.connect(self.on_chunk)
+        self.worker.result_ready.connect(self.on_finished)
+        self.worker.error_occurred.connect(self.on_error)
+        self.queries.start(self.worker, supersedable=False)
+    
+    def on_info(self, kind, size, codec):
+        self.kind = kind
+        self.size = size
+        self.codec = codec
+        self.decoder = text_decoder(codec)
+        self.hex_checkbox.setChecked(kind == 'blob')  # Binary data is unreadable as text
+        if kind == 'null':
+            self.text_view.setPlainText("NULL")
+    
+    def on_chunk(self, chunk):
+        """Append a chunk; text is shown as it arrives, hex once reading is done"""
+        self.data += chunk
+        if not self.hex_checkbox.isChecked():
+            self.text_view.moveCursor(QTextCursor.End)
+            self.text_view.insertPlainText(self.decoder.decode(chunk))
+        self.info_label.setText(f"Reading {format_size(len(self.data))} of {format_size(self.size)}...")
+    
+    def on_finished(self, read):
+        text = f"{self.kind.upper()}, {format_size(self.size)}"
+        if read < self.size:
+            text += f" (showing the first {format_size(read)}; use Save As for the whole value)"
+        self.info_label.setText(text)
+        if self.hex_checkbox.isChecked():
+            self.render()
+    
+    def on_error(self, error_message):
+        self.save_button.setEnabled(True)
+        self.info_label.setText(f"Error: {error_message}")
+    
+    def render(self):
+        """Show the bytes read so far as text or as a hex dump"""
+        if self.kind == 'null':
+            return
+        if self.hex_checkbox.isChecked():
+            text = hex_dump(bytes(self.data[:self.hex_limit]))
+            if len(self.data) > self.hex_limit:
+                text += f"\n... hex view shows the first {format_size(self.hex_limit)}"
+            self.text_view.setPlainText(text)
+            return
+        # Restart decoding so chunks still to come continue from the end of the buffer
+        self.decoder = text_decoder(self.codec)
+        self.text_view.setPlainText(self.decoder.decode(bytes(self.data)))
+    
+    def save_value(self):
+        """Stream the whole value to a file"""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Value", "", "All Files (*)")
+        if not file_path:
+            return
+        self.save_button.setEnabled(False)
+        self.info_label.setText(f"Saving to {file_path}...")
+        worker = ValueReadWorker(self.pool, self.reader, path=file_path)
+        worker.result_ready.connect(self.on_saved)
+        worker.error_occurred.connect(self.on_error)
+        self.save_worker = worker
+        self.queries.start(worker, supersedable=False)
+    
+    def on_saved(self, size):
+        self.save_button.setEnabled(True)
+        self.info_label.setText(f"Saved {format_size(size)} to {self.save_worker.path}")
+    
+    def closeEvent(self, event):
+        self.worker.cancel()
+        if self.save_worker is not None:
+            self.save_worker.cancel()
+        super().closeEvent(event)
+
+
+class ColumnProfileDialog(QDialog):
+    """Window showing a column profile that refines from samples to exact values"""
+    
+    def __init__(self, pool, queries, profiler, cache, data_version, title, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(700, 500)
+        self.cache = cache
+        self.cache_key = (profiler.table, profiler.column)
+        self.data_version = data_version
+        self.worker = None
+        
+        layout = QVBoxLayout(self)
+        self.info_label = QLabel("Sampling rows...")
+        layout.addWidget(self.info_label)
+        
+        form = QFormLayout()
+        self.stat_labels = {}
+        for name in ("Rows", "Examined", "NULL", "Distinct", "Minimum", "Maximum"):
+            label = QLabel("")
+            label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            form.addRow(name + ":", label)
+            self.stat_labels[name] = label
+        layout.addLayout(form)
+        
+        lists = QSplitter(Qt.Horizontal)
+        self.top_tree = QTreeWidget()
+        self.top_tree.setHeaderLabels(["Most frequent", "Count", "Share"])
+        self.top_tree.setRootIsDecorated(False)
+        lists.addWidget(self.top_tree)
+        self.length_tree = QTreeWidget()
+        self.length_tree.setHeaderLabels(["Length", "Count", ""])
+        self.length_tree.setRootIsDecorated(False)
+        lists.addWidget(self.length_tree)
+        layout.addWidget(lists)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        
+        cached = cache.get(self.cache_key, data_version)
+        if cached is not None:
+            self.show_profile(cached)
+        if cached is None or not cached.exact:
+            self.worker = ProfileWorker(pool, profiler)
+            self.worker.profile_ready.connect(self.on_profile)
+            self.worker.error_occurred.connect(self.on_error)
+            queries.start(self.worker, supersedable=False)
+    
+    @staticmethod
+    def display_value(value):
+        if value is None:
+            return "NULL"
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return f"BLOB, {format_size(len(value))}"
+        text = " ".join(str(value).split())
+        return text if len(text) <= 80 else text[:80] + "…"
+    
+    def on_profile(self, profile):
+        self.cache.put(self.cache_key, self.data_version, profile)
+        self.show_profile(profile)
+    
+    def on_error(self, error_message):
+        self.info_label.setText(f"Error: {error_message}")
+    
+    def show_profile(self, profile):
+        approx = "" if profile.exact else "~"
+        if profile.exact:
+            self.info_label.setText("Exact values")
+        else:
+            self.info_label.setText(f"Estimated from a sample of {profile.examined:,} rows; refining...")
+        self.stat_labels["Rows"].setText(f"{approx}{profile.rows:,}")
+        self.stat_labels["Examined"].setText(f"{profile.examined:,}")
+        self.stat_labels["NULL"].setText(f"{approx}{profile.null_fraction:.1%}")
+        self.stat_labels["Distinct"].setText(f"{approx}{profile.distinct:,}")
+        # The extremes of a sample are only bounds the table reaches at least
+        self.stat_labels["Minimum"].setText(("≤ " if approx else "") + self.display_value(profile.minimum))
+        self.stat_labels["Maximum"].setText(("≥ " if approx else "") + self.display_value(profile.maximum))
+        
+        self.top_tree.clear()
+        for value, count in profile.top:
+            share = count / profile.examined if profile.examined else 0
+            QTreeWidgetItem(self.top_tree, [self.display_value(value), f"{count:,}", f"{share:.1%}"])
+        
+        self.length_tree.clear()
+        largest = max((count for _, count in profile.lengths), default=0)
+        for (low, high), count in profile.lengths:
+            length = str(low) if low == high else f"{low:,}–{high:,}"
+            bar = "█" * max(1, round(30 * count / largest))
+            QTreeWidgetItem(self.length_tree, [length, f"{count:,}", bar])
+    
+    def closeEvent(self, event):
+        if self.worker is not None:
+            self.worker.cancel()
+        super().closeEvent(event)
+
+
+class IndexAdvisorDialog(QDialog):
+    """Window with index suggestions for slow filters and sorts, and trials on scratch copies"""
+    
+    def __init__(self, pool, queries, workload, tables, db_path, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Index Advisor")
+        self.resize(900, 600)
+        self.pool = pool
+        self.queries = queries
+        self.workload = workload
+        self.tables = tables
+        self.db_path = db_path
+        self.suggestions = []
+        self.worker = None
+        self.trial_worker = None
+        self.scratch = None
+        
+        layout = QVBoxLayout(self)
+        self.info_label = QLabel("")
+        self.info_label.setWordWrap(True)
+        layout.addWidget(self.info_label)
+        
+        self.suggestion_tree = QTreeWidget()
+        self.suggestion_tree.setHeaderLabels(["Suggestion", "Runs", "Slowest", "Estimated", "Note"])
+        self.suggestion_tree.setRootIsDecorated(False)
+        self.suggestion_tree.currentItemChanged.connect(self.update_buttons)
+        layout.addWidget(self.suggestion_tree)
+        
+        self.result_text = QPlainTextEdit()
+        self.result_text.setReadOnly(True)
+        self.result_text.setFont(QFont("Consolas, Monaco, monospace", 9))
+        layout.addWidget(self.result_text)
+        
+        button_layout = QHBoxLayout()
+        self.analyze_button = QPushButton("Analyze Again")
+        self.analyze_button.clicked.connect(self.analyze)
+        button_layout.addWidget(self.analyze_button)
+        self.try_button = QPushButton("Try on Scratch Copy")
+        self.try_button.setToolTip(f"Copy up to {ADVISOR_CONFIG['trial_rows']:,} rows of the table to a temporary "
+                                   "database and time the queries before and after creating the index")
+        self.try_button.clicked.connect(self.try_selected)
+        button_layout.addWidget(self.try_button)
+        self.copy_button = QPushButton("Copy Statement")
+        self.copy_button.clicked.connect(self.copy_statement)
+        button_layout.addWidget(self.copy_button)
+        button_layout.addStretch()
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        
+        self.analyze()
+    
+    @staticmethod
+    def format_ms(seconds):
+        return "?" if seconds is None else f"{seconds * 1000:,.1f} ms"
+    
+    def analyze(self):
+        """Check the slow filters and sorts against the current plans in the background"""
+        self.suggestion_tree.clear()
+        self.suggestions = []
+        entries = [entry for entry in self.workload.slow_entries() if entry.shape.table in self.tables]
+        if not entries:
+            self.info_label.setText(f"No filter or sort in this window took longer than "
+                                    f"{ADVISOR_CONFIG['slow_ms']} ms yet.")
+            self.update_buttons()
+            return
+        self.info_label.setText(f"Checking {len(entries)} slow filters and sorts...")
+        advisor = IndexAdvisor(self.tables)
+        self.worker = TaskWorker(self.pool, lambda conn: advisor.suggest(conn, entries))
+        self.worker.result_ready.connect(self.on_suggestions)
+        self.worker.error_occurred.connect(self.on_error)
+        self.queries.start(self.worker, supersedable=False, origin='advisor')
+        self.update_buttons()
+    
+    def on_suggestions(self, suggestions):
+        self.worker = None
+        self.suggestions = suggestions
+        for suggestion in suggestions:
+            shape = suggestion.entry.shape
+            QTreeWidgetItem(self.suggestion_tree, [
+                suggestion.statement or f"(no index for {shape.table})",
+                str(suggestion.entry.runs), self.format_ms(suggestion.observed),
+                "" if suggestion.statement is None else self.format_ms(suggestion.estimated),
+                suggestion.note])
+        for column in range(self.suggestion_tree.columnCount()):
+            self.suggestion_tree.resizeColumnToContents(column)
+        slow = len(self.workload.slow_entries())
+        if any(suggestion.statement for suggestion in suggestions):
+            self.info_label.setText(f"{slow} slow filters and sorts. Estimates scale the slowest time by the "
+                                    "share of rows the index would still read; try an index to measure it.")
+        else:
+            self.info_label.setText(f"{slow} slow filters and sorts; no new index would help them.")
+        if suggestions:
+            self.suggestion_tree.setCurrentItem(self.suggestion_tree.topLevelItem(0))
+        self.update_buttons()
+    
+    def selected(self):
+        item = self.suggestion_tree.currentItem()
+        if item is None:
+            return None
+        return self.suggestions[self.suggestion_tree.indexOfTopLevelItem(item)]
+    
+    def update_buttons(self, *args):
+        suggestion = self.selected()
+        has_statement = suggestion is not None and suggestion.statement is not None
+        self.try_button.setEnabled(has_statement and self.trial_worker is None)
+        self.copy_button.setEnabled(has_statement)
+        self.analyze_button.setEnabled(self.worker is None)
+    
+    def copy_statement(self):
+        suggestion = self.selected()
+        if suggestion is not None and suggestion.statement:
+            QApplication.clipboard().setText(suggestion.statement)
+    
+    def try_selected(self):
+        """Time the suggestion's queries on a scratch copy before and after creating the index"""
+        suggestion = self.selected()
+        if suggestion is None or suggestion.statement is None or self.trial_worker is not None:
+            return
+        info = self.tables[suggestion.table]
+        self.scratch = ScratchCopy(self.db_path)
+        self.result_text.setPlainText(f"Copying up to {ADVISOR_CONFIG['trial_rows']:,} rows of "
+                                      f"{suggestion.table} to {self.scratch.path}...")
+        worker = TaskWorker(self.scratch, lambda conn: try_index(conn, info, suggestion,
+                                                                 cancelled=lambda: worker.cancelled))
+        worker.result_ready.connect(lambda result, s=suggestion: self.on_trial(s, result))
+        worker.error_occurred.connect(self.on_error)
+        worker.finished.connect(self.on_trial_finished)
+        self.trial_worker = worker
+        self.queries.start(worker, supersedable=False, origin='advisor')
+        self.update_buttons()
+    
+    def on_trial(self, suggestion, result):
+        lines = [suggestion.statement, "",
+                 f"Scratch copy of {result.rows:,} rows of {suggestion.table}; "
+                 f"index built in {result.build_seconds:.2f} s", "",
+                 f"{'':8}{'before':>14}{'after':>14}"]
+        for kind in ('count', 'page'):
+            if kind in result.before:
+                lines.append(f"{kind:8}{self.format_ms(result.before[kind]):>14}"
+                             f"{self.format_ms(result.after.get(kind)):>14}")
+        lines += ["", "Plan before:", result.plan_before, "", "Plan after:", result.plan_after, "",
+                  "The database itself was not modified; the scratch copy is deleted."]
+        self.result_text.setPlainText("\n".join(lines))
+    
+    def on_trial_finished(self):
+        self.trial_worker = None
+        if self.scratch is not None:
+            self.scratch.remove()
+            self.scratch = None
+        self.update_buttons()
+    
+    def on_error(self, error_message):
+        self.worker = None
+        self.result_text.setPlainText(f"Error: {error_message}")
+        self.update_buttons()
+    
+    def closeEvent(self, event):
+        if self.worker is not None:
+            self.worker.cancel()
+        if self.trial_worker is not None:
+            self.trial_worker.cancel()
+            self.trial_worker.wait(5)
+        if self.scratch is not None:
+            self.scratch.remove()
+            self.scratch = None
+        super().closeEvent(event)
+
+
+class OpenOptionsDialog(QDialog):
+    """Dialog that picks a database file and how to open it"""
+    
+    def __init__(self, options, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Open Database with Options")
+        layout = QFormLayout(self)
+        
+        path_layout = QHBoxLayout()
+        self.path_input = QLineEdit()
+        self.path_input.setMinimumWidth(350)
+        path_layout.addWidget(self.path_input)
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self.browse)
+        path_layout.addWidget(browse_button)
+        layout.addRow("Database:", path_layout)
+        
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("Read-only (mode=ro)")
+        self.mode_combo.addItem("Immutable snapshot (immutable=1)")
+        self.mode_combo.setItemData(1, "No locking and no journal or WAL lookups. Only for files that "
+                                       "nothing writes to while they are open.", Qt.ToolTipRole)
+        self.mode_combo.setCurrentIndex(1 if options['immutable'] else 0)
+        layout.addRow("Mode:", self.mode_combo)
+        
+        self.mmap_spinbox = QSpinBox()
+        self.mmap_spinbox.setRange(0, 1024 * 1024)
+        self.mmap_spinbox.setSuffix(" MB")
+        self.mmap_spinbox.setValue(options['mmap_size'] // (1024 * 1024))
+        self.mmap_spinbox.setToolTip("Memory-mapped I/O window per connection (0 disables it); "
+                                     "SQLite caps it at its compile-time maximum")
+        layout.addRow("mmap size:", self.mmap_spinbox)
+        
+        self.cache_spinbox = QSpinBox()
+        self.cache_spinbox.setRange(1, 64 * 1024)
+        self.cache_spinbox.setSuffix(" MB")
+        self.cache_spinbox.setValue(options['cache_size_kib'] // 1024)
+        self.cache_spinbox.setToolTip("Page cache per connection")
+        layout.addRow("Cache size:", self.cache_spinbox)
+        
+        buttons = QDialogButtonBox(QDialogButtonBox.Open | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+    
+    def browse(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Open SQLite Database", "", "SQLite Files (*.db *.sqlite *.sqlite3);;All Files (*)")
+        if file_path:
+            self.path_input.setText(file_path)
+    
+    def accept(self):
+        if not os.path.isfile(self.path_input.text().strip()):
+            QMessageBox.warning(self, "Open Database", "Choose an existing database file.")
+            return
+        super().accept()
+    
+    def db_path(self):
+        return self.path_input.text().strip()
+    
+    def options(self):
+        return {
+            'immutable': self.mode_combo.currentIndex() == 1,
+            'mmap_size': self.mmap_spinbox.value() * 1024 * 1024,
+            'cache_size_kib': self.cache_spinbox.value() * 1024,
+        }
+
+
+def estimate_column_widths(view, model, types=None):
+    """Pixel widths for the model's columns from declared types and the first rows"""
+    types = types or {}
+    sample = model.rows[:SAMPLE_ROWS]
+    char_width = view.fontMetrics().averageCharWidth()
+    header_metrics = view.horizontalHeader().fontMetrics()
+    max_width = MAX_CHARS * char_width + 16
+    widths = []
+    for col, name in enumerate(model.column_names):
+        chars = estimate_chars(types.get(name), (row[col + model.key_width] for row in sample))
+        header_width = header_metrics.horizontalAdvance(name) + 24  # Room for the sort indicator
+        widths.append(min(max_width, max(chars * char_width + 16, header_width)))
+    return widths
+
+
+def group_by_prefix(names, max_groups, prefix=""):
+    """Group names by their next prefix segment (events_2024_01 -> events, events_2024, ...)"""
+    groups = {}
+    for name in names:
+        rest = name[len(prefix):]
+        if prefix:
+            match = re.match(r'[_\-. ]*[^_\-. ]+', rest)
+            key = prefix + match.group(0) if match else name
+        else:
+            key = re.match(r'[^\d]*', rest).group(0).rstrip('_-. ') or name
+        groups.setdefault(key, []).append(name)
+    if not prefix and len(groups) > max_groups:
+        # Prefixes are not shared enough to help; fall back to first letters
+        groups = {}
+        for name in names:
+            groups.setdefault(name[:1], []).append(name)
+    return sorted(groups.items(), key=lambda item: item[0].lower())
 
 
 class SQLiteBrowser(QMainWindow):
-    def __init__(self):
+    """One database window; several can be open side by side, sharing the worker threads"""
+    database_loaded = pyqtSignal(str)  # Path, once the catalog is read and the tree is filled
+    windows = []  # Open windows, kept referenced until they are closed
+    
+    def __init__(self, db_path=None):
         super().__init__()
+        SQLiteBrowser.windows.append(self)
+        self.initial_db_path = db_path  # Opened once the window is on screen
         self.db_path = None
+        self.pool = None
         self.current_table = None
         self.current_offset = 0
         self.rows_per_page = 100
+        self.stream_batch_size = 256  # Rows per batch streamed into the model
         self.updating_combo = False  # Flag to prevent recursion
+        self.filter_timer = QTimer(self)  # Debounces search keystrokes
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(300)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.queries = QueryController(self)
+        self.columns_sized = False
+        self.column_widths = {}  # Table -> {column name: width in pixels}, reused across pages
+        self.applying_widths = False  # Set while widths are applied, to tell user resizes apart
+        self.paginator = None
+        self.row_count_cache = RowCountCache()
+        self.page_cache = PageCache()
+        self.profile_cache = ProfileCache()
+        self.workload = Workload()  # Filters and sorts with their latencies, for the index advisor
+        self.prefetching = set()  # Page cache keys being prefetched
+        self.count_worker = None
+        self.search_index = None
+        self.index_worker = None
+        self.row_count = (None, None)  # (count, kind) for the current table and filter
+        self.catalog = SchemaCatalog()
+        self.combo_table = None  # Table whose columns are in the column combo
+        self.tree_buckets = {}  # Bucket prefix -> table names, filled on expand
+        self.tree_bucket_threshold = 200  # Group tables into buckets above this count
+        self.pending_row = None  # Row number to select once its page has loaded
+        self.open_options = self.default_open_options()  # Last options chosen in the open dialog
+        self.console_worker = None  # Latest statement started in the query console
+        self.sort_column = None  # Column the grid is sorted by in SQL, None for key order
+        self.sort_order = Qt.AscendingOrder
+        self.sort_plan_key = None  # (paginator, generation) whose sort plan is shown
+        self.filter_mode = None  # Match mode the active column filter resolved to
+        self.filter_indexable = False  # Whether an index on the filter column could answer it
+        self.filter_plan_key = None  # (paginator, generation) whose filter plan is shown
+        self.loading_pool = None  # Pool of the database being opened in the background
+        self.schema_stale = False  # The Schema tab is filled when it is first shown
+        self.file_watcher = None  # Watches the database files while live refresh is on
+        self.live_data_version = None  # PRAGMA data_version at the last live check
+        self.live_rowid_high = None  # (table, highest rowid) at the last live check
+        self.live_timer = QTimer(self)
+        self.live_timer.setInterval(LIVE_CONFIG['poll_interval_ms'])
+        self.live_timer.timeout.connect(self.check_for_changes)
+        self.live_check_timer = QTimer(self)  # Debounces file change notifications
+        self.live_check_timer.setSingleShot(True)
+        self.live_check_timer.setInterval(LIVE_CONFIG['debounce_ms'])
+        self.live_check_timer.timeout.connect(self.check_for_changes)
+        self.wal_mode = False  # Pages and counts are read in verified snapshots in WAL mode
+        self.pin = None  # PinnedSnapshot the grid reads from while Pin Snapshot is on
+        self.pin_outdated = False  # Other connections committed since the snapshot was pinned
+        self.shown_snapshot = None  # (data_version, time read) of the rows on screen
         
         self.init_ui()
         
@@ -57,6 +1226,9 @@ class SQLiteBrowser(QMainWindow):
         self.setWindowTitle("OJDB Viewer (Our Jank Database Viewer)")
         self.setGeometry(100, 100, 1400, 900)  # Larger default window
         
+        # Query log dock (created first so the View menu can toggle it)
+        self.create_instrumentation_dock()
+        
         # Create menu bar
         self.create_menu_bar()
         
@@ -74,13 +1246,28 @@ class SQLiteBrowser(QMainWindow):
         splitter.setChildrenCollapsible(False)  # Prevent collapsing
         main_layout.addWidget(splitter)
         
-        # Create database tree widget
+        # Create database tree panel with a filter box above the tree
+        self.tree_panel = QWidget()
+        tree_layout = QVBoxLayout(self.tree_panel)
+        tree_layout.setContentsMargins(0, 0, 0, 0)
+        tree_layout.setSpacing(5)
+        self.tree_panel.setMinimumWidth(250)  # Minimum width
+        self.tree_panel.setMaximumWidth(400)  # Maximum width
+        
+        self.tree_filter_input = QLineEdit()
+        self.tree_filter_input.setPlaceholderText("Filter tables...")
+        self.tree_filter_input.textChanged.connect(self.populate_tree)
+        tree_layout.addWidget(self.tree_filter_input)
+        
         self.tree_widget = QTreeWidget()
         self.tree_widget.setHeaderLabel("Database Structure")
         self.tree_widget.itemClicked.connect(self.tree_item_clicked)
-        self.tree_widget.setMinimumWidth(250)  # Minimum width
-        self.tree_widget.setMaximumWidth(400)  # Maximum width
-        splitter.addWidget(self.tree_widget)
+        self.tree_widget.itemDoubleClicked.connect(self.tree_item_double_clicked)
+        self.tree_widget.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tree_widget.customContextMenuRequested.connect(self.show_tree_menu)
+        self.tree_widget.itemExpanded.connect(self.tree_item_expanded)
+        tree_layout.addWidget(self.tree_widget)
+        splitter.addWidget(self.tree_panel)
         
         # Create right panel with tabs
         self.tab_widget = QTabWidget()
@@ -90,8 +1277,12 @@ class SQLiteBrowser(QMainWindow):
         # Data tab
         self.create_data_tab()
         
-        # Schema tab
+        # Schema tab (its editor is built when the tab is first shown)
         self.create_schema_tab()
+        self.tab_widget.currentChanged.connect(self.tab_changed)
+        
+        # Query console tab
+        self.create_query_tab()
         
         # Set splitter proportions (tree: data = 1:3 ratio)
         splitter.setSizes([350, 1050])
@@ -101,13 +1292,27 @@ class SQLiteBrowser(QMainWindow):
         # Create status bar
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        self.snapshot_label = QLabel("")
+        self.status_bar.addPermanentWidget(self.snapshot_label)
+        self.mode_label = QLabel("")
+        self.status_bar.addPermanentWidget(self.mode_label)
+        self.pool_label = QLabel("")
+        self.status_bar.addPermanentWidget(self.pool_label)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setVisible(False)
+        self.status_bar.addPermanentWidget(self.progress_bar)
         
         # Initialize status bar
         self.update_status_bar("No database loaded")
         
-        # Load example database if it exists
-        if os.path.exists("devices.db"):
-            self.load_database("devices.db")
+        # Load the requested or example database once the window is on screen
+        db_path = self.initial_db_path
+        if db_path is None and len(SQLiteBrowser.windows) == 1 and os.path.exists("devices.db"):
+            db_path = "devices.db"
+        if db_path:
+            QTimer.singleShot(0, lambda: self.load_database(db_path))
     
     def create_menu_bar(self):
         """Create the application menu bar"""
@@ -122,6 +1327,18 @@ class SQLiteBrowser(QMainWindow):
         open_action.setStatusTip('Open SQLite database file')
         open_action.triggered.connect(self.open_database)
         
+        # Open with options action
+        open_options_action = file_menu.addAction('Open Database with O&ptions...')
+        open_options_action.setShortcut('Ctrl+Shift+O')
+        open_options_action.setStatusTip('Open a database read-only or as an immutable snapshot with tuned memory settings')
+        open_options_action.triggered.connect(self.open_database_with_options)
+        
+        # Open in new window action
+        new_window_action = file_menu.addAction('Open in &New Window...')
+        new_window_action.setShortcut('Ctrl+Shift+N')
+        new_window_action.setStatusTip('Open another database side by side in its own window')
+        new_window_action.triggered.connect(self.open_in_new_window)
+        
         file_menu.addSeparator()
         
         # Recent files submenu (placeholder for future enhancement)
@@ -134,7 +1351,7 @@ class SQLiteBrowser(QMainWindow):
         exit_action = file_menu.addAction('E&xit')
         exit_action.setShortcut('Ctrl+Q')
         exit_action.setStatusTip('Exit application')
-        exit_action.triggered.connect(self.close)
+        exit_action.triggered.connect(QApplication.closeAllWindows)
         
         # Tools menu
         tools_menu = menubar.addMenu('&Tools')
@@ -145,12 +1362,47 @@ class SQLiteBrowser(QMainWindow):
         refresh_action.setStatusTip('Refresh database structure')
         refresh_action.triggered.connect(self.refresh_database)
         
+        # Live refresh action
+        self.live_action = tools_menu.addAction('&Live Refresh')
+        self.live_action.setCheckable(True)
+        self.live_action.setStatusTip('Show changes made by other programs as they are committed')
+        self.live_action.toggled.connect(self.toggle_live_refresh)
+        
+        # Pin snapshot action
+        self.snapshot_action = tools_menu.addAction('&Pin Snapshot')
+        self.snapshot_action.setCheckable(True)
+        self.snapshot_action.setStatusTip('Keep paging through the database as it is now while other programs write to it')
+        self.snapshot_action.toggled.connect(self.toggle_snapshot_pin)
+        
+        # Search index action
+        self.index_action = tools_menu.addAction('Build &Search Index')
+        self.index_action.setStatusTip('Index the current table for fast All Columns search')
+        self.index_action.triggered.connect(self.toggle_search_index_build)
+        
+        # Index advisor action
+        advisor_action = tools_menu.addAction('Index &Advisor...')
+        advisor_action.setStatusTip('Suggest indexes for slow filters and sorts and try them on a scratch copy')
+        advisor_action.triggered.connect(self.open_index_advisor)
+        
+        # Parallel search action
+        self.parallel_action = tools_menu.addAction('&Parallel Search')
+        self.parallel_action.setCheckable(True)
+        self.parallel_action.setChecked(SCAN_CONFIG['connections'] > 1)
+        self.parallel_action.setStatusTip(f"Search large tables without a usable index on "
+                                          f"{SCAN_CONFIG['connections']} connections at once")
+        
+        # Column width action
+        remeasure_action = tools_menu.addAction('Re-measure &Column Widths')
+        remeasure_action.setStatusTip('Size the columns of the current table from the rows on screen')
+        remeasure_action.triggered.connect(self.remeasure_columns)
+        
         tools_menu.addSeparator()
         
-        # Export data action (placeholder for future enhancement)
+        # Export data action
         export_action = tools_menu.addAction('&Export Data...')
-        export_action.setStatusTip('Export table data to CSV')
-        export_action.setEnabled(False)  # Disabled for now
+        export_action.setShortcut('Ctrl+E')
+        export_action.setStatusTip('Export the current table or filtered result to CSV, JSON Lines or SQL')
+        export_action.triggered.connect(self.export_data)
         
         # View menu
         view_menu = menubar.addMenu('&View')
@@ -161,6 +1413,13 @@ class SQLiteBrowser(QMainWindow):
         toggle_tree_action.setStatusTip('Show/hide database structure tree')
         toggle_tree_action.triggered.connect(self.toggle_tree_visibility)
         
+        # Query log action
+        query_log_action = self.instrumentation_dock.toggleViewAction()
+        query_log_action.setText('&Query Log')
+        query_log_action.setShortcut('Ctrl+Shift+L')
+        query_log_action.setStatusTip('Show every statement the viewer runs with timings')
+        view_menu.addAction(query_log_action)
+        
         # Help menu
         help_menu = menubar.addMenu('&Help')
         
@@ -170,16 +1429,248 @@ class SQLiteBrowser(QMainWindow):
         about_action.triggered.connect(self.show_about)
     
     def refresh_database(self):
-        """Refresh the database structure"""
+        """Refresh the database structure and reload the current page"""
         if self.db_path:
             db_name = os.path.basename(self.db_path)
-            self.populate_tree()
-            self.load_schema()
-            self.update_status_bar("Database refreshed", db_name)
+            try:
+                with self.queries.connection(self.pool, 'tree') as conn:
+                    changed = self.catalog.refresh(conn)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to refresh database:\n{str(e)}")
+                return
+            if changed:
+                self.apply_schema_change()
+            if self.current_table and self.catalog.get(self.current_table):
+                self.load_table_data()
+            self.update_status_bar("Database refreshed" if changed else "Schema unchanged", db_name)
+    
+    def apply_schema_change(self):
+        """Rebuild everything that depends on the schema after the catalog was reloaded"""
+        self.paginator = None
+        self.combo_table = None
+        self.page_cache.clear()
+        self.column_widths.clear()
+        self.populate_tree()
+        self.load_schema()
+        self.warm_catalog()
+    
+    def toggle_live_refresh(self, enabled):
+        """Follow commits of other connections while enabled"""
+        if enabled:
+            self.start_live_refresh()
+        else:
+            self.stop_live_refresh()
+    
+    def start_live_refresh(self):
+        """Start watching the database files and polling PRAGMA data_version"""
+        self.stop_live_refresh()
+        if not self.live_action.isChecked() or not self.pool:
+            return
+        if self.pool.immutable:
+            self.live_action.setChecked(False)
+            self.update_status_bar("Live refresh is not available for immutable snapshots",
+                                   os.path.basename(self.db_path))
+            return
+        try:
+            self.live_data_version = self.pool.data_version()
+        except Exception as e:
+            self.show_error(str(e))
+            return
+        self.live_rowid_high = self.current_rowid_high()
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.schedule_live_check)
+        self.file_watcher.directoryChanged.connect(self.schedule_live_check)
+        self.watch_database_files()
+        self.live_timer.start()
+    
+    def stop_live_refresh(self):
+        self.live_timer.stop()
+        self.live_check_timer.stop()
+        if self.file_watcher is not None:
+            self.file_watcher.deleteLater()
+            self.file_watcher = None
+    
+    def watch_database_files(self):
+        """Watch the database, its WAL file and their directory, which reports a new WAL file"""
+        paths = [self.db_path, self.db_path + "-wal", os.path.dirname(os.path.abspath(self.db_path))]
+        watched = set(self.file_watcher.files() + self.file_watcher.directories())
+        missing = [path for path in paths if path not in watched and os.path.exists(path)]
+        if missing:
+            self.file_watcher.addPaths(missing)
+    
+    def schedule_live_check(self, path=None):
+        if self.file_watcher is not None:
+            self.watch_database_files()  # Replaced or new files have to be watched again
+            self.live_check_timer.start()
+    
+    def check_for_changes(self):
+        """Refresh what other connections changed; costs one PRAGMA when nothing did"""
+        if not self.pool or self.file_watcher is None:
+            return
+        try:
+            data_version = self.pool.data_version()
+        except Exception:
+            return  # The database is being replaced; try again on the next check
+        if data_version == self.live_data_version:
+            return
+        self.live_data_version = data_version
+        if self.pin is not None:
+            self.pin_outdated = True  # The grid stays on the pinned state
+            self.show_snapshot()
+            return
+        
+        try:
+            with self.queries.connection(self.pool, 'live') as conn:
+                schema_changed = self.catalog.refresh(conn)
+        except Exception as e:
+            self.show_error(str(e))
+            return
+        if schema_changed:
+            self.apply_schema_change()
+            if self.current_table and self.catalog.get(self.current_table):
+                self.load_table_data()
+            return
+        
+        paginator = self.paginator
+        if not self.current_table or paginator is None or paginator.table != self.current_table:
+            return
+        self.update_row_count(paginator, quiet=True)
+        if self.continuous_checkbox.isChecked():
+            if not self.table_model.fetching:
+                self.table_model.finish_fetch(True)  # Appended rows load when scrolled to
+        elif self.page_may_have_changed(paginator):
+            self.reload_visible_page(paginator)
+    
+    def current_rowid_high(self):
+        """(table, highest rowid) of the current rowid table, or None"""
+        paginator = self.paginator
+        if paginator is None or not self.current_table:
+            return None
+        counter = RowCounter(self.current_table, paginator.key_columns)
+        if counter.rowid_key is None:
+            return None
+        with self.queries.connection(self.pool, 'live') as conn:
+            return (self.current_table, counter.rowid_bounds(conn)[1])
+    
+    def page_may_have_changed(self, paginator):
+        """False when the only change can be rows appended after a full page in rowid order
+        
+        Ingestion appends rows with new, higher rowids, which never land on a
+        full page that ends below the previous highest rowid. Other changes
+        can touch any row, so the page is checked again.
+        """
+        previous = self.live_rowid_high
+        self.live_rowid_high = self.current_rowid_high()
+        if previous is None or previous[0] != self.current_table or previous[1] is None:
+            return True
+        if paginator.sort_column is not None or not paginator.uses_keyset:
+            return True
+        loaded = self.table_model.rowCount()
+        if loaded < self.rows_per_page:
+            return True  # The last page: appended rows show up here
+        return self.table_model.row_key(loaded - 1)[-1] >= previous[1]
+    
+    def reload_visible_page(self, paginator):
+        """Read the visible page again and show it only if its rows changed"""
+        page = self.current_offset // self.rows_per_page
+        query, params = paginator.page_query(page)
+        
+        def read_page(conn):
+            data_version = begin_read(conn, self.pool) if self.wal_mode else None
+            cursor = conn.execute(query, params)
+            return [description[0] for description in cursor.description], cursor.fetchall(), data_version
+        
+        worker = TaskWorker(self.pool, read_page)
+        worker.result_ready.connect(
+            lambda result, w=worker: self.on_page_reloaded(w, paginator, page, *result))
+        worker.error_occurred.connect(self.show_error)
+        self.queries.start(worker, origin='live')
+    
+    def on_page_reloaded(self, worker, paginator, page, column_names, rows, data_version):
+        if not self.queries.is_current(worker) or paginator is not self.paginator:
+            return  # The user moved on meanwhile
+        self.shown_snapshot = (data_version, time.time())
+        self.show_snapshot()
+        if rows == self.table_model.rows:
+            return
+        scroll = self.table_view.verticalScrollBar().value()
+        self.reset_model(column_names)
+        self.table_model.append_rows(rows)
+        self.finish_rows(page, len(rows))
+        self.table_view.verticalScrollBar().setValue(scroll)
+    
+    def toggle_snapshot_pin(self, enabled):
+        """Read every page from one pinned snapshot while enabled"""
+        changed = self.pin_snapshot() if enabled else self.unpin_snapshot()
+        if not changed:
+            if enabled:
+                self.snapshot_action.setChecked(False)
+            return
+        self.show_snapshot()
+        if self.current_table and self.catalog.get(self.current_table):
+            self.load_table_data()
+    
+    def pin_snapshot(self):
+        """Open a read transaction that pages and counts read from until unpinned"""
+        if not self.pool or self.pin is not None:
+            return False
+        db_name = os.path.basename(self.db_path)
+        if not self.wal_mode:
+            # Outside WAL mode an open read transaction would keep writers from committing
+            self.update_status_bar("Pinning a snapshot needs a database in WAL mode", db_name)
+            return False
+        try:
+            self.pin = PinnedSnapshot(self.pool)
+        except Exception as e:
+            self.show_error(str(e))
+            return False
+        self.pin_outdated = False
+        self.update_status_bar("Snapshot pinned", db_name)
+        return True
+    
+    def unpin_snapshot(self):
+        """Release the pinned snapshot, if any, so pages show the latest commits again"""
+        if self.pin is None:
+            return False
+        pin, self.pin = self.pin, None
+        # Detached readers the window does not track yet, like a page worker whose count_started
+        # is still queued, are interrupted by release(), which never waits for them
+        self.queries.next_generation()
+        self.cancel_count()
+        pin.release()
+        self.pin_outdated = False
+        self.shown_snapshot = None  # Until a page of the latest state is read
+        return True
+    
+    def read_source(self):
+        """The pinned snapshot if there is one, else the pool; both lend connections"""
+        return self.pin if self.pin is not None else self.pool
+    
+    def snapshot_version(self):
+        """Page and count cache version of the state the next read will see"""
+        if self.pin is not None:
+            return self.pin.version
+        return self.pool.data_version()
+    
+    def show_snapshot(self):
+        """Tell in the status bar which database state the grid shows"""
+        if self.pin is not None:
+            pinned_at = time.strftime('%H:%M:%S', time.localtime(self.pin.pinned_at))
+            text = f"Pinned snapshot #{self.pin.data_version} from {pinned_at}"
+            if self.pin_outdated:
+                text += " (newer data available)"
+        elif not self.wal_mode or self.shown_snapshot is None:
+            text = ""
+        elif self.shown_snapshot[0] is None:
+            text = "Snapshot: changing (busy writer)"
+        else:
+            version, read_at = self.shown_snapshot
+            text = f"Snapshot #{version} read {time.strftime('%H:%M:%S', time.localtime(read_at))}"
+        self.snapshot_label.setText(text)
     
     def toggle_tree_visibility(self):
         """Toggle the visibility of the database tree"""
-        self.tree_widget.setVisible(not self.tree_widget.isVisible())
+        self.tree_panel.setVisible(not self.tree_panel.isVisible())
     
     def show_about(self):
         """Show about dialog"""
@@ -208,32 +1699,59 @@ class SQLiteBrowser(QMainWindow):
         filter_layout.addWidget(QLabel("Search:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Enter search term...")
-        self.search_input.textChanged.connect(self.apply_filter)
+        self.search_input.textChanged.connect(self.schedule_filter)
         self.search_input.setMinimumWidth(200)
         filter_layout.addWidget(self.search_input)
         
         filter_layout.addWidget(QLabel("Column:"))
         self.column_combo = QComboBox()
+        self.column_combo.currentTextChanged.connect(self.update_filter_controls)
         self.column_combo.currentTextChanged.connect(self.apply_filter)
         self.column_combo.setMinimumWidth(150)
         filter_layout.addWidget(self.column_combo)
         
+        filter_layout.addWidget(QLabel("Match:"))
+        self.mode_combo = QComboBox()
+        for mode, label in FILTER_MODES:
+            self.mode_combo.addItem(label, mode)
+        self.mode_combo.setToolTip("Auto matches numbers exactly, dates by prefix or from..to, "
+                                   "and text anywhere in the value")
+        self.mode_combo.setEnabled(False)  # All Columns always searches within text
+        self.mode_combo.currentIndexChanged.connect(
+            lambda _: self.search_input.text().strip() and self.apply_filter())
+        filter_layout.addWidget(self.mode_combo)
+        
         self.clear_filter_button = QPushButton("Clear")
         self.clear_filter_button.clicked.connect(self.clear_filter)
         self.clear_filter_button.setMaximumWidth(80)
         filter_layout.addWidget(self.clear_filter_button)
         
+        self.filter_plan_label = QLabel("")
+        self.filter_plan_label.setStyleSheet("color: #666;")
+        filter_layout.addWidget(self.filter_plan_label)
+        
         filter_layout.addStretch()
         layout.addLayout(filter_layout)
         
-        # Table widget
-        self.table_widget = QTableWidget()
-        self.table_widget.setSortingEnabled(True)
-        self.table_widget.setAlternatingRowColors(True)
-        self.table_widget.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table_widget.horizontalHeader().setStretchLastSection(True)
-        self.table_widget.verticalHeader().setDefaultSectionSize(25)  # Row height
-        layout.addWidget(self.table_widget)
+        # Table view backed by a lazily formatted model
+        self.table_model = TableModel(self)
+        self.table_model.fetch_more_requested.connect(self.fetch_more_rows)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
+        self.table_view.setAlternatingRowColors(True)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        # Header clicks sort in SQL; the view itself never reorders the loaded rows
+        self.table_view.horizontalHeader().setSectionsClickable(True)
+        self.table_view.horizontalHeader().setSortIndicatorShown(True)
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table_view.horizontalHeader().sectionClicked.connect(self.sort_by_column)
+        self.table_view.horizontalHeader().sectionResized.connect(self.column_resized)
+        self.table_view.doubleClicked.connect(self.open_cell)
+        self.table_view.verticalHeader().setDefaultSectionSize(25)  # Row height
+        # Fixed row heights let the view skip measuring rows it never shows
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        layout.addWidget(self.table_view)
         
         # Pagination controls
         pagination_layout = QHBoxLayout()
@@ -264,8 +1782,25 @@ class SQLiteBrowser(QMainWindow):
         self.rows_spinbox.setMaximumWidth(80)
         pagination_layout.addWidget(self.rows_spinbox)
         
+        self.continuous_checkbox = QCheckBox("Continuous scroll")
+        self.continuous_checkbox.setToolTip("Load more rows as you scroll instead of using pages")
+        self.continuous_checkbox.toggled.connect(self.toggle_continuous_scroll)
+        pagination_layout.addWidget(self.continuous_checkbox)
+        
+        pagination_layout.addWidget(QLabel("Go to row:"))
+        self.goto_input = QLineEdit()
+        self.goto_input.setValidator(QIntValidator(1, 2**31 - 1, self))
+        self.goto_input.setPlaceholderText("Row #")
+        self.goto_input.returnPressed.connect(self.jump_to_row)
+        self.goto_input.setMaximumWidth(100)
+        pagination_layout.addWidget(self.goto_input)
+        
         pagination_layout.addStretch()
         
+        self.sort_label = QLabel("")
+        self.sort_label.setStyleSheet("color: #666;")
+        pagination_layout.addWidget(self.sort_label)
+        
         self.total_rows_label = QLabel("")
         self.total_rows_label.setStyleSheet("font-weight: bold; color: #666;")
         pagination_layout.addWidget(self.total_rows_label)
@@ -276,10 +1811,245 @@ class SQLiteBrowser(QMainWindow):
     
     def create_schema_tab(self):
         """Create the schema viewing tab"""
-        self.schema_text = QTextEdit()
-        self.schema_text.setReadOnly(True)
-        self.schema_text.setFont(QFont("Courier", 10))
-        self.tab_widget.addTab(self.schema_text, "Schema")
+        self.schema_tab = QWidget()
+        QVBoxLayout(self.schema_tab).setContentsMargins(0, 0, 0, 0)
+        self.schema_text = None
+        self.tab_widget.addTab(self.schema_tab, "Schema")
+    
+    def tab_changed(self, index):
+        """Build and fill the Schema tab the first time it is shown after a change"""
+        if self.tab_widget.widget(index) is not self.schema_tab:
+            return
+        if self.schema_text is None:
+            self.schema_text = QTextEdit()
+            self.schema_text.setReadOnly(True)
+            self.schema_text.setFont(QFont("Courier", 10))
+            self.schema_tab.layout().addWidget(self.schema_text)
+        if self.schema_stale:
+            self.load_schema()
+    
+    def create_instrumentation_dock(self):
+        """Create the dockable query log with per-origin latencies"""
+        self.instrumentation_dock = QDockWidget("Query Log", self)
+        self.instrumentation_dock.setObjectName("query_log_dock")
+        dock_widget = QWidget()
+        layout = QVBoxLayout(dock_widget)
+        layout.setContentsMargins(5, 5, 5, 5)
+        
+        self.latency_tree = QTreeWidget()
+        self.latency_tree.setHeaderLabels(["Origin", "Statements", "p50 ms", "p95 ms"])
+        self.latency_tree.setRootIsDecorated(False)
+        self.latency_tree.setMaximumHeight(140)
+        layout.addWidget(self.latency_tree)
+        
+        self.statement_tree = QTreeWidget()
+        self.statement_tree.setHeaderLabels(["Time", "Origin", "ms", "VM steps", "Rows", "SQL"])
+        self.statement_tree.setRootIsDecorated(False)
+        self.statement_tree.setUniformRowHeights(True)  # Lets the view skip measuring rows
+        layout.addWidget(self.statement_tree)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        export_log_button = QPushButton("Export JSON...")
+        export_log_button.clicked.connect(self.export_query_log)
+        button_layout.addWidget(export_log_button)
+        clear_log_button = QPushButton("Clear")
+        clear_log_button.clicked.connect(self.clear_query_log)
+        button_layout.addWidget(clear_log_button)
+        layout.addLayout(button_layout)
+        
+        self.instrumentation_dock.setWidget(dock_widget)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.instrumentation_dock)
+        self.instrumentation_dock.hide()
+        
+        # Statements are logged from worker threads; the dock polls while it is visible
+        self.log_seq = 0  # Last log entry shown
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(500)
+        self.log_timer.timeout.connect(self.refresh_query_log)
+        self.instrumentation_dock.visibilityChanged.connect(
+            lambda visible: self.log_timer.start() if visible else self.log_timer.stop())
+    
+    def refresh_query_log(self):
+        """Append new log entries and recompute the per-origin latencies"""
+        log = self.queries.log
+        entries = log.entries_since(self.log_seq)
+        if not entries:
+            return
+        self.log_seq = entries[-1].seq
+        items = []
+        for entry in entries:
+            items.append(QTreeWidgetItem([
+                time.strftime("%H:%M:%S", time.localtime(entry.timestamp)),
+                entry.origin,
+                f"{entry.seconds * 1000:.1f}",
+                f"{entry.vm_steps:,}",
+                "" if entry.rows is None else f"{entry.rows:,}",
+                " ".join(entry.sql.split()),
+            ]))
+        self.statement_tree.addTopLevelItems(items)
+        for _ in range(self.statement_tree.topLevelItemCount() - log.max_entries):
+            self.statement_tree.takeTopLevelItem(0)
+        self.statement_tree.scrollToBottom()
+        
+        self.latency_tree.clear()
+        for origin, (count, p50, p95) in log.summary().items():
+            QTreeWidgetItem(self.latency_tree, [origin, f"{count:,}", f"{p50 * 1000:.1f}", f"{p95 * 1000:.1f}"])
+    
+    def export_query_log(self):
+        """Write the query log to a JSON file for offline analysis"""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Query Log", "query-log.json",
+                                                   "JSON Files (*.json)")
+        if not file_path:
+            return
+        try:
+            self.queries.log.export_json(file_path)
+        except OSError as e:
+            self.show_error(f"Failed to export query log: {e}")
+    
+    def clear_query_log(self):
+        self.queries.log.clear()
+        self.statement_tree.clear()
+        self.latency_tree.clear()
+    
+    def create_query_tab(self):
+        """Create the SQL query console tab"""
+        query_splitter = QSplitter(Qt.Vertical)
+        
+        editor_widget = QWidget()
+        editor_layout = QVBoxLayout(editor_widget)
+        editor_layout.setContentsMargins(10, 10, 10, 0)
+        self.query_editor = QPlainTextEdit()
+        self.query_editor.setFont(QFont("Courier", 10))
+        self.query_editor.setPlaceholderText("SELECT ... (Ctrl+Enter to run)")
+        editor_layout.addWidget(self.query_editor)
+        QShortcut(QKeySequence("Ctrl+Return"), self.query_editor, self.run_console_query)
+        
+        controls_layout = QHBoxLayout()
+        self.run_query_button = QPushButton("▶ Run")
+        self.run_query_button.clicked.connect(self.run_console_query)
+        controls_layout.addWidget(self.run_query_button)
+        self.cancel_query_button = QPushButton("Cancel")
+        self.cancel_query_button.clicked.connect(self.cancel_console_query)
+        self.cancel_query_button.setEnabled(False)
+        controls_layout.addWidget(self.cancel_query_button)
+        controls_layout.addWidget(QLabel("Row limit:"))
+        self.console_limit_spinbox = QSpinBox()
+        self.console_limit_spinbox.setRange(100, 10000000)
+        self.console_limit_spinbox.setSingleStep(1000)
+        self.console_limit_spinbox.setValue(100000)
+        self.console_limit_spinbox.setToolTip("Rows kept in the result grid; streaming stops after this many")
+        controls_layout.addWidget(self.console_limit_spinbox)
+        controls_layout.addStretch()
+        self.console_stats_label = QLabel("")
+        self.console_stats_label.setStyleSheet("font-weight: bold; color: #666;")
+        controls_layout.addWidget(self.console_stats_label)
+        editor_layout.addLayout(controls_layout)
+        query_splitter.addWidget(editor_widget)
+        
+        # Results next to the query plan
+        results_splitter = QSplitter(Qt.Horizontal)
+        self.console_model = TableModel(self)
+        self.console_view = QTableView()
+        self.console_view.setModel(self.console_model)
+        self.console_view.setAlternatingRowColors(True)
+        self.console_view.verticalHeader().setDefaultSectionSize(25)
+        self.console_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        results_splitter.addWidget(self.console_view)
+        self.plan_tree = QTreeWidget()
+        self.plan_tree.setHeaderLabel("Query Plan")
+        results_splitter.addWidget(self.plan_tree)
+        results_splitter.setSizes([900, 300])
+        query_splitter.addWidget(results_splitter)
+        query_splitter.setSizes([200, 600])
+        
+        self.tab_widget.addTab(query_splitter, "Query")
+    
+    def run_console_query(self):
+        """Run the console SQL in a worker, streaming rows into the result grid"""
+        sql = self.query_editor.textCursor().selectedText().replace("\u2029", "\n").strip() or \
+            self.query_editor.toPlainText().strip()
+        if not sql:
+            return
+        if not self.pool:
+            QMessageBox.information(self, "Query", "Open a database first.")
+            return
+        self.cancel_console_query()
+        
+        worker = DatabaseWorker(self.pool, sql, batch_size=self.stream_batch_size,
+                                max_rows=self.console_limit_spinbox.value())
+        worker.columns_ready.connect(lambda names, w=worker: self.on_console_columns(w, names))
+        worker.batch_ready.connect(lambda rows, w=worker: self.on_console_batch(w, rows))
+        worker.stream_finished.connect(lambda total, w=worker: self.on_console_finished(w, total))
+        worker.error_occurred.connect(lambda message, w=worker: self.on_console_error(w, message))
+        worker.finished.connect(lambda w=worker: self.on_console_worker_finished(w))
+        self.console_worker = worker
+        self.console_columns_sized = False
+        self.console_model.reset([])
+        self.console_stats_label.setText("Running...")
+        self.run_query_button.setEnabled(False)
+        self.cancel_query_button.setEnabled(True)
+        # Console queries are independent of table browsing, which must not cancel them
+        self.queries.start(worker, supersedable=False, origin='console')
+        
+        plan_worker = TaskWorker(self.pool, lambda conn: explain(conn, sql))
+        plan_worker.result_ready.connect(lambda plan, w=worker: self.on_console_plan(w, plan))
+        plan_worker.error_occurred.connect(lambda message, w=worker: self.on_console_plan(w, None, message))
+        self.queries.start(plan_worker, supersedable=False, origin='console')
+    
+    def cancel_console_query(self):
+        """Interrupt the running console statement"""
+        worker = self.console_worker
+        if worker is not None and worker.is_running() and not worker.cancelled:
+            worker.cancel()
+            self.console_stats_label.setText(f"Cancelled after {self.console_model.rowCount():,} rows")
+    
+    def on_console_columns(self, worker, column_names):
+        if worker is self.console_worker:
+            self.console_model.reset(column_names)
+    
+    def on_console_batch(self, worker, rows):
+        if worker is not self.console_worker:
+            return
+        self.console_model.append_rows(rows)
+        if not self.console_columns_sized:
+            self.console_columns_sized = True
+            for col, width in enumerate(estimate_column_widths(self.console_view, self.console_model)):
+                self.console_view.setColumnWidth(col, width)
+        self.console_stats_label.setText(f"{self.console_model.rowCount():,} rows so far...")
+    
+    def on_console_finished(self, worker, total):
+        """Show row count and timings of a finished console query"""
+        if worker is not self.console_worker:
+            return
+        rows = f"first {total:,} rows (row limit)" if worker.truncated else f"{total:,} rows"
+        self.console_stats_label.setText(
+            f"{rows} | first row {worker.first_row_seconds * 1000:.1f} ms | "
+            f"total {worker.elapsed * 1000:.1f} ms | ~{worker.vm_steps:,} VM steps")
+    
+    def on_console_error(self, worker, error_message):
+        if worker is self.console_worker:
+            self.console_stats_label.setText("Error")
+            self.show_error(error_message)
+    
+    def on_console_worker_finished(self, worker):
+        if worker is self.console_worker:
+            self.run_query_button.setEnabled(True)
+            self.cancel_query_button.setEnabled(False)
+    
+    def on_console_plan(self, worker, plan, error_message=None):
+        """Show the EXPLAIN QUERY PLAN tree of a console query"""
+        if worker is not self.console_worker:
+            return  # Plan of an earlier query
+        self.plan_tree.clear()
+        if error_message is not None:
+            QTreeWidgetItem(self.plan_tree, [f"No plan: {error_message}"])
+            return
+        items = {}
+        for node_id, parent, detail in plan:
+            parent_item = items.get(parent, self.plan_tree)
+            items[node_id] = QTreeWidgetItem(parent_item, [detail])
+        self.plan_tree.expandAll()
     
     def open_database(self):
         """Open file dialog to select database"""
@@ -289,6 +2059,42 @@ class SQLiteBrowser(QMainWindow):
         if file_path:
             self.load_database(file_path)
     
+    def open_in_new_window(self):
+        """Open a database in another window with its own tree, caches and connections"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Open SQLite Database", "", "SQLite Files (*.db *.sqlite *.sqlite3);;All Files (*)")
+        if file_path:
+            window = SQLiteBrowser(file_path)
+            window.show()
+    
+    def closeEvent(self, event):
+        """Stop this window's queries and close its connections"""
+        self.stop_live_refresh()
+        self.unpin_snapshot()
+        self.queries.cancel_all()
+        for pool in (self.pool, self.loading_pool):
+            if pool is not None:
+                pool.close()
+        if self in SQLiteBrowser.windows:
+            SQLiteBrowser.windows.remove(self)
+        super().closeEvent(event)
+    
+    @staticmethod
+    def default_open_options():
+        return {
+            'immutable': False,
+            'mmap_size': POOL_CONFIG['mmap_size'],
+            'cache_size_kib': POOL_CONFIG['cache_size_kib'],
+        }
+    
+    def open_database_with_options(self):
+        """Open a database with a chosen mode, mmap size and cache size"""
+        dialog = OpenOptionsDialog(self.open_options, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        self.open_options = dialog.options()
+        self.load_database(dialog.db_path(), self.open_options)
+    
     def update_status_bar(self, message, db_name=None):
         """Update status bar with database info and current message"""
         if db_name:
@@ -296,103 +2102,242 @@ class SQLiteBrowser(QMainWindow):
         else:
             status_text = message
         self.status_bar.showMessage(status_text)
+        self.pool_label.setText(f"{self.pool.stats_text()} | {self.page_cache.stats_text()}" if self.pool else "")
+        self.mode_label.setText(self.pool.mode_text() if self.pool else "")
+    
+    def load_database(self, db_path, options=None):
+        """Open a database in the background, then populate the tree"""
+        options = options or self.default_open_options()
+        if self.loading_pool is not None:
+            self.loading_pool.close()  # Superseded by this database
+        pool = ConnectionPool(db_path, cache_size_kib=options['cache_size_kib'],
+                              mmap_size=options['mmap_size'], immutable=options['immutable'])
+        catalog = SchemaCatalog()
+        search_index = SearchIndex(db_path)
+        self.loading_pool = pool
+        
+        def read_database(conn):
+            # Reading the catalog also tests the connection
+            catalog.refresh(conn)
+            search_index.load()
+            return journal_mode(conn)
+        
+        worker = TaskWorker(pool, read_database)
+        worker.result_ready.connect(
+            lambda mode, p=pool: self.on_database_read(p, catalog, search_index, db_path, mode == 'wal'))
+        worker.error_occurred.connect(lambda error, p=pool: self.on_database_failed(p, error))
+        self.update_status_bar(f"Opening {os.path.basename(db_path)}...")
+        self.queries.start(worker, supersedable=False, origin='tree')
     
-    def load_database(self, db_path):
-        """Load database and populate tree"""
+    def on_database_failed(self, pool, error_message):
+        if pool is not self.loading_pool:
+            return
+        self.loading_pool = None
+        pool.close()
+        self.update_status_bar("No database loaded" if not self.db_path else "Failed to open database",
+                               os.path.basename(self.db_path) if self.db_path else None)
+        QMessageBox.critical(self, "Error", f"Failed to open database:\n{error_message}")
+    
+    def on_database_read(self, pool, catalog, search_index, db_path, wal_mode=False):
+        """Switch to a database whose catalog was read in the background"""
+        if pool is not self.loading_pool:
+            return  # Another database was opened meanwhile
+        self.loading_pool = None
         try:
-            # Test connection
-            conn = sqlite3.connect(db_path)
-            conn.close()
-            
+            self.unpin_snapshot()
+            self.snapshot_action.setChecked(False)
+            if self.pool:
+                self.queries.cancel_all()
+                self.pool.close()
+            self.pool = pool
+            self.catalog = catalog
+            self.search_index = search_index
+            if self.search_index.tables:
+                pool.attach(ATTACH_ALIAS, self.search_index.path)
+            self.row_count_cache.clear()
+            self.page_cache.clear()
+            self.profile_cache.clear()
+            self.workload.clear()
+            self.column_widths.clear()
+            self.count_worker = None
             self.db_path = db_path
+            self.wal_mode = wal_mode
+            self.shown_snapshot = None
+            self.show_snapshot()
+            self.paginator = None
+            self.combo_table = None
+            self.sort_column = None
             db_name = os.path.basename(db_path)
             self.populate_tree()
             self.load_schema()
+            self.warm_catalog()
+            self.start_live_refresh()  # Follows the new database if live refresh is on
+            self.setWindowTitle(f"{db_name} - OJDB Viewer (Our Jank Database Viewer)")
             self.update_status_bar(f"Loaded successfully", db_name)
+            self.database_loaded.emit(db_path)
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to open database:\n{str(e)}")
     
     def populate_tree(self):
-        """Populate tree widget with database structure"""
+        """Populate tree widget with table names; columns are added on expand"""
         if not self.db_path:
             return
         
         self.tree_widget.clear()
+        self.tree_buckets = {}
         
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get all tables
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-            tables = cursor.fetchall()
-            
-            # Create root item
-            root = QTreeWidgetItem(self.tree_widget)
-            root.setText(0, os.path.basename(self.db_path))
-            root.setExpanded(True)
-            
-            # Add tables
-            tables_item = QTreeWidgetItem(root)
+        all_tables = self.catalog.table_names()
+        filter_text = self.tree_filter_input.text().strip().lower()
+        if filter_text:
+            tables = [name for name in all_tables if filter_text in name.lower()]
+        else:
+            tables = all_tables
+        
+        # Create root item
+        root = QTreeWidgetItem(self.tree_widget)
+        root.setText(0, os.path.basename(self.db_path))
+        root.setExpanded(True)
+        
+        # Add tables
+        tables_item = QTreeWidgetItem(root)
+        if filter_text:
+            tables_item.setText(0, f"Tables ({len(tables)} of {len(all_tables)})")
+        else:
             tables_item.setText(0, f"Tables ({len(tables)})")
-            tables_item.setExpanded(True)
-            
-            for table_name, in tables:
-                table_item = QTreeWidgetItem(tables_item)
-                table_item.setText(0, table_name)
-                table_item.setData(0, Qt.UserRole, {'type': 'table', 'name': table_name})
-                
-                # Get column info
-                cursor.execute(f"PRAGMA table_info({table_name})")
-                columns = cursor.fetchall()
+        
+        self.add_table_items(tables_item, tables)
+        tables_item.setExpanded(True)
+    
+    def add_table_items(self, parent, tables, prefix=""):
+        """Add table nodes, grouping large sets (e.g. time partitions) into prefix buckets"""
+        groups = None
+        if len(tables) > self.tree_bucket_threshold:
+            groups = group_by_prefix(tables, self.tree_bucket_threshold, prefix)
+        if not groups or len(groups) == 1:
+            for table_name in tables:
+                self.add_table_item(parent, table_name)
+            return
+        
+        for bucket_prefix, names in groups:
+            if len(names) == 1:
+                self.add_table_item(parent, names[0])
+                continue
+            bucket_item = QTreeWidgetItem(parent)
+            bucket_item.setText(0, f"{bucket_prefix}* ({len(names)})")
+            bucket_item.setData(0, Qt.UserRole, {'type': 'bucket', 'prefix': bucket_prefix})
+            bucket_item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+            self.tree_buckets[bucket_prefix] = names
+    
+    def add_table_item(self, parent, table_name):
+        """Add a table node whose columns are filled in when it is expanded"""
+        table_item = QTreeWidgetItem(parent)
+        table_item.setText(0, table_name)
+        table_item.setData(0, Qt.UserRole, {'type': 'table', 'name': table_name})
+        table_item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+        return table_item
+    
+    def tree_item_expanded(self, item):
+        """Fill in bucket or table children the first time a node is expanded"""
+        data = item.data(0, Qt.UserRole)
+        if not data or item.childCount():
+            return
+        
+        if data.get('type') == 'bucket':
+            prefix = data['prefix']
+            self.add_table_items(item, self.tree_buckets.get(prefix, []), prefix)
+        elif data.get('type') == 'table':
+            table_name = data['name']
+            info = self.table_info(table_name, 'tree')
+            for column_info in (info.columns if info else []):
+                col_name = column_info.name
+                col_type = column_info.type
+                is_pk = " (PK)" if column_info.pk else ""
+                is_nullable = " (NOT NULL)" if column_info.notnull else ""
                 
-                for column_info in columns:
-                    col_name = column_info[1]
-                    col_type = column_info[2]
-                    is_pk = " (PK)" if column_info[5] else ""
-                    is_nullable = "" if column_info[3] else " (NOT NULL)"
-                    
-                    column_item = QTreeWidgetItem(table_item)
-                    column_item.setText(0, f"{col_name}: {col_type}{is_pk}{is_nullable}")
-                    column_item.setData(0, Qt.UserRole, {'type': 'column', 'table': table_name, 'name': col_name})
-            
-            conn.close()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to read database structure:\n{str(e)}")
+                column_item = QTreeWidgetItem(item)
+                column_item.setText(0, f"{col_name}: {col_type}{is_pk}{is_nullable}")
+                column_item.setData(0, Qt.UserRole, {'type': 'column', 'table': table_name, 'name': col_name})
+        
+        if not item.childCount():
+            item.setChildIndicatorPolicy(QTreeWidgetItem.DontShowIndicatorWhenChildless)
+    
+    def warm_catalog(self):
+        """Load column and index info for every table in the background"""
+        self.queries.start(TaskWorker(self.pool, self.catalog.load_columns), supersedable=False, origin='tree')
     
     def load_schema(self):
         """Load database schema into schema tab"""
         if not self.db_path:
             return
+        if self.tab_widget.currentWidget() is not self.schema_tab:
+            self.schema_stale = True  # Filled by tab_changed when the tab is opened
+            return
+        self.schema_stale = False
         
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY type, name")
-            schema_statements = cursor.fetchall()
-            
-            schema_text = "-- Database Schema\n\n"
-            for sql, in schema_statements:
-                schema_text += sql + ";\n\n"
-            
-            self.schema_text.setPlainText(schema_text)
-            conn.close()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load schema:\n{str(e)}")
+        schema_text = "-- Database Schema\n\n"
+        for _, _, sql in self.catalog.statements:
+            schema_text += sql + ";\n\n"
+        
+        self.schema_text.setPlainText(schema_text)
     
     def tree_item_clicked(self, item, column):
         """Handle tree item click"""
         data = item.data(0, Qt.UserRole)
         if data and data.get('type') == 'table':
+            if data['name'] != self.current_table:
+                self.sort_column = None
             self.current_table = data['name']
             self.current_offset = 0
             self.load_table_data()
             self.tab_widget.setCurrentIndex(0)  # Switch to data tab
     
+    def tree_item_double_clicked(self, item, column):
+        """Profile a column when its tree item is double-clicked"""
+        data = item.data(0, Qt.UserRole)
+        if data and data.get('type') == 'column':
+            self.profile_column(data['table'], data['name'])
+    
+    def show_tree_menu(self, position):
+        """Context menu of tree items"""
+        item = self.tree_widget.itemAt(position)
+        data = item.data(0, Qt.UserRole) if item else None
+        if not data or data.get('type') != 'column':
+            return
+        menu = QMenu(self)
+        profile_action = menu.addAction("Profile Column...")
+        profile_action.triggered.connect(lambda: self.profile_column(data['table'], data['name']))
+        menu.exec_(self.tree_widget.viewport().mapToGlobal(position))
+    
+    def open_index_advisor(self):
+        """Open the index advisor for the filters and sorts run in this window"""
+        if not self.pool:
+            return
+        tables = {}
+        for entry in self.workload.slow_entries():
+            info = self.table_info(entry.shape.table)
+            if info is not None:
+                tables[info.name] = info
+        dialog = IndexAdvisorDialog(self.pool, self.queries, self.workload, tables, self.db_path, self)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.show()
+    
+    def profile_column(self, table_name, column_name):
+        """Open a profile of a column's values, computed in the background"""
+        info = self.table_info(table_name)
+        if info is None or not self.pool:
+            return
+        try:
+            data_version = self.pool.data_version()
+        except Exception as e:
+            self.show_error(str(e))
+            return
+        profiler = ColumnProfiler(table_name, column_name, info.key_columns())
+        dialog = ColumnProfileDialog(self.pool, self.queries, profiler, self.profile_cache, data_version,
+                                     f"Profile of {table_name}.{column_name}", self)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.show()
+    
     def load_table_data(self):
         """Load data for current table"""
         if not self.db_path or not self.current_table:
@@ -401,135 +2346,362 @@ class SQLiteBrowser(QMainWindow):
         # Update column combo for filtering
         self.update_column_combo()
         
-        # Build query
-        query = f"SELECT * FROM {self.current_table}"
-        params = []
+        paginator = self.get_paginator()
+        if paginator is None:
+            return
         
-        # Apply search filter if active
+        # Interrupt and ignore everything still running for the previous request
+        self.queries.next_generation()
+        
+        page = self.current_offset // self.rows_per_page
+        try:
+            data_version = self.snapshot_version()
+        except Exception as e:
+            self.show_error(str(e))
+            return
+        cache_key = self.page_cache.key(paginator, page)
+        cached = self.page_cache.get(cache_key, data_version)
+        # The total shown with a page has to come from the same snapshot
+        count_known = self.show_known_count(paginator, data_version)
+        if cached is not None and count_known:
+            # Visited before or prefetched while the previous page was on screen
+            self.show_cached_page(page, *cached)
+            self.shown_snapshot = (data_version, time.time())
+            self.show_snapshot()
+        else:
+            if not count_known:
+                self.cancel_count()
+                self.row_count = (None, None)
+                self.update_pagination_info()
+            # Stream the page into the model in worker thread, counting in the same snapshot
+            query, params = paginator.page_query(page)
+            counter = RowCounter(self.current_table, paginator.key_columns, paginator.condition, paginator.params)
+            search_key = self.parallel_search_key(paginator, page, counter, count_known)
+            self.start_rows_worker(query, params, reset=True, page=page,
+                                   cache_key=cache_key, data_version=data_version,
+                                   counter=counter, count_known=count_known, shape=self.query_shape(paginator),
+                                   search_key=search_key)
+        self.update_sort_plan(paginator)
+        self.update_filter_plan(paginator)
+    
+    def get_paginator(self):
+        """Return the paginator for the current table, filter, sort and page size"""
+        info = self.table_info(self.current_table)
+        if info is None:
+            self.show_error(f"Table '{self.current_table}' no longer exists")
+            return None
+        if self.paginator is None or self.paginator.table != self.current_table:
+            # Long values are cut to a preview in SQL; the cell viewer reads them in full
+            self.paginator = KeysetPaginator(self.current_table, info.key_columns(), self.rows_per_page,
+                                             preview_select(info.columns))
+        
+        if self.sort_column not in info.column_names:
+            self.sort_column = None  # Column dropped by a schema change
+        self.paginator.set_page_size(self.rows_per_page)
+        self.paginator.set_filter(*self.build_filter_clause())
+        self.paginator.set_sort(self.sort_column, self.sort_order == Qt.DescendingOrder,
+                                info.is_nullable(self.sort_column))
+        return self.paginator
+    
+    def parallel_search_key(self, paginator, page, counter, count_known):
+        """Rowid key to search the first page of a new filter in parallel shards, else None
+        
+        Whether the filter needs a full scan and the table is large enough
+        is decided by the SearchWorker.
+        """
+        if not self.parallel_action.isChecked() or self.pin is not None:
+            return None  # A pinned snapshot has a single connection
+        if page != 0 or count_known or not paginator.condition or paginator.sort_column is not None:
+            return None
+        return counter.rowid_key
+    
+    def query_shape(self, paginator):
+        """Filter and sort of the current page for the index advisor, None for plain key order"""
+        if not paginator.condition and paginator.sort_column is None:
+            return None
+        column = self.column_combo.currentText()
+        if not paginator.condition:
+            filter_column, mode, indexable = None, None, False
+        elif self.filter_mode is not None:
+            filter_column, mode, indexable = column, self.filter_mode, self.filter_indexable
+        else:
+            filter_column, mode, indexable = None, 'contains', False  # All Columns
+        query, params = paginator.page_query(0)
+        return QueryShape(paginator.table, filter_column, mode, indexable, paginator.sort_column,
+                          paginator.condition, list(paginator.params), query, list(params), self.rows_per_page)
+    
+    def build_filter_clause(self):
+        """Build the filter condition and parameters for the active search"""
         search_text = self.search_input.text().strip()
         selected_column = self.column_combo.currentText()
+        self.filter_mode = None
+        self.filter_indexable = False
         
         if search_text and selected_column and selected_column != "All Columns":
-            query += f" WHERE {selected_column} LIKE ?"
-            params.append(f"%{search_text}%")
+            info = self.table_info(self.current_table)
+            decl_type = info.column_type(selected_column) if info else ""
+            condition, params, self.filter_mode = column_filter(
+                selected_column, decl_type, self.mode_combo.currentData(), search_text)
+            self.filter_indexable = index_usable(decl_type, self.filter_mode, search_text)
+            return condition, params
         elif search_text:
             # Search all text columns
+            info = self.table_info(self.current_table)
+            text_columns = info.text_columns() if info else []
+            if text_columns:
+                conditions = [f"{quote_identifier(col)} LIKE ?" for col in text_columns]
+                condition = ' OR '.join(conditions)
+                params = [f"%{search_text}%" for _ in text_columns]
+                # Resolve matches through the search index when it covers these columns
+                key_columns = info.key_columns()
+                entry = self.search_index.get(self.current_table) if self.search_index else None
+                if entry and entry['columns'] == text_columns and len(key_columns) == 1:
+                    indexed = self.search_index.search_condition(
+                        self.current_table, key_columns[0], search_text, condition, params)
+                    if indexed:
+                        return indexed
+                return condition, params
+        return "", []
+    
+    def table_info(self, table_name, origin='columns'):
+        """Return catalog info for a table, loading its columns on first use"""
+        info = self.catalog.get(table_name)
+        if info is not None and not info.loaded:
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute(f"PRAGMA table_info({self.current_table})")
-                columns = cursor.fetchall()
-                conn.close()
-                
-                text_columns = [col[1] for col in columns if col[2].upper() in ['TEXT', 'VARCHAR', 'CHAR']]
-                if text_columns:
-                    conditions = [f"{col} LIKE ?" for col in text_columns]
-                    query += f" WHERE {' OR '.join(conditions)}"
-                    params.extend([f"%{search_text}%" for _ in text_columns])
-            except:
-                pass
-        
-        # Add pagination
-        query += f" LIMIT {self.rows_per_page} OFFSET {self.current_offset}"
-        
-        # Execute query in worker thread
-        self.worker = DatabaseWorker(self.db_path, query, params)
-        self.worker.data_ready.connect(self.populate_table)
-        self.worker.error_occurred.connect(self.show_error)
-        self.worker.start()
-        
-        # Get total count for pagination
-        count_query = f"SELECT COUNT(*) FROM {self.current_table}"
-        count_params = []
-        
-        if search_text and selected_column and selected_column != "All Columns":
-            count_query += f" WHERE {selected_column} LIKE ?"
-            count_params.append(f"%{search_text}%")
-        elif search_text:
-            try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute(f"PRAGMA table_info({self.current_table})")
-                columns = cursor.fetchall()
-                conn.close()
-                
-                text_columns = [col[1] for col in columns if col[2].upper() in ['TEXT', 'VARCHAR', 'CHAR']]
-                if text_columns:
-                    conditions = [f"{col} LIKE ?" for col in text_columns]
-                    count_query += f" WHERE {' OR '.join(conditions)}"
-                    count_params.extend([f"%{search_text}%" for _ in text_columns])
-            except:
-                pass
-        
-        self.count_worker = DatabaseWorker(self.db_path, count_query, count_params)
-        self.count_worker.data_ready.connect(self.update_pagination_info)
-        self.count_worker.start()
-    
-    def populate_table(self, data, column_names):
-        """Populate table widget with data"""
-        self.table_widget.setRowCount(len(data))
-        self.table_widget.setColumnCount(len(column_names))
-        self.table_widget.setHorizontalHeaderLabels(column_names)
-        
-        for row_idx, row_data in enumerate(data):
-            for col_idx, value in enumerate(row_data):
-                item = QTableWidgetItem(str(value) if value is not None else "")
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Make read-only
-                self.table_widget.setItem(row_idx, col_idx, item)
-        
-        # Improve column sizing
-        header = self.table_widget.horizontalHeader()
-        
-        # Auto-resize columns to content, but with constraints
-        self.table_widget.resizeColumnsToContents()
-        
-        # Set reasonable column width limits
-        for col in range(len(column_names)):
-            current_width = self.table_widget.columnWidth(col)
-            # Set minimum and maximum widths
-            min_width = max(80, len(column_names[col]) * 8)  # Based on header text
-            max_width = 300  # Maximum column width
-            
-            if current_width < min_width:
-                self.table_widget.setColumnWidth(col, min_width)
-            elif current_width > max_width:
-                self.table_widget.setColumnWidth(col, max_width)
-        
-        # Set resize modes
-        header.setSectionResizeMode(QHeaderView.Interactive)
-        
-        # If we have extra space, distribute it among columns
-        total_width = sum(self.table_widget.columnWidth(col) for col in range(len(column_names)))
-        available_width = self.table_widget.viewport().width()
+                with self.queries.connection(self.pool, origin) as conn:
+                    self.catalog.load_columns(conn, [table_name])
+            except Exception as e:
+                print(f"Error loading columns for {table_name}: {e}")
+        return info
+    
+    def start_rows_worker(self, query, params, reset, page=None, cache_key=None, data_version=None,
+                          counter=None, count_known=True, shape=None, search_key=None):
+        """Run a row query in a worker thread and stream batches into the model"""
+        if search_key is not None:
+            paginator = self.paginator
+            worker = SearchWorker(self.pool, paginator, search_key, self.stream_batch_size,
+                                  data_version=data_version, counter=counter)
+            worker.scan_progress.connect(lambda *progress, w=worker: self.on_scan_progress(w, *progress))
+            worker.samples_ready.connect(
+                lambda samples, stride, p=paginator, g=paginator.generation: self.on_search_samples(
+                    p, g, samples, stride))
+        else:
+            worker = PageWorker(self.read_source(), query, params, self.stream_batch_size,
+                                snapshot=self.wal_mode and page is not None, data_version=data_version,
+                                counter=counter, count_known=count_known)
+        worker.page = page
+        worker.cache_key = cache_key  # Page cache entry to fill once the page is complete
+        worker.shape = shape
+        worker.column_names = []
+        if counter is not None:
+            worker.count_key = RowCountCache.key(self.current_table, counter.condition, counter.params)
+            worker.count_started.connect(lambda w=worker: self.on_page_count_started(w))
+            worker.count_ready.connect(lambda count, kind, w=worker: self.on_count_ready(w, count, kind))
+        if reset:
+            worker.columns_ready.connect(
+                lambda names, w=worker: self.on_columns_ready(w, names))
+        worker.batch_ready.connect(lambda rows, w=worker: self.on_batch_ready(w, rows))
+        worker.stream_finished.connect(lambda total, w=worker: self.on_stream_finished(w, total))
+        worker.error_occurred.connect(self.show_error)
+        self.queries.start(worker)
+    
+    def fetch_more_rows(self):
+        """Load the next batch of rows when the view scrolls to the end (continuous mode)"""
+        paginator = self.paginator
+        if not self.db_path or not self.current_table or paginator is None:
+            self.table_model.finish_fetch(False)
+            return
         
-        if total_width < available_width and len(column_names) > 0:
-            # Stretch the last column to fill remaining space
-            header.setSectionResizeMode(len(column_names) - 1, QHeaderView.Stretch)
+        loaded = self.table_model.rowCount()
+        if paginator.uses_keyset and loaded:
+            query, params = paginator.after_query(self.table_model.row_key(loaded - 1))
+        else:
+            query, params = paginator.offset_query(self.current_offset + loaded)
+        self.start_rows_worker(query, params, reset=False)
+    
+    def on_columns_ready(self, worker, column_names):
+        """Start a new result set in the model"""
+        if not self.queries.is_current(worker):
+            return  # Superseded by a newer query
+        worker.column_names = column_names
+        self.reset_model(column_names)
+    
+    def reset_model(self, column_names):
+        """Clear the grid for a page with the given columns (hidden key columns first)"""
+        self.table_model.reset(column_names, first_row_number=self.current_offset + 1,
+                               key_width=self.paginator.key_width)
+        self.show_sort_indicator()
+        # Widths known for this table apply before any rows arrive, so columns never jump
+        self.columns_sized = self.apply_column_widths()
+    
+    def show_cached_page(self, page, column_names, rows):
+        """Show a page from the page cache without querying the database"""
+        self.reset_model(column_names)
+        self.table_model.append_rows(rows)
+        self.finish_rows(page, len(rows), cached=True)
+    
+    def on_batch_ready(self, worker, rows):
+        """Append streamed rows to the model"""
+        if not self.queries.is_current(worker):
+            return
+        self.table_model.append_rows(rows)
+        if not self.columns_sized:
+            self.columns_sized = True
+            self.size_columns()
+    
+    def on_stream_finished(self, worker, total):
+        """Finish a streamed query and report it"""
+        if not self.queries.is_current(worker):
+            return
+        if worker.shape is not None and worker.elapsed is not None:
+            self.workload.record(worker.shape, 'page', worker.elapsed)
+        if worker.page is not None:
+            # Rows read after a commit belong to that commit's version, if it is known
+            if worker.cache_key is not None and worker.snapshot_version is not None:
+                self.page_cache.put(worker.cache_key, worker.snapshot_version, worker.column_names,
+                                    self.table_model.rows)
+            self.shown_snapshot = (worker.snapshot_version, time.time())
+            self.show_snapshot()
+        self.finish_rows(worker.page, total)
+    
+    def on_scan_progress(self, worker, finished, shards, bytes_scanned, seconds):
+        """Show how far a parallel search got and how fast it reads"""
+        if worker is not self.count_worker and not self.queries.is_current(worker):
+            return
+        rate = bytes_scanned / seconds / (1024 * 1024) if seconds else 0
+        state = "Searched" if finished == shards else f"Searching ({finished}/{shards} shards)"
+        self.update_status_bar(f"{state} {format_size(int(bytes_scanned))} of '{self.current_table}' on "
+                               f"{worker.scan.connections} connections in {seconds:.1f} s, "
+                               f"{rate:,.0f} MB/s", os.path.basename(self.db_path))
+    
+    def on_search_samples(self, paginator, generation, samples, stride):
+        """Let later pages of a parallel search seek straight to their first match"""
+        if paginator is self.paginator and paginator.generation == generation:
+            paginator.set_samples(samples, stride)
+    
+    def finish_rows(self, page, total, cached=False):
+        """Update paging state once a page or a continuous scroll batch is complete"""
+        more_available = self.continuous_checkbox.isChecked() and total == self.rows_per_page
+        self.table_model.finish_fetch(more_available)
+        if page is not None and total:
+            self.paginator.record_page(page, self.table_model.row_key(0),
+                                       self.table_model.row_key(total - 1), total)
+        if self.pending_row is not None:
+            self.select_pending_row()
+        if page is not None:
+            self.update_pagination_info()
+            self.prefetch_pages(page)
+        if not self.columns_sized:
+            self.columns_sized = True
+            self.size_columns()
         
         # Update status with database info
         db_name = os.path.basename(self.db_path) if self.db_path else "Unknown"
-        message = f"Loaded {len(data)} rows from table '{self.current_table}'"
+        message = f"Loaded {self.table_model.rowCount()} rows from table '{self.current_table}'"
+        if cached:
+            message += " (cached)"
         self.update_status_bar(message, db_name)
     
+    def prefetch_pages(self, page):
+        """Load the pages after and before the current one in the background"""
+        paginator = self.paginator
+        if not PAGE_CACHE_CONFIG['prefetch'] or self.continuous_checkbox.isChecked():
+            return
+        neighbours = [page - 1] if page > 0 else []
+        if self.table_model.rowCount() == self.rows_per_page:
+            neighbours.insert(0, page + 1)  # A short page is the last one
+        for neighbour in neighbours:
+            cache_key = self.page_cache.key(paginator, neighbour)
+            if cache_key in self.page_cache or cache_key in self.prefetching:
+                continue
+            if paginator.uses_keyset and neighbour not in paginator.boundaries \
+                    and neighbour + 1 not in paginator.first_keys:
+                continue  # Only prefetch pages that a key seek can reach
+            query, params = paginator.page_query(neighbour)
+            worker = DatabaseWorker(self.read_source(), query, params, snapshot=self.wal_mode)
+            worker.data_ready.connect(
+                lambda rows, names, w=worker, p=paginator, g=paginator.generation, n=neighbour, k=cache_key,
+                v=self.page_cache.data_version: self.on_prefetch_ready(w, p, g, n, k, v, names, rows))
+            worker.finished.connect(lambda k=cache_key: self.prefetching.discard(k))
+            self.prefetching.add(cache_key)
+            # Superseded by the next navigation, like the page query itself
+            self.queries.start(worker, origin='prefetch')
+    
+    def on_prefetch_ready(self, worker, paginator, generation, page, cache_key, data_version, column_names, rows):
+        """Cache a prefetched page and remember its keys so the next prefetch can seek"""
+        if worker.snapshot and worker.snapshot_version != data_version:
+            return  # Read after a commit, so it may not line up with the page on screen
+        self.page_cache.put(cache_key, data_version, column_names, rows)
+        if paginator is self.paginator and paginator.generation == generation and rows:
+            width = paginator.key_width
+            paginator.record_page(page, rows[0][:width], rows[-1][:width], len(rows))
+    
+    def size_columns(self):
+        """Estimate the column widths of the current table from the loaded rows"""
+        info = self.table_info(self.current_table)
+        types = {col.name: col.type for col in info.columns or []} if info else {}
+        widths = dict(zip(self.table_model.column_names,
+                          estimate_column_widths(self.table_view, self.table_model, types)))
+        if self.table_model.rows:
+            self.column_widths[self.current_table] = widths  # An empty result is no sample
+        self.apply_column_widths(widths)
+    
+    def apply_column_widths(self, widths=None):
+        """Apply widths, by default the current table's cached ones; False if any are missing"""
+        if widths is None:
+            widths = self.column_widths.get(self.current_table, {})
+        column_names = self.table_model.column_names
+        if not column_names or any(name not in widths for name in column_names):
+            return False
+        
+        header = self.table_view.horizontalHeader()
+        self.applying_widths = True
+        try:
+            header.setSectionResizeMode(QHeaderView.Interactive)
+            for col, name in enumerate(column_names):
+                self.table_view.setColumnWidth(col, widths[name])
+            
+            # If we have extra space, stretch the last column to fill it
+            total_width = sum(widths[name] for name in column_names)
+            if total_width < self.table_view.viewport().width():
+                header.setSectionResizeMode(len(column_names) - 1, QHeaderView.Stretch)
+        finally:
+            self.applying_widths = False
+        return True
+    
+    def column_resized(self, section, old_width, new_width):
+        """Remember widths the user sets by dragging a column edge"""
+        column_names = self.table_model.column_names
+        if self.applying_widths or section >= len(column_names) - 1:
+            return  # Ours, or the stretched last column
+        widths = self.column_widths.get(self.current_table)
+        if widths is not None:
+            widths[column_names[section]] = new_width
+    
+    def remeasure_columns(self):
+        """Estimate the current table's column widths again from the rows on screen"""
+        if not self.current_table or not self.table_model.rows:
+            return
+        self.column_widths.pop(self.current_table, None)
+        self.size_columns()
+    
     def update_column_combo(self):
         """Update column combo box with current table columns"""
         if not self.db_path or not self.current_table:
             return
+        if self.combo_table == self.current_table:
+            return  # Keep the selected column while paging and filtering
         
         try:
             # Set flag to prevent recursion
             self.updating_combo = True
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(f"PRAGMA table_info({self.current_table})")
-            columns = cursor.fetchall()
-            conn.close()
-            
+            info = self.table_info(self.current_table, 'combo')
             self.column_combo.clear()
             self.column_combo.addItem("All Columns")
-            for column_info in columns:
-                self.column_combo.addItem(column_info[1])  # column name
+            for column_name in (info.column_names if info else []):
+                self.column_combo.addItem(column_name)
+            self.combo_table = self.current_table
                 
         except Exception as e:
             print(f"Error updating column combo: {e}")
@@ -537,18 +2709,223 @@ class SQLiteBrowser(QMainWindow):
             # Always reset flag
             self.updating_combo = False
     
-    def update_pagination_info(self, data, column_names):
-        """Update pagination controls with total count"""
-        if data:
-            total_rows = data[0][0]
-            current_page = (self.current_offset // self.rows_per_page) + 1
+    def update_row_count(self, paginator, quiet=False):
+        """Show a cached exact count, or start an estimate-then-exact count
+        
+        A quiet count keeps the shown count until the new exact one is known.
+        """
+        try:
+            data_version = self.snapshot_version()
+        except Exception as e:
+            self.show_error(str(e))
+            return
+        if self.show_known_count(paginator, data_version):
+            return
+        
+        self.cancel_count()
+        if not quiet:
+            self.row_count = (None, None)
+            self.update_pagination_info()
+        counter = RowCounter(self.current_table, paginator.key_columns, paginator.condition, paginator.params)
+        cache_key = RowCountCache.key(self.current_table, paginator.condition, paginator.params)
+        worker = CountWorker(self.read_source(), counter, cache_key, data_version, snapshot=self.wal_mode)
+        worker.quiet = quiet
+        worker.count_ready.connect(lambda count, kind, w=worker: self.on_count_ready(w, count, kind))
+        worker.error_occurred.connect(self.show_error)
+        self.count_worker = worker
+        # Not tied to the page generation: paging must not restart the count
+        self.queries.start(worker, supersedable=False)
+    
+    def show_known_count(self, paginator, data_version):
+        """Show the cached exact count of a snapshot; False unless cached or being counted"""
+        cache_key = RowCountCache.key(self.current_table, paginator.condition, paginator.params)
+        count = self.row_count_cache.get(cache_key, data_version)
+        if count is not None:
+            self.cancel_count()
+            self.row_count = (count, 'exact')
+            self.update_pagination_info()
+            return True
+        
+        worker = self.count_worker
+        if worker is not None and worker.is_running() and not worker.cancelled \
+                and worker.count_key == cache_key and worker.count_version == data_version:
+            self.update_pagination_info()  # Still counting this table and filter
+            return True
+        return False
+    
+    def on_page_count_started(self, worker):
+        """A page worker goes on to count its rows in the page's snapshot"""
+        if worker.cancelled or worker is self.count_worker:
+            return
+        if not self.queries.is_current(worker):
+            worker.cancel()  # Its page was superseded before the count was taken over
+            return
+        self.cancel_count()
+        self.count_worker = worker
+    
+    def cancel_count(self):
+        """Stop the running row count, if any"""
+        if self.count_worker is not None:
+            self.count_worker.cancel()
+            self.count_worker = None
+    
+    def on_count_ready(self, worker, count, kind):
+        """Apply a count step from the count worker"""
+        if worker is not self.count_worker or (worker.quiet and kind != 'exact'):
+            return
+        if kind == 'exact' and worker.count_version is not None:
+            self.row_count_cache.put(worker.count_key, worker.count_version, count)
+        if kind == 'exact' and worker.shape is not None and worker.count_seconds is not None:
+            self.workload.record(worker.shape, 'count', worker.count_seconds)
+        elif kind == 'estimate' and self.row_count[1] == 'partial':
+            return
+        self.row_count = (count, kind)
+        self.update_pagination_info()
+    
+    def update_pagination_info(self):
+        """Update pagination controls from the current row count"""
+        total_rows, kind = self.row_count
+        current_page = (self.current_offset // self.rows_per_page) + 1
+        page_full = self.table_model.rowCount() >= self.rows_per_page
+        
+        if total_rows is None:
+            self.total_rows_label.setText("Total: counting...")
+        elif kind == 'estimate':
+            self.total_rows_label.setText(f"Total: ~{total_rows:,} rows (estimated)")
+        elif kind == 'partial':
+            self.total_rows_label.setText(f"Total: at least {total_rows:,} rows (counting...)")
+        else:
+            self.total_rows_label.setText(f"Total: {total_rows:,} rows")
+        
+        if self.continuous_checkbox.isChecked():
+            self.page_label.setText("Scrolling")
+            self.prev_button.setEnabled(False)
+            self.next_button.setEnabled(False)
+            return
+        
+        self.prev_button.setEnabled(self.current_offset > 0)
+        if kind == 'exact':
             total_pages = (total_rows + self.rows_per_page - 1) // self.rows_per_page
-            
             self.page_label.setText(f"Page {current_page} of {total_pages}")
-            self.total_rows_label.setText(f"Total: {total_rows} rows")
-            
-            self.prev_button.setEnabled(self.current_offset > 0)
             self.next_button.setEnabled(self.current_offset + self.rows_per_page < total_rows)
+            return
+        
+        if total_rows is None:
+            self.page_label.setText(f"Page {current_page}")
+        else:
+            total_pages = (total_rows + self.rows_per_page - 1) // self.rows_per_page
+            prefix = "~" if kind == 'estimate' else "at least "
+            self.page_label.setText(f"Page {current_page} of {prefix}{total_pages}")
+        # Until the exact count arrives, a full page means there may be more rows
+        self.next_button.setEnabled(page_full)
+    
+    def open_cell(self, index):
+        """Show the complete value of a cell in a viewer window"""
+        paginator = self.paginator
+        if paginator is None or not index.isValid():
+            return
+        if not paginator.uses_keyset:
+            if self.table_model.is_cut(index):
+                QMessageBox.information(self, "View Value",
+                                        "Rows of views have no key, so only the preview of this value can be shown.")
+            return
+        column = self.table_model.column_names[index.column()]
+        key = self.table_model.row_key(index.row())[-len(paginator.key_columns):]
+        reader = ValueReader(self.current_table, column, paginator.key_columns, key)
+        viewer = CellViewer(self.pool, self.queries, reader, f"{self.current_table}.{column}", self)
+        viewer.setAttribute(Qt.WA_DeleteOnClose)
+        viewer.show()
+    
+    def sort_by_column(self, section):
+        """Cycle a column through ascending, descending and unsorted; sorting runs in SQL"""
+        if not self.current_table or section >= len(self.table_model.column_names):
+            return
+        column = self.table_model.column_names[section]
+        if column != self.sort_column:
+            self.sort_column = column
+            self.sort_order = Qt.AscendingOrder
+        elif self.sort_order == Qt.AscendingOrder:
+            self.sort_order = Qt.DescendingOrder
+        else:
+            self.sort_column = None
+        self.show_sort_indicator()
+        self.current_offset = 0
+        self.load_table_data()
+    
+    def show_sort_indicator(self):
+        """Show the SQL sort on the header (the header flips its indicator on every click)"""
+        names = self.table_model.column_names
+        section = names.index(self.sort_column) if self.sort_column in names else -1
+        self.table_view.horizontalHeader().setSortIndicator(section, self.sort_order)
+    
+    def update_sort_plan(self, paginator):
+        """Explain the sorted query to show whether an index delivers rows in order"""
+        if paginator.sort_column is None:
+            self.sort_plan_key = None
+            self.sort_label.setText("")
+            self.sort_label.setToolTip("")
+            return
+        plan_key = (paginator, paginator.generation)
+        if plan_key == self.sort_plan_key:
+            return  # Same sort and filter as the plan already shown
+        self.sort_plan_key = plan_key
+        self.sort_label.setText(f"Sorted by {paginator.sort_column} {self.sort_arrow(paginator)}")
+        self.sort_label.setStyleSheet("color: #666;")
+        
+        query, params = paginator.page_query(0)
+        worker = TaskWorker(self.pool, lambda conn: SortPlan.explain(conn, query, params))
+        worker.result_ready.connect(lambda plan, key=plan_key: self.on_sort_plan_ready(key, plan))
+        worker.error_occurred.connect(self.show_error)
+        self.queries.start(worker, supersedable=False, origin='plan')
+    
+    def update_filter_plan(self, paginator):
+        """Explain the first page's query to show whether an index finds the matching rows"""
+        if not paginator.condition:
+            self.filter_plan_key = None
+            self.filter_plan_label.setText("")
+            self.filter_plan_label.setToolTip("")
+            return
+        plan_key = (paginator, paginator.generation)
+        if plan_key == self.filter_plan_key:
+            return  # Same filter as the plan already shown
+        self.filter_plan_key = plan_key
+        self.filter_plan_label.setText("")
+        
+        query, params = paginator.page_query(0)
+        worker = TaskWorker(self.pool, lambda conn: FilterPlan.explain(conn, query, params))
+        worker.result_ready.connect(
+            lambda plan, key=plan_key, mode=self.filter_mode: self.on_filter_plan_ready(key, mode, plan))
+        worker.error_occurred.connect(self.show_error)
+        self.queries.start(worker, supersedable=False, origin='plan')
+    
+    def on_filter_plan_ready(self, plan_key, mode, plan):
+        """Show whether the filter seeks through an index or reads every row"""
+        if plan_key != self.filter_plan_key:
+            return  # Filter changed while explaining
+        labels = dict(FILTER_MODES)
+        summary = plan.summary()
+        entry = self.search_index.get(plan_key[0].table) if self.search_index else None
+        if mode is None and entry and entry['stale']:
+            summary += ", search index out of date"
+        self.filter_plan_label.setText(f"{labels[mode]}: {summary}" if mode else summary)
+        # A full scan reads every row of the table for each page and for the count
+        self.filter_plan_label.setStyleSheet("color: #b35900;" if plan.full_scan else "color: #2e7d32;")
+        self.filter_plan_label.setToolTip(format_plan(plan.plan))
+    
+    @staticmethod
+    def sort_arrow(paginator):
+        return "▼" if paginator.sort_descending else "▲"
+    
+    def on_sort_plan_ready(self, plan_key, plan):
+        """Show how SQLite will produce the sorted rows"""
+        if plan_key != self.sort_plan_key:
+            return  # Sort or filter changed while explaining
+        paginator = plan_key[0]
+        self.sort_label.setText(f"Sorted by {paginator.sort_column} {self.sort_arrow(paginator)} "
+                                f"({plan.summary()})")
+        # A temp B-tree sort reads every matching row for each page
+        self.sort_label.setStyleSheet("color: #b35900;" if plan.temp_btree else "color: #666;")
+        self.sort_label.setToolTip(format_plan(plan.plan))
     
     def previous_page(self):
         """Go to previous page"""
@@ -561,6 +2938,53 @@ class SQLiteBrowser(QMainWindow):
         self.current_offset += self.rows_per_page
         self.load_table_data()
     
+    def jump_to_row(self):
+        """Jump to the page containing a row number"""
+        text = self.goto_input.text().strip()
+        if not text or not self.current_table:
+            return
+        row_number = int(text)
+        paginator = self.get_paginator()
+        if paginator is None or row_number < 1:
+            return
+        
+        page = (row_number - 1) // self.rows_per_page
+        self.pending_row = row_number
+        needs_samples = (paginator.uses_keyset and paginator.samples is None
+                         and page not in paginator.boundaries
+                         and page + 1 not in paginator.first_keys)
+        if not needs_samples:
+            self.current_offset = page * self.rows_per_page
+            self.load_table_data()
+            return
+        
+        # Sample key positions once so later jumps only skip a bounded number of rows
+        db_name = os.path.basename(self.db_path)
+        self.update_status_bar("Sampling row positions...", db_name)
+        self.queries.next_generation()
+        sample_worker = TaskWorker(self.read_source(), paginator.collect_samples)
+        sample_worker.result_ready.connect(
+            lambda result, p=paginator, g=paginator.generation: self.on_samples_ready(p, g, result, page))
+        sample_worker.error_occurred.connect(self.show_error)
+        self.queries.start(sample_worker, origin='samples')
+    
+    def on_samples_ready(self, paginator, generation, result, page):
+        """Store sampled keys and load the requested page"""
+        if paginator is not self.paginator or paginator.generation != generation:
+            return  # Table or filter changed while sampling
+        samples, stride, total = result
+        paginator.set_samples(samples, stride)
+        self.current_offset = page * self.rows_per_page
+        self.load_table_data()
+    
+    def select_pending_row(self):
+        """Select the row requested by Go to row once it is loaded"""
+        index = self.pending_row - 1 - self.current_offset
+        self.pending_row = None
+        if 0 <= index < self.table_model.rowCount():
+            self.table_view.selectRow(index)
+            self.table_view.scrollTo(self.table_model.index(index, 0))
+    
     def change_rows_per_page(self, value):
         """Change number of rows per page"""
         self.rows_per_page = value
@@ -568,16 +2992,157 @@ class SQLiteBrowser(QMainWindow):
         if self.current_table:
             self.load_table_data()
     
+    def toggle_continuous_scroll(self, enabled):
+        """Switch between fixed pages and loading rows as the view scrolls"""
+        self.current_offset = 0
+        if self.current_table:
+            self.load_table_data()
+    
+    def update_filter_controls(self):
+        """Offer match modes and a search hint that fit the selected column"""
+        column = self.column_combo.currentText()
+        single = bool(column) and column != "All Columns"
+        self.mode_combo.setEnabled(single)
+        info = self.catalog.get(self.current_table) if self.current_table else None
+        decl_type = info.column_type(column) if info is not None and single else ""
+        self.search_input.setPlaceholderText(search_placeholder(decl_type))
+    
+    def schedule_filter(self):
+        """Restart the debounce timer so the filter runs once typing pauses"""
+        self.filter_timer.start()
+    
     def apply_filter(self):
         """Apply search filter"""
         if self.current_table and not self.updating_combo:
             self.current_offset = 0
             self.load_table_data()
+            # Index rows added since the last build so the next search finds them via the index
+            entry = self.search_index.get(self.current_table) if self.search_index else None
+            if entry and not entry['stale'] and self.index_worker is None:
+                self.start_index_build(self.current_table)
+    
+    def export_data(self):
+        """Export the current table, with the active filter, in the background"""
+        if not self.current_table:
+            QMessageBox.information(self, "Export Data", "Select a table to export first.")
+            return
+        paginator = self.get_paginator()
+        if paginator is None:
+            return
+        
+        filters = list(EXPORT_FORMATS.values())
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Data", f"{self.current_table}.csv", ";;".join(filters))
+        if not file_path:
+            return
+        fmt = next((key for key, value in EXPORT_FORMATS.items() if value == selected_filter), 'csv')
+        if not os.path.splitext(file_path)[1]:
+            file_path += f".{fmt}"
+        
+        query = f"SELECT * FROM {quote_identifier(self.current_table)}"
+        if paginator.condition:
+            query += f" WHERE {paginator.condition}"
+        query += paginator.order_clause()
+        info = self.table_info(self.current_table)
+        create_sql = info.sql if info and info.kind == 'table' else None
+        total = self.row_count[0] if self.row_count[1] in ('exact', 'estimate') else None
+        job = ExportJob(self.current_table, query, paginator.params, file_path, fmt, create_sql, total)
+        
+        dialog = QProgressDialog(f"Exporting '{self.current_table}'...", "Cancel", 0, 100 if total else 0, self)
+        dialog.setWindowTitle("Export Data")
+        dialog.setMinimumDuration(0)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        
+        worker = ExportWorker(self.pool, job)
+        worker.progress.connect(lambda rows, rate, eta: self.on_export_progress(dialog, job, rows, rate, eta))
+        worker.result_ready.connect(lambda rows: self.on_export_finished(dialog, job, rows))
+        worker.error_occurred.connect(lambda message: self.on_export_failed(dialog, message))
+        dialog.canceled.connect(worker.cancel)
+        self.queries.start(worker, supersedable=False)
+        dialog.show()
+    
+    def on_export_progress(self, dialog, job, rows, rate, eta):
+        """Show export throughput and ETA"""
+        text = f"Exporting '{job.table}': {rows:,} rows ({rate:,.0f} rows/s)"
+        if eta >= 0:
+            text += f", ETA {format_duration(eta)}"
+            dialog.setValue(min(99, int(100 * rows / job.total)))
+        dialog.setLabelText(text)
+    
+    def on_export_finished(self, dialog, job, rows):
+        """Report the end of an export"""
+        dialog.close()
+        db_name = os.path.basename(self.db_path) if self.db_path else None
+        if rows is None:
+            self.update_status_bar("Export cancelled", db_name)
+        else:
+            self.update_status_bar(f"Exported {rows:,} rows to {os.path.basename(job.path)}", db_name)
+    
+    def on_export_failed(self, dialog, error_message):
+        dialog.close()
+        self.show_error(error_message)
+    
+    def toggle_search_index_build(self):
+        """Build the search index for the current table, or cancel a running build"""
+        if self.index_worker is not None:
+            self.index_worker.cancel()
+            return
+        if not self.current_table:
+            QMessageBox.information(self, "Search Index", "Select a table to index first.")
+            return
+        # An explicit build starts over so updated and deleted rows are re-indexed
+        self.start_index_build(self.current_table, rebuild=True)
+    
+    def start_index_build(self, table, rebuild=False):
+        """Build or catch up the trigram search index of a table in the background"""
+        info = self.table_info(table)
+        key_columns = info.key_columns() if info else []
+        text_columns = info.text_columns() if info else []
+        if len(key_columns) != 1 or key_columns[0] not in ROWID_ALIASES or not text_columns:
+            QMessageBox.information(self, "Search Index",
+                                    "Only rowid tables with text columns can be indexed.")
+            return
+        
+        worker = IndexBuildWorker(self.pool, self.search_index, table, key_columns[0], text_columns, rebuild)
+        worker.progress.connect(self.progress_bar.setValue)
+        worker.result_ready.connect(lambda rows, w=worker: self.on_index_built(w, rows))
+        worker.error_occurred.connect(self.show_error)
+        worker.finished.connect(lambda w=worker: self.on_index_worker_finished(w))
+        self.index_worker = worker
+        self.index_action.setText('Cancel &Search Index Build')
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat(f"Indexing {table}: %p%")
+        self.progress_bar.setVisible(True)
+        self.queries.start(worker, supersedable=False)
+    
+    def on_index_built(self, worker, rows):
+        """Start using a freshly built index"""
+        if worker.pool is not self.pool:
+            return  # Another database was opened meanwhile
+        self.pool.attach(ATTACH_ALIAS, self.search_index.path)
+        db_name = os.path.basename(self.db_path)
+        if self.search_index.get(worker.table)['stale']:
+            self.update_status_bar(f"Search index for '{worker.table}' is out of date: rows were deleted "
+                                   "since it was built. Searches read the table until it is rebuilt", db_name)
+        else:
+            self.update_status_bar(f"Search index for '{worker.table}' covers {rows:,} rows", db_name)
+        if worker.table == self.current_table and self.search_input.text().strip() and not worker.cancelled:
+            self.current_offset = 0
+            self.load_table_data()
+    
+    def on_index_worker_finished(self, worker):
+        if worker is self.index_worker:
+            self.index_worker = None
+            self.index_action.setText('Build &Search Index')
+            self.progress_bar.setVisible(False)
     
     def clear_filter(self):
         """Clear search filter"""
         self.search_input.clear()
+        self.filter_timer.stop()  # Clearing the text scheduled a filter run
         self.column_combo.setCurrentIndex(0)
+        self.mode_combo.setCurrentIndex(0)
         if self.current_table:
             self.current_offset = 0
             self.load_table_data()
@@ -587,16 +3152,47 @@ class SQLiteBrowser(QMainWindow):
         QMessageBox.critical(self, "Database Error", error_message)
 
 
+def print_startup_profile(marks):
+    """Print how long each startup step took, measured from the first import"""
+    print("Startup profile (seconds):", file=sys.stderr)
+    previous = STARTED
+    for name, moment in marks:
+        print(f"  {name:<24}{moment - previous:8.3f}  (at {moment - STARTED:.3f})", file=sys.stderr)
+        previous = moment
+
+
 def main():
-    app = QApplication(sys.argv)
+    profile = "--profile-startup" in sys.argv
+    args = [arg for arg in sys.argv if arg != "--profile-startup"]
+    marks = [("Qt imports", QT_IMPORTED), ("Viewer modules", MODULES_IMPORTED)]
+    
+    app = QApplication(args)
+    marks.append(("QApplication", time.perf_counter()))
     
     # Set application properties
     app.setApplicationName("SQLite Browser")
     app.setApplicationVersion("1.0")
     app.setOrganizationName("SQLite Browser")
     
-    window = SQLiteBrowser()
+    # An optional database path on the command line is opened once the window is up
+    db_path = args[1] if len(args) > 1 else None
+    window = SQLiteBrowser(db_path)
+    marks.append(("Main window", time.perf_counter()))
     window.show()
+    marks.append(("Show", time.perf_counter()))
+    
+    if profile:
+        def first_paint():
+            marks.append(("First event loop pass", time.perf_counter()))
+            if not db_path and not os.path.exists("devices.db"):
+                print_startup_profile(marks)
+        
+        def loaded(path):
+            marks.append((f"Open {os.path.basename(path)}", time.perf_counter()))
+            print_startup_profile(marks)
+        
+        QTimer.singleShot(0, first_paint)
+        window.database_loaded.connect(loaded)
     
     sys.exit(app.exec_())
 
@@ -0,0 +1,43 @@
+import codecs
+import sqlite3
+import unittest
+
+from cell_values import ValueReader, text_decoder
+
+
+class ValueReaderEncodingTest(unittest.TestCase):
+    """TEXT is read as bytes in the database encoding and decoded to match"""
+
+    text = "naïve café ✓ 𝄞 " * 40000  # Spans several chunks, includes a surrogate pair in UTF-16
+
+    def read_text(self, encoding):
+        conn = sqlite3.connect(":memory:")
+        conn.execute(f"PRAGMA encoding = '{encoding}'")
+        conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+        conn.execute("INSERT INTO notes VALUES (1, ?)", (self.text,))
+        reader = ValueReader("notes", "body", ["id"], [1])
+        kind, size, codec = reader.info(conn)
+        chunks = []
+        reader.read(conn, kind, size, chunks.append)
+        decoder = text_decoder(codec)
+        decoded = "".join(decoder.decode(chunk) for chunk in chunks) + decoder.decode(b"", final=True)
+        conn.close()
+        return kind, size, codec, decoded
+
+    def test_utf8(self):
+        kind, size, codec, decoded = self.read_text("UTF-8")
+        self.assertEqual((kind, codec), ("text", "utf-8"))
+        self.assertEqual(size, len(self.text.encode("utf-8")))
+        self.assertEqual(decoded, self.text)
+
+    def test_utf16(self):
+        for encoding, expected in (("UTF-16le", "utf-16-le"), ("UTF-16be", "utf-16-be")):
+            with self.subTest(encoding=encoding):
+                kind, size, codec, decoded = self.read_text(encoding)
+                self.assertEqual((kind, codec), ("text", expected))
+                self.assertEqual(size, len(codecs.encode(self.text, expected)))
+                self.assertEqual(decoded, self.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import fts_index
+from fts_index import SearchIndex
+
+
+class CatchUpTest(unittest.TestCase):
+    """Catch-up passes index appended rows and notice deleted ones"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "notes.db")
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+        self.append(1, 1000)
+        self.index = SearchIndex(self.db_path)
+        self.index.build(self.conn, "notes", "id", ["body"], data_version=1)
+        self.statements = []
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def append(self, first, last):
+        self.conn.executemany("INSERT INTO notes VALUES (?, ?)",
+                              ((i, f"note number {i}") for i in range(first, last + 1)))
+        self.conn.commit()
+
+    def catch_up(self, data_version):
+        self.conn.set_trace_callback(self.statements.append)
+        try:
+            return self.index.build(self.conn, "notes", "id", ["body"], data_version=data_version)
+        finally:
+            self.conn.set_trace_callback(None)
+
+    def test_append_does_not_count_indexed_range(self):
+        self.append(1001, 1010)
+        self.assertEqual(self.catch_up(data_version=2), 1010)
+        entry = self.index.get("notes")
+        self.assertEqual((entry['max_rowid'], entry['stale']), (1010, False))
+        self.assertFalse([sql for sql in self.statements if "COUNT(" in sql.upper()], self.statements)
+
+    def test_delete_at_the_end_is_noticed_without_counting(self):
+        self.conn.execute("DELETE FROM notes WHERE id > 990")
+        self.conn.commit()
+        self.catch_up(data_version=2)
+        self.assertTrue(self.index.get("notes")['stale'])
+        self.assertFalse([sql for sql in self.statements if "COUNT(" in sql.upper()], self.statements)
+
+    def test_delete_inside_range_is_noticed_by_periodic_count(self):
+        self.conn.execute("DELETE FROM notes WHERE id = 500")
+        self.conn.commit()
+        self.catch_up(data_version=2)
+        self.assertFalse(self.index.get("notes")['stale'])  # Bounds unchanged, count not due yet
+        interval = fts_index.INDEX_CONFIG['verify_interval']
+        fts_index.INDEX_CONFIG['verify_interval'] = 0
+        try:
+            self.catch_up(data_version=3)
+        finally:
+            fts_index.INDEX_CONFIG['verify_interval'] = interval
+        self.assertTrue(self.index.get("notes")['stale'])
+
+
+if __name__ == "__main__":
+    unittest.main()